@@ -6,10 +6,17 @@ Integrates with various free medical and health APIs to enhance the medical dict
 import requests
 import json
 import time
+import asyncio
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import logging
 
+# aiohttp is optional; it is only needed by the async client used by async_prediction_api
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -90,6 +97,14 @@ class MedicalAPIIntegrations:
         
         return True
     
+    def _record_request(self, api_config: Dict):
+        """Update rate limiting info for a request being sent"""
+        api_config['last_request'] = time.time()
+        api_config['request_count'] += 1
+        
+        if not api_config.get('reset_time'):
+            api_config['reset_time'] = datetime.now() + timedelta(hours=1)
+    
     def _make_request(self, api_name: str, endpoint: str, params: Dict = None) -> Optional[Dict]:
         """
         Make a rate-limited request to an API
@@ -119,12 +134,7 @@ class MedicalAPIIntegrations:
             response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             
-            # Update rate limiting info
-            api_config['last_request'] = time.time()
-            api_config['request_count'] += 1
-            
-            if not api_config.get('reset_time'):
-                api_config['reset_time'] = datetime.now() + timedelta(hours=1)
+            self._record_request(api_config)
             
             return response.json()
             
@@ -145,13 +155,19 @@ class MedicalAPIIntegrations:
         Returns:
             Drug information dictionary
         """
-        endpoint = '/drug/label.json'
-        params = {
+        response = self._make_request('openfda', '/drug/label.json', self._drug_search_params(drug_name))
+        return self._parse_drug_info(response, drug_name)
+    
+    @staticmethod
+    def _drug_search_params(drug_name: str) -> Dict:
+        return {
             'search': f'openfda.brand_name:"{drug_name}" OR openfda.generic_name:"{drug_name}"',
             'limit': 1
         }
-        
-        response = self._make_request('openfda', endpoint, params)
+    
+    @staticmethod
+    def _parse_drug_info(response: Optional[Dict], drug_name: str) -> Optional[Dict]:
+        """Drug information from an OpenFDA label response"""
         if not response or not response.get('results'):
             return None
         
@@ -182,10 +198,12 @@ class MedicalAPIIntegrations:
         # Note: Disease Ontology API is more complex, this is a simplified version
         # In practice, you'd need to search by ID or use their SPARQL endpoint
         
-        endpoint = '/metadata/doid'
-        params = {'format': 'json'}
-        
-        response = self._make_request('disease_ontology', endpoint, params)
+        response = self._make_request('disease_ontology', '/metadata/doid', {'format': 'json'})
+        return self._parse_disease_ontology(response, disease_name)
+    
+    @staticmethod
+    def _parse_disease_ontology(response: Optional[Dict], disease_name: str) -> Optional[Dict]:
+        """Disease information from a Disease Ontology metadata response"""
         if not response:
             return None
         
@@ -210,16 +228,23 @@ class MedicalAPIIntegrations:
             Nutrition information
         """
         # Use Open Food Facts instead of USDA (no API key required)
-        endpoint = '/cgi/search.pl'
-        params = {
-            'search_terms': food_name,
+        response = self._make_request('openfoodfacts', '/cgi/search.pl', self._food_search_params(food_name))
+        return self._parse_food_nutrition(response, food_name)
+    
+    @staticmethod
+    def _food_search_params(search_terms: str) -> Dict:
+        """Open Food Facts search for the single best matching product"""
+        return {
+            'search_terms': search_terms,
             'search_simple': 1,
             'action': 'process',
             'json': 1,
             'page_size': 1
         }
-        
-        response = self._make_request('openfoodfacts', endpoint, params)
+    
+    @staticmethod
+    def _parse_food_nutrition(response: Optional[Dict], food_name: str) -> Optional[Dict]:
+        """Nutrition information from an Open Food Facts search response"""
         if not response or not response.get('products'):
             return None
         
@@ -269,16 +294,12 @@ class MedicalAPIIntegrations:
         Returns:
             Food product information
         """
-        endpoint = '/cgi/search.pl'
-        params = {
-            'search_terms': product_name,
-            'search_simple': 1,
-            'action': 'process',
-            'json': 1,
-            'page_size': 1
-        }
-        
-        response = self._make_request('openfoodfacts', endpoint, params)
+        response = self._make_request('openfoodfacts', '/cgi/search.pl', self._food_search_params(product_name))
+        return self._parse_food_product(response, product_name)
+    
+    @staticmethod
+    def _parse_food_product(response: Optional[Dict], product_name: str) -> Optional[Dict]:
+        """Product information from an Open Food Facts search response"""
         if not response or not response.get('products'):
             return None
         
@@ -310,14 +331,20 @@ class MedicalAPIIntegrations:
             return None
         
         # Search for drug interactions
-        endpoint = '/drug/event.json'
+        response = self._make_request('openfda', '/drug/event.json', self._interaction_search_params(drug_names))
+        return self._parse_interactions(response, drug_names)
+    
+    @staticmethod
+    def _interaction_search_params(drug_names: List[str]) -> Dict:
         search_terms = ' OR '.join([f'patient.drug.medicinalproduct:"{drug}"' for drug in drug_names])
-        params = {
+        return {
             'search': search_terms,
             'limit': 10
         }
-        
-        response = self._make_request('openfda', endpoint, params)
+    
+    @staticmethod
+    def _parse_interactions(response: Optional[Dict], drug_names: List[str]) -> Optional[Dict]:
+        """Co-reported drugs and reactions from an OpenFDA adverse event response"""
         if not response:
             return None
         
@@ -403,6 +430,177 @@ class MedicalAPIIntegrations:
         ]
 
 
+class AsyncMedicalAPIIntegrations(MedicalAPIIntegrations):
+    """
+    Non-blocking variant of MedicalAPIIntegrations on top of aiohttp
+    
+    The HTTP lookups are coroutines sharing one pooled ClientSession, so a
+    single event loop can wait on many slow upstream calls at once. Instead
+    of the blocking client's 1-second spacing, each API gets a cap on
+    concurrent requests; a request that cannot get a slot within
+    ``slot_timeout`` seconds fails like a timed-out call. The hourly quota
+    is counted under a per-API asyncio.Lock when the request is sent.
+    Response parsing is inherited; get_health_tips, which needs no I/O,
+    stays synchronous.
+    """
+    
+    def __init__(self, max_connections: int = 100, timeout: float = 10,
+                 max_concurrent_per_api: int = 20, slot_timeout: float = None):
+        if aiohttp is None:
+            raise ImportError("AsyncMedicalAPIIntegrations requires aiohttp (pip install aiohttp)")
+        super().__init__()
+        self.session.close()
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.session = None
+        self.slot_timeout = timeout if slot_timeout is None else slot_timeout
+        self.api_slots = {api_name: asyncio.Semaphore(max_concurrent_per_api) for api_name in self.apis}
+        self.rate_locks = {api_name: asyncio.Lock() for api_name in self.apis}
+    
+    async def _get_session(self):
+        # Created lazily so the session binds to the running event loop
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers={'User-Agent': 'Medical-Dictionary-Bot/1.0'},
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self.session
+    
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+    
+    async def _reserve_request(self, api_name: str) -> bool:
+        """
+        Count a request against the API's hourly quota before it is sent
+        
+        Returns:
+            True if the request is allowed, False if the rate limit is exhausted
+        """
+        async with self.rate_locks[api_name]:
+            if not self._rate_limit_check(api_name):
+                return False
+            self._record_request(self.apis[api_name])
+            return True
+    
+    async def _make_request(self, api_name: str, endpoint: str, params: Dict = None) -> Optional[Dict]:
+        """
+        Make a rate-limited request to an API without blocking the event loop
+        
+        Args:
+            api_name: Name of the API
+            endpoint: API endpoint
+            params: Request parameters
+            
+        Returns:
+            API response as dictionary or None if failed
+        """
+        if api_name not in self.apis:
+            return None
+        
+        slots = self.api_slots[api_name]
+        try:
+            await asyncio.wait_for(slots.acquire(), self.slot_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No free request slot for {api_name} within {self.slot_timeout}s")
+            return None
+        
+        try:
+            # The request is counted before it is sent, even if it fails
+            if not await self._reserve_request(api_name):
+                logger.warning(f"Rate limit exceeded for {api_name}")
+                return None
+            
+            api_config = self.apis[api_name]
+            url = f"{api_config['base_url']}{endpoint}"
+            
+            session = await self._get_session()
+            async with session.get(url, params=params) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+            
+            return data
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"API request failed for {api_name}: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON decode error for {api_name}: {e}")
+            return None
+        finally:
+            slots.release()
+    
+    async def get_drug_info(self, drug_name: str) -> Optional[Dict]:
+        """
+        Get drug information from OpenFDA API
+        
+        Args:
+            drug_name: Name of the drug
+            
+        Returns:
+            Drug information dictionary
+        """
+        response = await self._make_request('openfda', '/drug/label.json', self._drug_search_params(drug_name))
+        return self._parse_drug_info(response, drug_name)
+    
+    async def get_disease_ontology_info(self, disease_name: str) -> Optional[Dict]:
+        """
+        Get disease information from Disease Ontology API
+        
+        Args:
+            disease_name: Name of the disease
+            
+        Returns:
+            Disease ontology information
+        """
+        response = await self._make_request('disease_ontology', '/metadata/doid', {'format': 'json'})
+        return self._parse_disease_ontology(response, disease_name)
+    
+    async def get_food_nutrition(self, food_name: str) -> Optional[Dict]:
+        """
+        Get nutrition information from Open Food Facts
+        
+        Args:
+            food_name: Name of the food
+            
+        Returns:
+            Nutrition information
+        """
+        response = await self._make_request('openfoodfacts', '/cgi/search.pl', self._food_search_params(food_name))
+        return self._parse_food_nutrition(response, food_name)
+    
+    async def get_food_product_info(self, product_name: str) -> Optional[Dict]:
+        """
+        Get food product information from Open Food Facts
+        
+        Args:
+            product_name: Name of the food product
+            
+        Returns:
+            Food product information
+        """
+        response = await self._make_request('openfoodfacts', '/cgi/search.pl', self._food_search_params(product_name))
+        return self._parse_food_product(response, product_name)
+    
+    async def get_medication_interactions(self, drug_names: List[str]) -> Optional[Dict]:
+        """
+        Get drug interaction information from OpenFDA
+        
+        Args:
+            drug_names: List of drug names to check interactions for
+            
+        Returns:
+            Interaction information
+        """
+        if len(drug_names) < 2:
+            return None
+        
+        response = await self._make_request('openfda', '/drug/event.json', self._interaction_search_params(drug_names))
+        return self._parse_interactions(response, drug_names)
+
+
 # Example usage and testing
 if __name__ == "__main__":
     api = MedicalAPIIntegrations()
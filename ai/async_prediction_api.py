@@ -0,0 +1,196 @@
+"""
+Asyncio serving variant of the disease prediction API
+
+Serves the same routes and payloads as disease_prediction_api on aiohttp.
+The routes that wait on Open Food Facts (/nutrition, /nutritional-recommendations
+and /comprehensive-analysis) await AsyncMedicalAPIIntegrations, so one process
+holds many slow upstream calls at once instead of parking a worker on each.
+Every other route is dispatched to the Flask app in a thread pool, which keeps
+CPU-bound prediction off the event loop and the payloads byte-identical.
+
+Requires aiohttp (pip install aiohttp).
+
+Usage:
+    python async_prediction_api.py    # PORT, PREDICT_WORKERS, UPSTREAM_CONNECTIONS, UPSTREAM_PER_API
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from werkzeug.test import EnvironBuilder
+from api_integrations import AsyncMedicalAPIIntegrations
+from serialization import encode_response
+import disease_prediction_api as flask_api
+from disease_prediction_api import (
+    predictor, medical_dict, result_sink, micro_batcher, _analysis_request, _comprehensive_result
+)
+
+# Headers aiohttp sets itself from the body it sends
+_HOP_HEADERS = {'content-length', 'transfer-encoding', 'connection'}
+
+
+def json_response(request, payload, status=200):
+    """JSON response compressed the same way as the Flask app's"""
+    body, headers = encode_response(payload, request.headers.get('Accept-Encoding'))
+    return web.Response(body=body, status=status, headers=headers)
+
+
+def _call_wsgi(environ):
+    """Run one request through the Flask app and collect the response"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+
+    result = flask_api.app(environ, start_response)
+    try:
+        body = b''.join(result)
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return started['status'], started['headers'], body
+
+
+async def forward_to_flask(request):
+    """Serve a route through the Flask app on the prediction executor"""
+    builder = EnvironBuilder(
+        path=request.path,
+        method=request.method,
+        query_string=request.query_string,
+        headers=[(name, value) for name, value in request.headers.items()],
+        data=await request.read()
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    loop = asyncio.get_running_loop()
+    status, headers, body = await loop.run_in_executor(request.app['executor'], _call_wsgi, environ)
+    response = web.Response(body=body, status=status)
+    for name, value in headers:
+        if name.lower() not in _HOP_HEADERS:
+            response.headers.add(name, value)
+    return response
+
+
+async def get_food_nutrition(request):
+    """Get nutrition information from Open Food Facts API"""
+    food_name = request.match_info['food_name']
+    try:
+        nutrition_info = await request.app['api_integrations'].get_food_nutrition(food_name)
+
+        if not nutrition_info:
+            return json_response(request, {'error': f'Nutrition information for "{food_name}" not found'}, 404)
+
+        return json_response(request, nutrition_info)
+
+    except Exception as e:
+        return json_response(request, {'error': f'Failed to get nutrition information: {str(e)}'}, 500)
+
+
+async def get_nutritional_recommendations(request):
+    """Get nutritional recommendations for a disease"""
+    try:
+        recommendations = await medical_dict.get_nutritional_recommendations_async(
+            request.match_info['disease_name'], request.app['api_integrations']
+        )
+
+        return json_response(request, recommendations)
+
+    except Exception as e:
+        return json_response(request, {'error': f'Failed to get nutritional recommendations: {str(e)}'}, 500)
+
+
+async def comprehensive_analysis(request):
+    """Get comprehensive analysis with predicted disease, nutrition, and medical terminology"""
+    try:
+        try:
+            data = await request.json() if request.body_exists else None
+        except ValueError:
+            data = None
+        try:
+            symptoms, sections = _analysis_request(data)
+        except ValueError as e:
+            return json_response(request, {'error': str(e)}, 400)
+
+        # Prediction is CPU-bound: run it off the event loop, batched with
+        # concurrent requests when the micro-batcher is enabled
+        if micro_batcher is not None:
+            prediction_result = await asyncio.wrap_future(micro_batcher.submit(symptoms, top_k=3))
+        else:
+            loop = asyncio.get_running_loop()
+            prediction_result = await loop.run_in_executor(
+                request.app['executor'], predictor.predict_disease, symptoms, 3
+            )
+
+        top_disease = prediction_result.get('predicted_disease', '')
+        disease_info, nutrition_recs = {}, {}
+        if top_disease and sections:
+            disease_info = medical_dict.get_comprehensive_info(top_disease)
+            if 'nutritional_recommendations' in sections:
+                nutrition_recs = await medical_dict.get_nutritional_recommendations_async(
+                    top_disease, request.app['api_integrations']
+                )
+
+        comprehensive_result = _comprehensive_result(prediction_result, sections, disease_info, nutrition_recs)
+
+        # Record the result without blocking the request on disk I/O
+        result_sink.submit(comprehensive_result)
+
+        return json_response(request, comprehensive_result)
+
+    except Exception as e:
+        return json_response(request, {'error': f'Comprehensive analysis failed: {str(e)}'}, 500)
+
+
+async def _close_resources(app):
+    await app['api_integrations'].close()
+    app['executor'].shutdown(wait=False)
+
+
+def create_app(predict_workers=None, upstream_connections=100, upstream_per_api=20):
+    """Build the aiohttp application
+
+    Args:
+        predict_workers: Threads serving prediction and the other Flask routes
+            (defaults to the CPU count)
+        upstream_connections: Connection pool size for the external APIs
+        upstream_per_api: Concurrent requests allowed to each external API
+    """
+    app = web.Application()
+    app['executor'] = ThreadPoolExecutor(
+        max_workers=predict_workers or os.cpu_count(), thread_name_prefix='predict'
+    )
+    app['api_integrations'] = AsyncMedicalAPIIntegrations(
+        max_connections=upstream_connections, max_concurrent_per_api=upstream_per_api
+    )
+    app.on_cleanup.append(_close_resources)
+
+    app.router.add_get('/nutrition/{food_name}', get_food_nutrition)
+    app.router.add_get('/nutritional-recommendations/{disease_name}', get_nutritional_recommendations)
+    app.router.add_post('/comprehensive-analysis', comprehensive_analysis)
+    # Everything else, including 404s, is answered by the Flask app
+    app.router.add_route('*', '/{tail:.*}', forward_to_flask)
+    return app
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 5000))
+    predict_workers = int(os.environ.get('PREDICT_WORKERS', 0)) or None
+    upstream_connections = int(os.environ.get('UPSTREAM_CONNECTIONS', 100))
+    upstream_per_api = int(os.environ.get('UPSTREAM_PER_API', 20))
+
+    print("=" * 80)
+    print("ENHANCED DISEASE PREDICTION API v2.0 - ASYNC SERVER (aiohttp)")
+    print("=" * 80)
+    print(f"Serving the same endpoints as disease_prediction_api on http://localhost:{port}")
+    print("  Awaiting upstream APIs: /nutrition/<food>, /nutritional-recommendations/<disease>,")
+    print("                          /comprehensive-analysis (POST)")
+    print(f"  Prediction workers: {predict_workers or os.cpu_count()}")
+    print(f"  Upstream connection pool: {upstream_connections} ({upstream_per_api} per API)")
+    print("=" * 80)
+
+    web.run_app(create_app(predict_workers, upstream_connections, upstream_per_api), host='0.0.0.0', port=port)
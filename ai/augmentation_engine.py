@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+
+
+class RaggedSymptoms:
+    """Batch of symptom lists stored as one flat id array plus row offsets"""
+
+    def __init__(self, ids, offsets, rows):
+        self.ids = ids            # int32 symptom ids of every token
+        self.offsets = offsets    # int64 row boundaries, length n_rows + 1
+        self.rows = rows          # int64 index of the source disease row
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def token_rows(self):
+        """Row index of every token"""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def token_positions(self):
+        """Position of every token within its row"""
+        return np.arange(len(self.ids)) - np.repeat(self.offsets[:-1], self.lengths)
+
+    @classmethod
+    def from_tokens(cls, ids, token_rows, rows):
+        """Build a batch from tokens already grouped by ascending row"""
+        lengths = np.bincount(token_rows, minlength=len(rows))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        return cls(ids.astype(np.int32), offsets, rows)
+
+    @classmethod
+    def concat(cls, batches):
+        """Stack several batches row-wise"""
+        ids = np.concatenate([batch.ids for batch in batches])
+        lengths = np.concatenate([batch.lengths for batch in batches])
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        rows = np.concatenate([batch.rows for batch in batches])
+        return cls(ids, offsets, rows)
+
+    def take(self, row_index):
+        """Gather rows (with repetition) into a new batch"""
+        row_index = np.asarray(row_index, dtype=np.int64)
+        lengths = self.lengths[row_index]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        starts = np.repeat(self.offsets[:-1][row_index], lengths)
+        within = np.arange(offsets[-1]) - np.repeat(offsets[:-1], lengths)
+        return RaggedSymptoms(self.ids[starts + within], offsets, self.rows[row_index])
+
+    def padded(self, fill=-1):
+        """Dense (n_rows x max_len) id matrix padded with ``fill``"""
+        width = int(self.lengths.max()) if len(self) else 0
+        matrix = np.full((len(self), width), fill, dtype=np.int32)
+        matrix[self.token_rows(), self.token_positions()] = self.ids
+        return matrix
+
+
+class AugmentationEngine:
+    """Vectorized symptom augmentation over integer symptom ids.
+
+    Symptoms are interned into a vocabulary once; every operator then works on
+    whole ragged batches with NumPy and draws all randomness from the
+    ``numpy.random.Generator`` it is given, so a run is fully determined by its
+    seed.
+    """
+
+    def __init__(self, symptom_lists, symptom_variations, body_system_symptoms):
+        self.vocab = []
+        self.vocab_index = {}
+
+        ids = [self.intern(symptom) for symptoms in symptom_lists for symptom in symptoms]
+        lengths = [len(symptoms) for symptoms in symptom_lists]
+        self.base = RaggedSymptoms(
+            np.array(ids, dtype=np.int32),
+            np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+            np.arange(len(symptom_lists), dtype=np.int64)
+        )
+
+        self.variation_table, self.variation_counts = self.lookup_table(symptom_variations)
+
+        # Candidate symptoms of each body system, padded with -1
+        self.systems = list(body_system_symptoms)
+        system_ids = [[self.intern(s) for s in body_system_symptoms[system]] for system in self.systems]
+        width = max((len(members) for members in system_ids), default=0)
+        self.system_candidates = np.full((len(self.systems), width), -1, dtype=np.int32)
+        self.system_counts = np.array([len(members) for members in system_ids], dtype=np.int64)
+        for i, members in enumerate(system_ids):
+            self.system_candidates[i, :len(members)] = members
+
+        # Body systems touched by each original symptom list
+        membership = np.zeros((len(self.vocab), len(self.systems)), dtype=bool)
+        for i, members in enumerate(system_ids):
+            membership[members, i] = True
+        token_systems = membership[self.base.ids]
+        self.base_systems = np.zeros((len(self.base), len(self.systems)), dtype=bool)
+        np.logical_or.at(self.base_systems, self.base.token_rows(), token_systems)
+
+    def intern(self, symptom):
+        """Return the id of a symptom string, adding it to the vocabulary"""
+        symptom_id = self.vocab_index.get(symptom)
+        if symptom_id is None:
+            symptom_id = len(self.vocab)
+            self.vocab_index[symptom] = symptom_id
+            self.vocab.append(symptom)
+        return symptom_id
+
+    def lookup_table(self, mapping):
+        """Padded (vocab x max_options) replacement table and option counts"""
+        entries = {
+            self.intern(symptom): [self.intern(option) for option in options]
+            for symptom, options in mapping.items()
+        }
+        width = max((len(options) for options in entries.values()), default=0)
+        table = np.full((len(self.vocab), width), -1, dtype=np.int32)
+        counts = np.zeros(len(self.vocab), dtype=np.int64)
+        for symptom_id, options in entries.items():
+            table[symptom_id, :len(options)] = options
+            counts[symptom_id] = len(options)
+        return table, counts
+
+    # Operators -----------------------------------------------------------
+
+    def replace_tokens(self, batch, table, counts, probability, rng):
+        """Replace each token with a random option from ``table`` with some probability"""
+        ids = batch.ids.copy()
+        draw = rng.random(len(ids))
+        pick = rng.random(len(ids))
+        known = ids < len(counts)
+        n_options = np.zeros(len(ids), dtype=np.int64)
+        n_options[known] = counts[ids[known]]
+        hit = (draw < probability) & (n_options > 0)
+        ids[hit] = table[ids[hit], (pick[hit] * n_options[hit]).astype(np.int64)]
+        return RaggedSymptoms(ids, batch.offsets.copy(), batch.rows.copy())
+
+    def add_related_symptoms(self, batch, probability, rng):
+        """Append a symptom from a body system affected by the original list"""
+        n_rows = len(batch)
+        affected = self.base_systems[batch.rows]
+        add = (rng.random(n_rows) < probability) & affected.any(axis=1)
+        system = np.argmax(rng.random(affected.shape) * affected, axis=1)
+
+        # (row, symptom) keys of the tokens already present, for O(log n) lookups
+        token_rows = batch.token_rows()
+        present = np.unique(token_rows * len(self.vocab) + batch.ids)
+
+        # Rejection sampling: draw a candidate of the chosen system per row and
+        # keep it unless the row already has it; uniform over the allowed ones
+        added = np.full(n_rows, -1, dtype=np.int32)
+        pending = np.flatnonzero(add)
+        for _ in range(self.system_candidates.shape[1]):
+            if not len(pending):
+                break
+            counts = self.system_counts[system[pending]]
+            pick = (rng.random(len(pending)) * counts).astype(np.int64)
+            candidate = self.system_candidates[system[pending], pick]
+            keys = pending * len(self.vocab) + candidate
+            found = np.searchsorted(present, keys)
+            taken = (found < len(present)) & (present[np.minimum(found, len(present) - 1)] == keys)
+            added[pending[~taken]] = candidate[~taken]
+            pending = pending[taken]
+
+        # Mostly-covered systems: scan the candidates of the remaining rows once
+        if len(pending):
+            candidates = self.system_candidates[system[pending]]
+            padded = batch.take(pending).padded()
+            allowed = (candidates >= 0) & ~(candidates[:, :, None] == padded[:, None, :]).any(axis=2)
+            choice = np.argmax(rng.random(allowed.shape) * allowed, axis=1)
+            added[pending] = np.where(allowed.any(axis=1), candidates[np.arange(len(pending)), choice], -1)
+        add &= added >= 0
+
+        ids = np.concatenate([batch.ids, added[add]])
+        token_rows = np.concatenate([token_rows, np.flatnonzero(add)])
+        order = np.argsort(token_rows, kind='stable')
+        return RaggedSymptoms.from_tokens(ids[order], token_rows[order], batch.rows.copy())
+
+    def drop_symptom(self, batch, probability, rng, min_length=4):
+        """Remove one random symptom from lists of at least ``min_length``"""
+        lengths = batch.lengths
+        drop = (lengths >= min_length) & (rng.random(len(batch)) < probability)
+        position = (rng.random(len(batch)) * lengths).astype(np.int64)
+        token_rows = batch.token_rows()
+        keep = ~(drop[token_rows] & (batch.token_positions() == position[token_rows]))
+        return RaggedSymptoms.from_tokens(batch.ids[keep], token_rows[keep], batch.rows.copy())
+
+    def shuffle_symptoms(self, batch, probability, rng):
+        """Randomly reorder the symptoms of some rows"""
+        shuffled = rng.random(len(batch)) < probability
+        token_rows = batch.token_rows()
+        keys = np.where(shuffled[token_rows], rng.random(len(batch.ids)), batch.token_positions())
+        order = np.lexsort((keys, token_rows))
+        return RaggedSymptoms(batch.ids[order], batch.offsets.copy(), batch.rows.copy())
+
+    def sample_subset(self, batch, factor, rng):
+        """Keep a random subset of max(2, len * factor) symptoms in random order"""
+        lengths = batch.lengths
+        return self.keep_random(batch, np.maximum(2, (lengths * factor).astype(np.int64)), rng)
+
+    def keep_random(self, batch, keep_counts, rng):
+        """Keep ``keep_counts`` random symptoms of each row (all if fewer) in random order"""
+        keep_counts = np.minimum(batch.lengths, keep_counts)
+        token_rows = batch.token_rows()
+        order = np.lexsort((rng.random(len(batch.ids)), token_rows))
+        keep = batch.token_positions() < keep_counts[token_rows]
+        return RaggedSymptoms.from_tokens(batch.ids[order][keep], token_rows[keep], batch.rows.copy())
+
+    # Augmentation strategies ------------------------------------------------
+
+    def symptom_variations(self, augmentation_factor, rng, variation_probability=0.3,
+                           related_probability=0.4, drop_probability=0.2,
+                           shuffle_probability=0.3):
+        """Create ``augmentation_factor`` varied copies of every original list"""
+        batch = self.base.take(np.repeat(np.arange(len(self.base)), augmentation_factor))
+        batch = self.replace_tokens(
+            batch, self.variation_table, self.variation_counts, variation_probability, rng
+        )
+        batch = self.add_related_symptoms(batch, related_probability, rng)
+        batch = self.drop_symptom(batch, drop_probability, rng)
+        return self.shuffle_symptoms(batch, shuffle_probability, rng)
+
+    def partial_symptom_sets(self, partial_factors, rng):
+        """Create one random subset of every original list per factor"""
+        batches = [self.sample_subset(self.base, factor, rng) for factor in partial_factors]
+        batch = RaggedSymptoms.concat(batches)
+        factors = np.repeat(np.asarray(partial_factors, dtype=np.float64), len(self.base))
+
+        # Group the subsets by original row, then by factor
+        order = np.argsort(batch.rows, kind='stable')
+        return batch.take(order), factors[order]
+
+    def noisy_symptoms(self, noise_patterns, noise_probability, rng):
+        """Create one copy of every original list with typo-style noise"""
+        table, counts = self.lookup_table(noise_patterns)
+        return self.replace_tokens(self.base, table, counts, noise_probability, rng)
+
+    # Output -------------------------------------------------------------
+
+    def to_columns(self, batch, diseases):
+        """Columnar output: disease, symptom list, joined text and count per row"""
+        tokens = np.array(self.vocab, dtype=object)[batch.ids]
+        symptom_lists = [tokens[start:end].tolist() for start, end in zip(batch.offsets[:-1], batch.offsets[1:])]
+        return {
+            'Disease': np.asarray(diseases, dtype=object)[batch.rows],
+            'Symptoms': ['; '.join(symptoms) for symptoms in symptom_lists],
+            'symptoms_list': [str(symptoms) for symptoms in symptom_lists],
+            'symptoms_text': [' '.join(symptoms) for symptoms in symptom_lists],
+            'symptom_count': batch.lengths,
+        }
+
+    def to_frame(self, batch, diseases, **columns):
+        """Materialize a batch as a DataFrame with extra constant or per-row columns"""
+        data = self.to_columns(batch, diseases)
+        data.update(columns)
+        data['original_index'] = batch.rows
+        return pd.DataFrame(data)
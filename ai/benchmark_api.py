@@ -0,0 +1,371 @@
+"""
+Load and latency benchmark for the disease prediction API
+
+Replays symptom workloads built from disesaseandsymptom.csv and the augmented
+variants against /predict, /search, /comprehensive-analysis and the in-process
+DiseasePredictor at fixed concurrency levels. Each level is a closed loop:
+``concurrency`` workers send requests back to back until ``requests`` have
+completed. Throughput, latency percentiles, errors and peak RSS are written to
+a JSON file so runs can be compared across commits.
+
+Without --url the Flask app is served in-process on an ephemeral port, with
+Open Food Facts replaced by a local mock, so runs need no network access.
+
+Usage:
+    python benchmark_api.py                                   # every target at 1, 4, 16
+    python benchmark_api.py --targets predict predictor --concurrency 1 8 32
+    python benchmark_api.py --url http://localhost:5000 --targets predict search
+    python benchmark_api.py --compare benchmark_results/api-old.json benchmark_results/api-new.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import contextlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+import requests
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+WORKLOAD_FILES = (
+    'disesaseandsymptom.csv',
+    'augmented_data/symptom_variations.csv',
+    'augmented_data/noisy_symptoms.csv',
+    'augmented_data/partial_symptoms.csv'
+)
+TARGETS = ('predictor', 'predict', 'search', 'comprehensive-analysis')
+RESULTS_DIR = 'benchmark_results'
+
+
+def load_workload(size=500, seed=42, files=WORKLOAD_FILES):
+    """Symptom texts and search queries sampled from the dataset and its variants
+
+    Returns a list of dicts with ``symptoms`` (the request text) and ``query``
+    (one of its symptoms), drawn reproducibly for a given seed.
+    """
+    frames = [pd.read_csv(path, usecols=['Symptoms']) for path in files if os.path.exists(path)]
+    if not frames:
+        raise FileNotFoundError(f"None of the workload files exist: {files}")
+    texts = pd.concat(frames, ignore_index=True)['Symptoms'].dropna().astype(str).tolist()
+
+    rng = random.Random(seed)
+    workload = []
+    for text in rng.choices(texts, k=size):
+        symptoms = [s.strip() for s in text.split(';') if s.strip()]
+        # Mix the dataset's '; ' format with the comma lists users type
+        separator = '; ' if rng.random() < 0.5 else ', '
+        workload.append({'symptoms': separator.join(symptoms), 'query': rng.choice(symptoms)})
+    return workload
+
+
+def build_request(target, item):
+    """HTTP method, path and JSON body of one request"""
+    if target == 'predict':
+        return 'POST', '/predict', {'symptoms': item['symptoms'], 'top_k': 5}
+    if target == 'search':
+        return 'POST', '/search', {'query': item['query']}
+    if target == 'comprehensive-analysis':
+        return 'POST', '/comprehensive-analysis', {'symptoms': item['symptoms']}
+    raise ValueError(f"Unknown HTTP target {target!r}")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def summarize(latencies, errors, elapsed):
+    """Throughput and latency percentiles of one run"""
+    latencies_ms = np.asarray(latencies) * 1000
+    completed = len(latencies_ms)
+    summary = {
+        'requests': completed + errors,
+        'errors': errors,
+        'duration_s': elapsed,
+        'throughput_rps': completed / elapsed if elapsed else 0.0
+    }
+    if completed:
+        p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+        summary.update({
+            'mean_ms': float(latencies_ms.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(latencies_ms.max())
+        })
+    return summary
+
+
+def run_closed_loop(call, workload, concurrency, n_requests):
+    """Drive ``call(item)`` from ``concurrency`` threads until ``n_requests`` finish
+
+    ``call`` returns True on success. Returns the run summary.
+    """
+    latencies = []
+    errors = [0]
+    next_index = [0]
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                index = next_index[0]
+                if index >= n_requests:
+                    return
+                next_index[0] += 1
+            item = workload[index % len(workload)]
+            start = time.perf_counter()
+            try:
+                ok = call(item)
+            except Exception:
+                ok = False
+            latency = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(latency)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+def http_caller(base_url, target):
+    """Request function for an HTTP target, one keep-alive session per thread"""
+    sessions = threading.local()
+
+    def call(item):
+        session = getattr(sessions, 'session', None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        method, path, body = build_request(target, item)
+        response = session.request(method, base_url + path, json=body, timeout=60)
+        return response.status_code == 200
+
+    return call
+
+
+class _MockFoodFactsHandler(BaseHTTPRequestHandler):
+    """Open Food Facts search stand-in returning one canned product"""
+
+    latency = 0.05
+    body = json.dumps({'products': [{
+        'product_name': 'Benchmark food',
+        'nutriments': {'energy-kcal_100g': 52, 'proteins_100g': 0.3, 'carbohydrates_100g': 14}
+    }]}).encode('utf-8')
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence stdout (the API prints debug output for every request)"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _serve(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@contextlib.contextmanager
+def local_api(mock_latency_ms=50):
+    """Serve disease_prediction_api in-process with mocked external APIs
+
+    Yields the base URL and the API module. Result and history stores write
+    to a temporary directory unless configured through the environment.
+    """
+    scratch = tempfile.mkdtemp(prefix='benchmark-')
+    os.environ.setdefault('RESULT_SINK_PATH', os.path.join(scratch, 'analysis_results'))
+    os.environ.setdefault('HISTORY_DB_PATH', os.path.join(scratch, 'analysis_history.db'))
+
+    from werkzeug.serving import make_server
+    # Per-request access logs would dominate the output
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with quiet():
+        import disease_prediction_api as api
+
+    _MockFoodFactsHandler.latency = mock_latency_ms / 1000
+    mock = _serve(ThreadingHTTPServer(('127.0.0.1', 0), _MockFoodFactsHandler))
+    api.medical_dict.api_integrations.apis['openfoodfacts']['base_url'] = f'http://127.0.0.1:{mock.server_port}'
+
+    server = _serve(make_server('127.0.0.1', 0, api.app, threaded=True))
+    try:
+        yield f'http://127.0.0.1:{server.server_port}', api
+    finally:
+        server.shutdown()
+        mock.shutdown()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(targets=TARGETS, concurrency_levels=(1, 4, 16), n_requests=300, warmup=20,
+                  workload_size=500, seed=42, url=None, mock_latency_ms=50):
+    """Run every target at every concurrency level
+
+    Returns the report dict that ``save_report`` writes.
+    """
+    workload = load_workload(workload_size, seed)
+    report = {
+        'meta': {
+            'benchmark': 'api',
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'url': url or 'in-process',
+            'config': {
+                'targets': list(targets), 'concurrency': list(concurrency_levels), 'requests': n_requests,
+                'warmup': warmup, 'workload_size': workload_size, 'seed': seed,
+                'mock_latency_ms': None if url else mock_latency_ms
+            }
+        },
+        'results': []
+    }
+
+    with contextlib.ExitStack() as stack:
+        api = None
+        if url is None:
+            url, api = stack.enter_context(local_api(mock_latency_ms))
+            report['meta']['serving_profile'] = api.predictor.serving_profile
+            report['meta']['micro_batch_size'] = api.MICRO_BATCH_SIZE
+
+        for target in targets:
+            if target == 'predictor':
+                if api is None:
+                    print("Skipping 'predictor': the in-process target needs the local API (no --url)")
+                    continue
+                call = lambda item: bool(api.predictor.predict_disease(item['symptoms'], top_k=5))
+            else:
+                call = http_caller(url, target)
+
+            for concurrency in concurrency_levels:
+                # Keep the API's debug prints out of the measurements and the console
+                with quiet():
+                    run_closed_loop(call, workload, concurrency, warmup)
+                    summary = run_closed_loop(call, workload, concurrency, n_requests)
+                summary = {'target': target, 'concurrency': concurrency, **summary, 'peak_rss_mb': peak_rss_mb()}
+                report['results'].append(summary)
+                print(f"{target:>24} c={concurrency:<3} {summary['throughput_rps']:8.1f} req/s  "
+                      f"p50={summary.get('p50_ms', float('nan')):7.2f}ms  "
+                      f"p95={summary.get('p95_ms', float('nan')):7.2f}ms  "
+                      f"p99={summary.get('p99_ms', float('nan')):7.2f}ms  errors={summary['errors']}")
+
+        if api is not None:
+            report['meta']['server_metrics'] = json.loads(api.app.test_client().get('/metrics').get_data())
+
+    return report
+
+
+def save_report(report, path=None):
+    """Write a report as JSON; defaults to benchmark_results/<benchmark>-<timestamp>.json"""
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{report['meta']['benchmark']}-{stamp}.json")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def compare_reports(baseline, current, metrics=('throughput_rps', 'p50_ms', 'p99_ms')):
+    """Relative change of each metric for the (target, concurrency) pairs in both reports"""
+    def keyed(report):
+        return {(r['target'], r['concurrency']): r for r in report['results']}
+
+    before, after = keyed(baseline), keyed(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        row = {'target': key[0], 'concurrency': key[1]}
+        for metric in metrics:
+            old, new = before[key].get(metric), after[key].get(metric)
+            row[metric] = (old, new, (new - old) / old * 100 if old and new is not None else None)
+        rows.append(row)
+    return rows
+
+
+def print_comparison(rows, metrics=('throughput_rps', 'p50_ms', 'p99_ms')):
+    for row in rows:
+        changes = []
+        for metric in metrics:
+            old, new, change = row[metric]
+            changes.append(f"{metric}: {old:.2f} -> {new:.2f} ({change:+.1f}%)" if change is not None else f"{metric}: n/a")
+        print(f"{row['target']:>24} c={row['concurrency']:<3} {'  '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--targets', nargs='+', choices=TARGETS, default=list(TARGETS))
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per level')
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests before each level')
+    parser.add_argument('--workload-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', help='benchmark a running server instead of an in-process one')
+    parser.add_argument('--mock-latency-ms', type=float, default=50, help='latency of the mocked external API')
+    parser.add_argument('--output', help='report path (default: benchmark_results/api-<timestamp>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='compare two saved reports')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        print_comparison(compare_reports(baseline, current))
+        return
+
+    report = run_benchmark(
+        targets=args.targets, concurrency_levels=args.concurrency, n_requests=args.requests,
+        warmup=args.warmup, workload_size=args.workload_size, seed=args.seed,
+        url=args.url.rstrip('/') if args.url else None, mock_latency_ms=args.mock_latency_ms
+    )
+    print(f"Saved {save_report(report, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""
+Micro-benchmarks for preprocessing, feature extraction and each ensemble member
+
+Times the hot-path components in isolation, parametrized by input length
+(symptoms per text), batch size and dictionary size, and measures the memory
+allocated per call with tracemalloc. Results are compared against the
+committed baseline so a change to one component can be judged on its own.
+
+Usage:
+    python benchmark_components.py                        # run and compare with the baseline
+    python benchmark_components.py --components clean_text tfidf_transform
+    python benchmark_components.py --save-baseline        # refresh benchmark_results/components_baseline.json
+"""
+
+import os
+import copy
+import json
+import time
+import random
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from benchmark_api import load_workload, save_report, git_commit, quiet, RESULTS_DIR
+
+BASELINE_FILE = os.path.join(RESULTS_DIR, 'components_baseline.json')
+
+INPUT_LENGTHS = (2, 5, 10, 15)
+BATCH_SIZES = (1, 16, 128)
+DICTIONARY_SCALES = (1, 4, 16)
+
+
+def time_per_call(fn, min_time=0.05, repeat=5):
+    """Median seconds per call over ``repeat`` loops of at least ``min_time`` each"""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - start) / loops)
+    return float(np.median(timings)), loops
+
+
+def allocations_per_call(fn, calls=20):
+    """Memory still allocated per call after ``calls`` calls, and the peak of one call
+
+    The retained figures sum the positive snapshot differences (caches, leaks);
+    the peak includes temporaries freed before the call returns.
+    """
+    fn()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(calls):
+            fn()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    growth = [stat for stat in after.compare_to(before, 'lineno') if stat.size_diff > 0]
+    return {
+        'retained_bytes_per_call': sum(stat.size_diff for stat in growth) / calls,
+        'retained_blocks_per_call': sum(stat.count_diff for stat in growth) / calls,
+        'peak_bytes_per_call': peak
+    }
+
+
+def texts_with_length(workload, n_symptoms, count=64, seed=42):
+    """Symptom texts padded or cut to exactly ``n_symptoms`` symptoms"""
+    pool = [s.strip() for item in workload for s in item['symptoms'].replace(';', ',').split(',') if s.strip()]
+    rng = random.Random(seed + n_symptoms)
+    return [', '.join(rng.choices(pool, k=n_symptoms)) for _ in range(count)]
+
+
+def scaled_dictionary(medical_dict, scale):
+    """Copy of the dictionary with its translation table and diseases repeated ``scale`` times
+
+    The copies get distinct synthetic keys, so lookups scan ``scale`` times as
+    many entries; nothing is written to disk.
+    """
+    scaled = copy.copy(medical_dict)
+    scaled.medical_to_layman = dict(medical_dict.medical_to_layman)
+    scaled.disease_database = dict(medical_dict.disease_database)
+    for i in range(1, scale):
+        for term, layman in medical_dict.medical_to_layman.items():
+            scaled.medical_to_layman[f'{term} variant{i}'] = layman
+        for key, info in medical_dict.disease_database.items():
+            scaled.disease_database[f'{key}_{i}'] = {**info, 'disease_name': f"{info.get('disease_name', key)} {i}"}
+    return scaled
+
+
+def component_cases(predictor, medical_dict, workload):
+    """Yield (component, params, callable) for every benchmark case"""
+    texts = {n: texts_with_length(workload, n) for n in INPUT_LENGTHS}
+
+    for n, batch in texts.items():
+        text = batch[0]
+        cleaned = predictor.standardize_medical_terms(predictor.clean_text(text))
+        symptoms = predictor.split_symptoms(cleaned)
+        combined = ' '.join(symptoms)
+        yield 'clean_text', {'symptoms': n}, lambda text=text: predictor.clean_text(text)
+        yield 'standardize_medical_terms', {'symptoms': n}, \
+            lambda text=predictor.clean_text(text): predictor.standardize_medical_terms(text)
+        yield 'split_symptoms', {'symptoms': n}, lambda cleaned=cleaned: predictor.split_symptoms(cleaned)
+        yield 'engineered_features', {'symptoms': n}, \
+            lambda symptoms=symptoms, combined=combined: predictor.engineered_features(symptoms, combined)
+        yield 'preprocess_symptoms', {'symptoms': n}, lambda text=text: predictor.preprocess_symptoms(text)
+
+    # Batched stages run on a mix of input lengths
+    mixed = [text for batch in texts.values() for text in batch]
+    random.Random(0).shuffle(mixed)
+    for batch_size in BATCH_SIZES:
+        batch = (mixed * (batch_size // len(mixed) + 1))[:batch_size]
+        processed = [predictor.preprocess_symptoms(text) for text in batch]
+        feature_matrix = np.vstack([features for features, _ in processed])
+        combined = [' '.join(symptoms) for _, symptoms in processed]
+        params = {'batch': batch_size}
+
+        yield 'tfidf_transform', params, lambda combined=combined: predictor.tfidf_vectorizer.transform(combined)
+        scaled = feature_matrix
+        if predictor.scaler is not None:
+            yield 'scaler_transform', params, lambda X=feature_matrix: predictor.scaler.transform(X)
+            scaled = predictor.scaler.transform(feature_matrix)
+        for name, model in predictor.models.items():
+            X = scaled if name in predictor.SCALED_MODELS else feature_matrix
+            yield f'predict_proba[{name}]', params, lambda model=model, X=X: model.predict_proba(X)
+        if predictor.student is not None:
+            yield 'predict_proba[Student]', params, lambda X=scaled: predictor.student.predict_proba(X)
+        yield 'predict_batch', params, lambda batch=batch: predictor.predict_batch(batch, top_k=5)
+
+    for scale in DICTIONARY_SCALES:
+        scaled = scaled_dictionary(medical_dict, scale)
+        params = {'dictionary_scale': scale, 'terms': len(scaled.medical_to_layman),
+                  'diseases': len(scaled.disease_database)}
+        description = ' '.join(
+            info.get('medical_definition', '') for info in list(medical_dict.disease_database.values())[:3]
+        ) or 'Pyrexia with cephalgia and rhinorrhea'
+        yield '_translate_medical_terms', params, \
+            lambda scaled=scaled: scaled._translate_medical_terms(description)
+        yield 'search_diseases', params, lambda scaled=scaled: scaled.search_diseases('fever')
+
+
+def run_benchmark(components=None, min_time=0.05, repeat=5, alloc_calls=20, seed=42):
+    """Time and trace every selected component case; returns the report dict"""
+    with quiet():
+        from disease_predictor import DiseasePredictor
+        from medical_dictionary import MedicalDictionary
+        predictor = DiseasePredictor()
+        if not predictor.load_models():
+            raise RuntimeError("Failed to load models; train them before benchmarking")
+        medical_dict = MedicalDictionary()
+
+    report = {
+        'meta': {
+            'benchmark': 'components',
+            'timestamp': datetime.now().isoformat(),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'serving_profile': predictor.serving_profile,
+            'model_version': predictor.model_version,
+            'config': {'min_time': min_time, 'repeat': repeat, 'alloc_calls': alloc_calls, 'seed': seed}
+        },
+        'results': []
+    }
+
+    workload = load_workload(size=500, seed=seed)
+    for component, params, fn in component_cases(predictor, medical_dict, workload):
+        if components and component.split('[')[0] not in components:
+            continue
+        seconds, loops = time_per_call(fn, min_time, repeat)
+        result = {
+            'component': component,
+            'params': params,
+            'us_per_call': seconds * 1e6,
+            'loops': loops,
+            **allocations_per_call(fn, alloc_calls)
+        }
+        report['results'].append(result)
+        print(f"{component:>36} {format_params(params):<36} {result['us_per_call']:11.1f} us  "
+              f"{result['retained_blocks_per_call']:8.1f} blocks  {result['peak_bytes_per_call'] / 1024:9.1f} KiB peak")
+    return report
+
+
+def format_params(params):
+    return ' '.join(f'{key}={value}' for key, value in params.items())
+
+
+def compare_reports(baseline, current, threshold=0.10):
+    """Per-case change in time and peak memory; flags slowdowns above ``threshold``"""
+    def keyed(report):
+        return {(r['component'], format_params(r['params'])): r for r in report['results']}
+
+    before, after = keyed(baseline), keyed(current)
+    rows = []
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key], after[key]
+        time_change = new['us_per_call'] / old['us_per_call'] - 1
+        rows.append({
+            'component': key[0],
+            'params': key[1],
+            'us_per_call': (old['us_per_call'], new['us_per_call'], time_change),
+            'peak_bytes_per_call': (old['peak_bytes_per_call'], new['peak_bytes_per_call']),
+            'regression': time_change > threshold
+        })
+    return rows
+
+
+def print_comparison(rows):
+    for row in rows:
+        old, new, change = row['us_per_call']
+        old_peak, new_peak = row['peak_bytes_per_call']
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['component']:>36} {row['params']:<36} {old:11.1f} -> {new:11.1f} us ({change:+6.1%})  "
+              f"peak {old_peak / 1024:.1f} -> {new_peak / 1024:.1f} KiB{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--components', nargs='+', help='component names to run (default: all)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timing loop')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--alloc-calls', type=int, default=20, help='calls traced per allocation measurement')
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=0.10, help='slowdown flagged as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--output', help='report path (default: benchmark_results/components-<timestamp>.json)')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.components, args.min_time, args.repeat, args.alloc_calls)
+
+    if args.save_baseline:
+        print(f"Saved baseline {save_report(report, args.baseline)}")
+        return
+
+    print(f"Saved {save_report(report, args.output)}")
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with baseline {args.baseline} (commit {baseline['meta'].get('commit')}):")
+        rows = compare_reports(baseline, report, args.threshold)
+        print_comparison(rows)
+        regressions = sum(row['regression'] for row in rows)
+        print(f"{regressions} of {len(rows)} cases slower than the baseline by more than {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
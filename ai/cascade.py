@@ -0,0 +1,154 @@
+import json
+import time
+import numpy as np
+
+CASCADE_CONFIG_FILE = 'cascade_config.json'
+
+# Members whose hard prediction is their own ``predict`` rather than the argmax
+# of ``predict_proba`` (Platt-scaled SVM probabilities can disagree with its decision)
+DECISION_MEMBERS = ('SVM',)
+
+
+def gate_statistics(proba):
+    """Max probability and top-1/top-2 margin of every row"""
+    top_two = np.partition(proba, -2, axis=1)[:, -2:]
+    return top_two[:, 1], top_two[:, 1] - top_two[:, 0]
+
+
+def passes_gate(proba, gate):
+    """Rows confident enough to stop at a stage; a ``None`` gate never stops"""
+    if gate is None:
+        return np.zeros(len(proba), dtype=bool)
+    confidence, margin = gate_statistics(proba)
+    return (confidence >= gate['min_confidence']) & (margin >= gate['min_margin'])
+
+
+def majority_vote(votes, n_classes):
+    """Most frequent class per row of an (n_rows x n_voters) matrix; ties go to the lowest class"""
+    n_rows = votes.shape[0]
+    keys = (np.arange(n_rows)[:, None] * n_classes + votes).ravel()
+    counts = np.bincount(keys, minlength=n_rows * n_classes).reshape(n_rows, n_classes)
+    return np.argmax(counts, axis=1)
+
+
+def measure_member_costs(models, inputs, n_samples=50):
+    """Per-request latency (ms) of each member on single-row inputs
+
+    Times the calls serving makes for a member: ``predict_proba``, plus
+    ``predict`` for the DECISION_MEMBERS.
+
+    Args:
+        models: Mapping of member name to fitted model
+        inputs: Mapping of member name to the feature matrix that member is served on
+        n_samples: Number of rows to time one at a time
+    """
+    costs = {}
+    for name, model in models.items():
+        X = np.asarray(inputs[name])[:n_samples]
+        decision = name in DECISION_MEMBERS
+        model.predict_proba(X[:1])
+        start = time.perf_counter()
+        for i in range(len(X)):
+            model.predict_proba(X[i:i + 1])
+            if decision:
+                model.predict(X[i:i + 1])
+        costs[name] = 1000 * (time.perf_counter() - start) / len(X)
+    return costs
+
+
+def calibrate_gate(stage_proba, reference_top, top_k=3, target_agreement=0.99, grid_size=21):
+    """Loosest (confidence, margin) gate whose accepted rows meet the target
+
+    A row agrees when the stage's top-k contains the full ensemble's top class.
+    Candidate thresholds are quantiles of the two statistics; the pair that
+    accepts the most rows while keeping agreement at or above the target wins.
+    Returns ``None`` when no pair qualifies.
+    """
+    if len(stage_proba) == 0:
+        return None
+    confidence, margin = gate_statistics(stage_proba)
+    ranked = np.argpartition(-stage_proba, min(top_k, stage_proba.shape[1]) - 1, axis=1)[:, :top_k]
+    agrees = (ranked == reference_top[:, None]).any(axis=1)
+
+    quantiles = np.linspace(0, 1, grid_size)
+    best, best_count = None, 0
+    for min_confidence in np.unique(np.quantile(confidence, quantiles)):
+        for min_margin in np.unique(np.quantile(margin, quantiles)):
+            accepted = (confidence >= min_confidence) & (margin >= min_margin)
+            count = int(accepted.sum())
+            if count > best_count and agrees[accepted].mean() >= target_agreement:
+                best = {'min_confidence': float(min_confidence), 'min_margin': float(min_margin)}
+                best_count = count
+    return best
+
+
+def calibrate_cascade(member_probas, costs, top_k=3, target_agreement=0.99, member_votes=None):
+    """Order members by cost and calibrate a stop gate after each prefix
+
+    Stage ``i`` serves the average probabilities of the ``i + 1`` cheapest
+    members; the last stage is the full ensemble and always answers. Gates are
+    fit greedily on the rows still undecided at each stage, so every stopped
+    row meets the target and the overall agreement does too.
+
+    Args:
+        member_probas: Mapping of member name to aligned calibration probabilities
+        costs: Mapping of member name to per-request latency in ms
+        member_votes: Optional mapping of member name to hard class indices; when
+            given, agreement is measured against their majority vote, which is
+            what the full profile serves, instead of the averaged probabilities
+    """
+    order = sorted(member_probas, key=lambda name: costs[name])
+    reference = np.mean([member_probas[name] for name in order], axis=0)
+    if member_votes is not None:
+        reference_top = majority_vote(np.column_stack([member_votes[name] for name in order]), reference.shape[1])
+    else:
+        reference_top = np.argmax(reference, axis=1)
+
+    n_samples = len(reference_top)
+    undecided = np.ones(n_samples, dtype=bool)
+    depth = np.full(n_samples, len(order))
+    served = reference.copy()
+    running = np.zeros_like(reference)
+    gates = []
+
+    for i, name in enumerate(order[:-1]):
+        running += member_probas[name]
+        stage_proba = running / (i + 1)
+        gate = calibrate_gate(stage_proba[undecided], reference_top[undecided], top_k, target_agreement)
+        gates.append(gate)
+
+        stop = np.zeros(n_samples, dtype=bool)
+        stop[undecided] = passes_gate(stage_proba[undecided], gate)
+        depth[stop] = i + 1
+        served[stop] = stage_proba[stop]
+        undecided &= ~stop
+
+    # Rows that reach the last stage get the full ensemble's own answer
+    ranked = np.argsort(-served, axis=1)
+    full_depth = depth == len(order)
+    cumulative_cost = np.cumsum([costs[name] for name in order])
+    return {
+        'order': order,
+        'gates': gates,
+        'top_k': top_k,
+        'target_agreement': target_agreement,
+        'member_ms': {name: costs[name] for name in order},
+        'val_top1_agreement': float(np.mean((ranked[:, 0] == reference_top) | full_depth)),
+        f'val_top{top_k}_agreement': float(np.mean(
+            (ranked[:, :top_k] == reference_top[:, None]).any(axis=1) | full_depth
+        )),
+        'val_depth_counts': {int(d): int(c) for d, c in zip(*np.unique(depth, return_counts=True))},
+        'val_mean_depth': float(depth.mean()),
+        'expected_ms': float(cumulative_cost[depth - 1].mean()),
+        'full_ms': float(cumulative_cost[-1])
+    }
+
+
+def save_cascade_config(config, path):
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2)
+
+
+def load_cascade_config(path):
+    with open(path, 'r') as f:
+        return json.load(f)
@@ -1,11 +1,118 @@
 import pandas as pd
 import numpy as np
 import pickle
+import hashlib
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import LabelEncoder
 import json
+import os
+from collections import Counter
+from feature_store import FeatureStore, sparse_frame
+from hashing_features import load_vectorizer, save_vectorizer, vectorizer_path
 
-def create_features_for_augmented_data():
+# Body system features
+BODY_SYSTEMS = {
+    'respiratory': ['cough', 'breath', 'chest', 'lung', 'nasal', 'throat', 'sneezing'],
+    'cardiovascular': ['chest pain', 'heart', 'blood pressure', 'palpitation'],
+    'gastrointestinal': ['abdominal', 'stomach', 'nausea', 'vomiting', 'diarrhea', 'constipation', 'appetite'],
+    'genitourinary': ['urination', 'urine', 'pelvic', 'genital', 'kidney', 'bladder'],
+    'neurological': ['headache', 'dizziness', 'confusion', 'seizure', 'numbness', 'weakness'],
+    'dermatological': ['rash', 'itching', 'skin', 'lesion', 'swelling'],
+    'musculoskeletal': ['joint', 'muscle', 'bone', 'back', 'neck', 'limb'],
+    'endocrine': ['weight', 'thirst', 'urination', 'fatigue', 'temperature']
+}
+
+# Severity indicators
+SEVERITY_INDICATORS = {
+    'severe': ['severe', 'intense', 'acute', 'sudden', 'high fever', 'profound'],
+    'mild': ['mild', 'low-grade', 'slight', 'minor', 'mild fever'],
+    'chronic': ['chronic', 'persistent', 'recurrent', 'ongoing', 'long-term']
+}
+
+ENGINEERED_FEATURES = [
+    'symptom_count', 'symptom_diversity',
+    'has_respiratory_symptoms', 'has_cardiovascular_symptoms',
+    'has_gastrointestinal_symptoms', 'has_genitourinary_symptoms',
+    'has_neurological_symptoms', 'has_dermatological_symptoms',
+    'has_musculoskeletal_symptoms', 'has_endocrine_symptoms',
+    'has_severe_indicators', 'has_mild_indicators', 'has_chronic_indicators'
+]
+
+def add_engineered_features(df):
+    """Add body system, severity and diversity features to a DataFrame"""
+    # Create body system features
+    for system, keywords in BODY_SYSTEMS.items():
+        df[f'has_{system}_symptoms'] = df['symptoms_text'].apply(
+            lambda x: any(keyword in x for keyword in keywords)
+        ).astype(int)
+    
+    for severity, keywords in SEVERITY_INDICATORS.items():
+        df[f'has_{severity}_indicators'] = df['symptoms_text'].apply(
+            lambda x: any(keyword in x for keyword in keywords)
+        ).astype(int)
+    
+    # Symptom diversity
+    system_columns = [f'has_{system}_symptoms' for system in BODY_SYSTEMS]
+    df['symptom_diversity'] = df[system_columns].sum(axis=1)
+    
+    return df
+
+def compute_row_keys(df):
+    """Content hash of the inputs every feature of a row is derived from"""
+    return np.array([
+        hashlib.blake2b(f'{text}\x1f{count}'.encode('utf-8'), digest_size=16).digest()
+        for text, count in zip(df['symptoms_text'], df['symptom_count'])
+    ], dtype='S16')
+
+def compute_vectorizer_version(vectorizer_path):
+    """Content hash of the saved vectorizer artifact the features were produced with"""
+    with open(vectorizer_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_cached_rows(store, vectorizer_version, tfidf_columns):
+    """Load cached feature rows keyed by content hash, or None if unusable"""
+    if not store.exists():
+        return None
+    
+    manifest = store.read_manifest()
+    if (manifest.get('vectorizer_version') != vectorizer_version
+            or manifest['tfidf']['feature_names'] != tfidf_columns
+            or manifest['engineered']['columns'] != ENGINEERED_FEATURES
+            or 'row_keys' not in manifest['arrays']):
+        print("Cached features were built with a different vectorizer - rebuilding all rows")
+        return None
+    
+    tfidf_matrix, engineered, _, _ = store.load()
+    row_keys = store.load_row_keys()
+    return {
+        'tfidf': tfidf_matrix,
+        'engineered': np.asarray(engineered),
+        'positions': {key: i for i, key in enumerate(row_keys.tolist())}
+    }
+
+def save_preprocessors_and_metadata(tfidf_vectorizer, label_encoder, num_samples, feature_names,
+                                    num_classes, augmentation_breakdown, output_dir='augmented_data'):
+    """Save the preprocessors and metadata that accompany the augmented features"""
+    save_vectorizer(tfidf_vectorizer, output_dir)
+    
+    with open(f'{output_dir}/label_encoder.pkl', 'wb') as f:
+        pickle.dump(label_encoder, f)
+    
+    # Create metadata
+    metadata = {
+        'num_samples': num_samples,
+        'num_features': len(feature_names),
+        'num_classes': num_classes,
+        'augmentation_breakdown': {key: int(value) for key, value in augmentation_breakdown.items()},
+        'feature_names': list(feature_names),
+        'disease_classes': list(label_encoder.classes_)
+    }
+    
+    with open(f'{output_dir}/metadata.json', 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+def create_features_for_augmented_data(write_csv=False, incremental=True):
     """Create TF-IDF features for the augmented dataset"""
     print("=" * 60)
     print("CREATING FEATURES FOR AUGMENTED DATASET")
@@ -18,62 +125,62 @@ def create_features_for_augmented_data():
     
     # Load original preprocessors
     print("Loading original preprocessors...")
-    with open('processed_data/tfidf_vectorizer.pkl', 'rb') as f:
-        tfidf_vectorizer = pickle.load(f)
+    tfidf_vectorizer = load_vectorizer('processed_data')
     
     with open('processed_data/label_encoder.pkl', 'rb') as f:
         label_encoder = pickle.load(f)
     
-    # Create TF-IDF features for augmented data
-    print("Creating TF-IDF features for augmented data...")
-    tfidf_matrix = tfidf_vectorizer.transform(augmented_df['symptoms_text'])
-    
-    # Convert to DataFrame
+    vectorizer_version = compute_vectorizer_version(vectorizer_path('processed_data'))
     feature_names = tfidf_vectorizer.get_feature_names_out()
-    tfidf_df = pd.DataFrame(
-        tfidf_matrix.toarray(),
-        columns=[f'tfidf_{name}' for name in feature_names],
-        index=augmented_df.index
-    )
+    tfidf_columns = [f'tfidf_{name}' for name in feature_names]
     
-    print(f"TF-IDF features shape: {tfidf_df.shape}")
+    # Reuse feature rows whose content hash is already in the store
+    store = FeatureStore('augmented_data/feature_store')
+    row_keys = compute_row_keys(augmented_df)
+    cached = load_cached_rows(store, vectorizer_version, tfidf_columns) if incremental else None
     
-    # Create additional features for augmented data
-    print("Creating additional features...")
-    
-    # Body system features
-    body_systems = {
-        'respiratory': ['cough', 'breath', 'chest', 'lung', 'nasal', 'throat', 'sneezing'],
-        'cardiovascular': ['chest pain', 'heart', 'blood pressure', 'palpitation'],
-        'gastrointestinal': ['abdominal', 'stomach', 'nausea', 'vomiting', 'diarrhea', 'constipation', 'appetite'],
-        'genitourinary': ['urination', 'urine', 'pelvic', 'genital', 'kidney', 'bladder'],
-        'neurological': ['headache', 'dizziness', 'confusion', 'seizure', 'numbness', 'weakness'],
-        'dermatological': ['rash', 'itching', 'skin', 'lesion', 'swelling'],
-        'musculoskeletal': ['joint', 'muscle', 'bone', 'back', 'neck', 'limb'],
-        'endocrine': ['weight', 'thirst', 'urination', 'fatigue', 'temperature']
-    }
+    if cached:
+        positions = np.array([cached['positions'].get(key, -1) for key in row_keys.tolist()])
+    else:
+        positions = np.full(len(augmented_df), -1)
+    reused_mask = positions >= 0
+    new_mask = ~reused_mask
+    print(f"Reusing {int(reused_mask.sum())} cached rows, featurizing {int(new_mask.sum())} new or changed rows")
     
-    # Create body system features
-    for system, keywords in body_systems.items():
-        augmented_df[f'has_{system}_symptoms'] = augmented_df['symptoms_text'].apply(
-            lambda x: any(keyword in x for keyword in keywords)
-        ).astype(int)
+    # Create TF-IDF features for new or changed rows only
+    print("Creating TF-IDF features for augmented data...")
+    if new_mask.any():
+        new_df = add_engineered_features(augmented_df.loc[new_mask, ['symptoms_text', 'symptom_count']].copy())
+        new_tfidf = tfidf_vectorizer.transform(new_df['symptoms_text'])
+        new_engineered = new_df[ENGINEERED_FEATURES].values.astype(np.float64)
+    else:
+        # Rerun over unchanged data: every row comes from the cache
+        new_tfidf = sparse.csr_matrix((0, len(tfidf_columns)))
+        new_engineered = np.empty((0, len(ENGINEERED_FEATURES)))
     
-    # Severity indicators
-    severity_indicators = {
-        'severe': ['severe', 'intense', 'acute', 'sudden', 'high fever', 'profound'],
-        'mild': ['mild', 'low-grade', 'slight', 'minor', 'mild fever'],
-        'chronic': ['chronic', 'persistent', 'recurrent', 'ongoing', 'long-term']
-    }
+    if cached and reused_mask.any():
+        reused_positions = positions[reused_mask]
+        stacked_tfidf = sparse.vstack([cached['tfidf'][reused_positions], new_tfidf]).tocsr()
+        stacked_engineered = np.vstack([cached['engineered'][reused_positions], new_engineered])
+        
+        # Put the reused and new rows back into dataset order
+        order = np.empty(len(augmented_df), dtype=np.int64)
+        order[np.flatnonzero(reused_mask)] = np.arange(reused_mask.sum())
+        order[np.flatnonzero(new_mask)] = reused_mask.sum() + np.arange(new_mask.sum())
+        tfidf_matrix = stacked_tfidf[order]
+        engineered = stacked_engineered[order]
+    else:
+        tfidf_matrix = new_tfidf.tocsr()
+        engineered = new_engineered
     
-    for severity, keywords in severity_indicators.items():
-        augmented_df[f'has_{severity}_indicators'] = augmented_df['symptoms_text'].apply(
-            lambda x: any(keyword in x for keyword in keywords)
-        ).astype(int)
+    # Keep the TF-IDF block sparse; it is only densified if CSVs are requested
+    tfidf_df = sparse_frame(tfidf_matrix, tfidf_columns, index=augmented_df.index)
     
-    # Symptom diversity
-    system_columns = [col for col in augmented_df.columns if col.startswith('has_') and col.endswith('_symptoms')]
-    augmented_df['symptom_diversity'] = augmented_df[system_columns].sum(axis=1)
+    print(f"TF-IDF features shape: {tfidf_df.shape}")
+    
+    # Attach engineered features to the full dataset
+    for i, column in enumerate(ENGINEERED_FEATURES):
+        augmented_df[column] = engineered[:, i].astype(int)
     
     # Encode labels
     print("Encoding labels...")
@@ -81,17 +188,9 @@ def create_features_for_augmented_data():
     
     # Create final feature matrix
     print("Creating final feature matrix...")
-    engineered_features = [
-        'symptom_count', 'symptom_diversity',
-        'has_respiratory_symptoms', 'has_cardiovascular_symptoms',
-        'has_gastrointestinal_symptoms', 'has_genitourinary_symptoms',
-        'has_neurological_symptoms', 'has_dermatological_symptoms',
-        'has_musculoskeletal_symptoms', 'has_endocrine_symptoms',
-        'has_severe_indicators', 'has_mild_indicators', 'has_chronic_indicators'
-    ]
     
     # Combine TF-IDF and engineered features
-    X = pd.concat([tfidf_df, augmented_df[engineered_features]], axis=1)
+    X = pd.concat([tfidf_df, augmented_df[ENGINEERED_FEATURES]], axis=1)
     y = augmented_df['disease_encoded']
     
     print(f"Final feature matrix shape: {X.shape}")
@@ -99,44 +198,119 @@ def create_features_for_augmented_data():
     
     # Save augmented features
     print("Saving augmented features...")
-    import os
     os.makedirs('augmented_data', exist_ok=True)
     
-    X.to_csv('augmented_data/features.csv', index=False)
-    y.to_csv('augmented_data/labels.csv', index=False)
-    augmented_df.to_csv('augmented_data/processed_augmented_data.csv', index=False)
-    
-    # Save preprocessors
-    with open('augmented_data/tfidf_vectorizer.pkl', 'wb') as f:
-        pickle.dump(tfidf_vectorizer, f)
-    
-    with open('augmented_data/label_encoder.pkl', 'wb') as f:
-        pickle.dump(label_encoder, f)
+    store.write(
+        tfidf_matrix,
+        engineered,
+        y.values,
+        tfidf_columns,
+        ENGINEERED_FEATURES,
+        row_keys=row_keys,
+        extra={'vectorizer_version': vectorizer_version}
+    )
     
-    # Create metadata
-    metadata = {
-        'num_samples': len(augmented_df),
-        'num_features': X.shape[1],
-        'num_classes': len(np.unique(y)),
-        'augmentation_breakdown': augmented_df['augmentation_type'].value_counts().to_dict(),
-        'feature_names': list(X.columns),
-        'disease_classes': list(label_encoder.classes_)
-    }
+    if write_csv:
+        X.to_csv('augmented_data/features.csv', index=False)
+        y.to_csv('augmented_data/labels.csv', index=False)
+    augmented_df.to_csv('augmented_data/processed_augmented_data.csv', index=False)
     
-    with open('augmented_data/metadata.json', 'w') as f:
-        json.dump(metadata, f, indent=2)
+    save_preprocessors_and_metadata(
+        tfidf_vectorizer,
+        label_encoder,
+        num_samples=len(augmented_df),
+        feature_names=list(X.columns),
+        num_classes=len(np.unique(y)),
+        augmentation_breakdown=augmented_df['augmentation_type'].value_counts().to_dict()
+    )
     
     print("Augmented features created successfully!")
     print(f"Files saved:")
-    print(f"  - augmented_data/features.csv (feature matrix)")
-    print(f"  - augmented_data/labels.csv (encoded labels)")
+    print(f"  - augmented_data/feature_store/ (sparse feature matrix and labels)")
+    if write_csv:
+        print(f"  - augmented_data/features.csv (feature matrix)")
+        print(f"  - augmented_data/labels.csv (encoded labels)")
     print(f"  - augmented_data/processed_augmented_data.csv (full dataset)")
-    print(f"  - augmented_data/tfidf_vectorizer.pkl (TF-IDF vectorizer)")
+    print(f"  - {vectorizer_path('augmented_data')} (TF-IDF vectorizer)")
     print(f"  - augmented_data/label_encoder.pkl (label encoder)")
     print(f"  - augmented_data/metadata.json (metadata)")
     
     return X, y, augmented_df
 
+def stream_augmented_features(augmenter=None, augmentation_factor=3, shard_size=8,
+                              output_dir='augmented_data', debug_csv=False):
+    """Augment, featurize and store the dataset chunk by chunk
+    
+    Augmented shards flow straight from the augmentation engine into the
+    vectorizer and a FeatureStore writer, so memory is bounded by one shard and
+    no intermediate CSV is parsed. With ``debug_csv`` the processed chunks are
+    also appended to ``processed_augmented_data.csv`` for inspection.
+    """
+    from data_augmentation import DiseaseSymptomAugmenter
+    
+    print("=" * 60)
+    print("STREAMING AUGMENTATION -> FEATURE STORE")
+    print("=" * 60)
+    
+    tfidf_vectorizer = load_vectorizer('processed_data')
+    
+    with open('processed_data/label_encoder.pkl', 'rb') as f:
+        label_encoder = pickle.load(f)
+    
+    vectorizer_version = compute_vectorizer_version(vectorizer_path('processed_data'))
+    tfidf_columns = [f'tfidf_{name}' for name in tfidf_vectorizer.get_feature_names_out()]
+    
+    if augmenter is None:
+        augmenter = DiseaseSymptomAugmenter()
+        augmenter.load_processed_data()
+        augmenter.create_symptom_variations()
+        augmenter.create_body_system_symptoms()
+    
+    os.makedirs(output_dir, exist_ok=True)
+    writer = FeatureStore(f'{output_dir}/feature_store').writer()
+    debug_path = f'{output_dir}/processed_augmented_data.csv'
+    breakdown = Counter()
+    classes_seen = set()
+    num_samples = 0
+    
+    for chunk in augmenter.iter_augmented_chunks(augmentation_factor, shard_size=shard_size):
+        chunk = add_engineered_features(chunk)
+        chunk['disease_encoded'] = label_encoder.transform(chunk['Disease'])
+        writer.append(
+            tfidf_vectorizer.transform(chunk['symptoms_text']),
+            chunk[ENGINEERED_FEATURES].values.astype(np.float64),
+            chunk['disease_encoded'].values,
+            row_keys=compute_row_keys(chunk)
+        )
+        
+        if debug_csv:
+            chunk.to_csv(debug_path, mode='w' if num_samples == 0 else 'a',
+                         header=num_samples == 0, index=False)
+        
+        breakdown.update(chunk['augmentation_type'].value_counts().to_dict())
+        classes_seen.update(chunk['disease_encoded'].tolist())
+        num_samples += len(chunk)
+        print(f"  Featurized {num_samples} samples")
+    
+    manifest = writer.close(
+        tfidf_columns,
+        ENGINEERED_FEATURES,
+        extra={'vectorizer_version': vectorizer_version}
+    )
+    
+    save_preprocessors_and_metadata(
+        tfidf_vectorizer,
+        label_encoder,
+        num_samples=num_samples,
+        feature_names=tfidf_columns + ENGINEERED_FEATURES,
+        num_classes=len(classes_seen),
+        augmentation_breakdown=breakdown,
+        output_dir=output_dir
+    )
+    
+    print(f"Streamed {num_samples} samples into {output_dir}/feature_store/")
+    return manifest
+
 if __name__ == "__main__":
     X, y, augmented_df = create_features_for_augmented_data()
     
@@ -148,4 +322,3 @@ if __name__ == "__main__":
     print(f"Number of classes: {len(np.unique(y))}")
     print(f"Augmentation breakdown:")
     print(augmented_df['augmentation_type'].value_counts())
-
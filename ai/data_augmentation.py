@@ -1,21 +1,78 @@
 import pandas as pd
 import numpy as np
-import random
-from collections import defaultdict
+import ast
 import json
+import os
+import tempfile
+from joblib import Parallel, delayed
+from augmentation_engine import AugmentationEngine, RaggedSymptoms
+
+# Common typos and variations
+NOISE_PATTERNS = {
+    'pain': ['pian', 'pane', 'pian'],
+    'fever': ['fevr', 'fever', 'fevre'],
+    'nausea': ['nausia', 'nausa', 'nasea'],
+    'vomiting': ['vomitting', 'vomiting', 'vomiting'],
+    'fatigue': ['fatige', 'fatigue', 'fatigue'],
+    'headache': ['headach', 'headache', 'head ache'],
+    'cough': ['cough', 'coughing', 'cough'],
+    'abdominal': ['abdomnal', 'abdominal', 'abdominal'],
+    'chest': ['chest', 'chest', 'chest'],
+    'shortness': ['shortnes', 'shortness', 'shortness']
+}
+
+SHARD_KINDS = ('variation', 'partial', 'noisy')
+
+def _augment_shard_batches(symptom_lists, symptom_variations, body_system_symptoms,
+                           seed, augmentation_factor, partial_factors, noise_probability):
+    """Run every augmentation strategy over one shard with its own generator"""
+    rng = np.random.default_rng(seed)
+    engine = AugmentationEngine(symptom_lists, symptom_variations, body_system_symptoms)
+    
+    partial, factors = engine.partial_symptom_sets(partial_factors, rng)
+    batches = {
+        'variation': engine.symptom_variations(augmentation_factor, rng),
+        'partial': partial,
+        'noisy': engine.noisy_symptoms(NOISE_PATTERNS, noise_probability, rng)
+    }
+    return engine, batches, factors
+
+def _augment_shard(symptom_lists, row_offset, symptom_variations, body_system_symptoms,
+                   seed, augmentation_factor, partial_factors, noise_probability, path):
+    """Augment one shard of diseases and write its ragged outputs to ``path``"""
+    engine, batches, factors = _augment_shard_batches(
+        symptom_lists, symptom_variations, body_system_symptoms,
+        seed, augmentation_factor, partial_factors, noise_probability
+    )
+    
+    arrays = {'vocab': np.array(engine.vocab, dtype=str), 'partial_factors': factors}
+    for kind, batch in batches.items():
+        arrays[f'{kind}_ids'] = batch.ids
+        arrays[f'{kind}_offsets'] = batch.offsets
+        arrays[f'{kind}_rows'] = batch.rows + row_offset
+    np.savez(path, **arrays)
+    return path
 
 class DiseaseSymptomAugmenter:
-    def __init__(self, processed_data_path='processed_data'):
+    def __init__(self, processed_data_path='processed_data', seed=42):
         self.processed_data_path = processed_data_path
         self.df = None
+        self.symptom_lists = []
         self.symptom_variations = {}
         self.body_system_symptoms = {}
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.engine = None
         
     def load_processed_data(self):
         """Load the preprocessed data"""
         print("Loading preprocessed data...")
         self.df = pd.read_csv(f'{self.processed_data_path}/preprocessed_data.csv')
         
+        # Parse the stored symptom lists once instead of on every augmentation pass
+        self.symptom_lists = [ast.literal_eval(value) for value in self.df['symptoms_list']]
+        self.engine = None
+        
         # Load metadata
         with open(f'{self.processed_data_path}/metadata.json', 'r') as f:
             self.metadata = json.load(f)
@@ -51,6 +108,7 @@ class DiseaseSymptomAugmenter:
             'loss of appetite': ['decreased appetite', 'poor appetite', 'anorexia']
         }
         
+        self.engine = None
         print(f"Created variations for {len(self.symptom_variations)} symptoms")
         return self.symptom_variations
     
@@ -93,88 +151,62 @@ class DiseaseSymptomAugmenter:
             ]
         }
         
+        self.engine = None
         print(f"Created mappings for {len(self.body_system_symptoms)} body systems")
         return self.body_system_symptoms
     
-    def augment_symptom_list(self, symptoms_list, augmentation_factor=2):
-        """Augment a single symptom list"""
-        augmented_lists = [symptoms_list]  # Start with original
-        
-        for _ in range(augmentation_factor):
-            new_symptoms = []
-            
-            for symptom in symptoms_list:
-                # Sometimes replace with variation
-                if random.random() < 0.3 and symptom in self.symptom_variations:
-                    variation = random.choice(self.symptom_variations[symptom])
-                    new_symptoms.append(variation)
-                else:
-                    new_symptoms.append(symptom)
-            
-            # Sometimes add related symptoms from same body system
-            if random.random() < 0.4:
-                # Find which body systems are affected
-                affected_systems = []
-                for system, system_symptoms in self.body_system_symptoms.items():
-                    if any(symptom in system_symptoms for symptom in symptoms_list):
-                        affected_systems.append(system)
-                
-                # Add a related symptom
-                if affected_systems:
-                    system = random.choice(affected_systems)
-                    related_symptoms = [s for s in self.body_system_symptoms[system] 
-                                      if s not in new_symptoms]
-                    if related_symptoms:
-                        new_symptoms.append(random.choice(related_symptoms))
-            
-            # Sometimes remove a symptom (partial symptom lists)
-            if len(new_symptoms) > 3 and random.random() < 0.2:
-                new_symptoms.remove(random.choice(new_symptoms))
-            
-            # Sometimes reorder symptoms
-            if random.random() < 0.3:
-                random.shuffle(new_symptoms)
-            
-            augmented_lists.append(new_symptoms)
-        
-        return augmented_lists
+    def get_engine(self):
+        """Build (once) the vectorized augmentation engine over the loaded symptom lists"""
+        if self.engine is None:
+            self.engine = AugmentationEngine(
+                self.symptom_lists,
+                self.symptom_variations,
+                self.body_system_symptoms
+            )
+        return self.engine
+    
+    def _variation_frame(self, augmented):
+        """Interleave each original list with its augmented copies"""
+        engine = self.get_engine()
+        combined = RaggedSymptoms.concat([engine.base, augmented])
+        is_augmented = np.repeat([False, True], [len(engine.base), len(augmented)])
+        order = np.argsort(combined.rows, kind='stable')
+        
+        frame = engine.to_frame(
+            combined.take(order),
+            self.df['Disease'].values,
+            is_augmented=is_augmented[order]
+        )
+        frame['original_index'] = self.df.index.values[frame['original_index']]
+        return frame
+    
+    def _partial_frame(self, partial, factors):
+        frame = self.get_engine().to_frame(
+            partial,
+            self.df['Disease'].values,
+            is_augmented=True,
+            is_partial=True,
+            partial_factor=factors
+        )
+        frame['original_index'] = self.df.index.values[frame['original_index']]
+        return frame
+    
+    def _noisy_frame(self, noisy):
+        frame = self.get_engine().to_frame(
+            noisy,
+            self.df['Disease'].values,
+            is_augmented=True,
+            is_noisy=True
+        )
+        frame['original_index'] = self.df.index.values[frame['original_index']]
+        return frame
     
     def augment_dataset(self, augmentation_factor=3):
         """Augment the entire dataset"""
         print(f"Augmenting dataset with factor {augmentation_factor}...")
         
-        augmented_data = []
-        
-        for idx, row in self.df.iterrows():
-            disease = row['Disease']
-            symptoms_list = eval(row['symptoms_list'])  # Convert string back to list
-            
-            # Create augmented versions
-            augmented_lists = self.augment_symptom_list(symptoms_list, augmentation_factor)
-            
-            for i, aug_symptoms in enumerate(augmented_lists):
-                if i == 0:  # Original
-                    augmented_data.append({
-                        'Disease': disease,
-                        'Symptoms': '; '.join(aug_symptoms),
-                        'symptoms_list': str(aug_symptoms),
-                        'symptoms_text': ' '.join(aug_symptoms),
-                        'symptom_count': len(aug_symptoms),
-                        'is_augmented': False,
-                        'original_index': idx
-                    })
-                else:  # Augmented
-                    augmented_data.append({
-                        'Disease': disease,
-                        'Symptoms': '; '.join(aug_symptoms),
-                        'symptoms_list': str(aug_symptoms),
-                        'symptoms_text': ' '.join(aug_symptoms),
-                        'symptom_count': len(aug_symptoms),
-                        'is_augmented': True,
-                        'original_index': idx
-                    })
-        
-        self.augmented_df = pd.DataFrame(augmented_data)
+        augmented = self.get_engine().symptom_variations(augmentation_factor, self.rng)
+        self.augmented_df = self._variation_frame(augmented)
         print(f"Dataset augmented: {len(self.augmented_df)} total samples")
         print(f"  Original: {len(self.augmented_df[~self.augmented_df['is_augmented']])}")
         print(f"  Augmented: {len(self.augmented_df[self.augmented_df['is_augmented']])}")
@@ -185,30 +217,8 @@ class DiseaseSymptomAugmenter:
         """Create partial symptom sets for more realistic scenarios"""
         print("Creating partial symptom sets...")
         
-        partial_data = []
-        
-        for idx, row in self.df.iterrows():
-            disease = row['Disease']
-            symptoms_list = eval(row['symptoms_list'])
-            
-            for factor in partial_factors:
-                # Select a subset of symptoms
-                num_symptoms = max(2, int(len(symptoms_list) * factor))
-                partial_symptoms = random.sample(symptoms_list, num_symptoms)
-                
-                partial_data.append({
-                    'Disease': disease,
-                    'Symptoms': '; '.join(partial_symptoms),
-                    'symptoms_list': str(partial_symptoms),
-                    'symptoms_text': ' '.join(partial_symptoms),
-                    'symptom_count': len(partial_symptoms),
-                    'is_augmented': True,
-                    'is_partial': True,
-                    'partial_factor': factor,
-                    'original_index': idx
-                })
-        
-        self.partial_df = pd.DataFrame(partial_data)
+        partial, factors = self.get_engine().partial_symptom_sets(partial_factors, self.rng)
+        self.partial_df = self._partial_frame(partial, factors)
         print(f"Created {len(self.partial_df)} partial symptom sets")
         
         return self.partial_df
@@ -217,50 +227,110 @@ class DiseaseSymptomAugmenter:
         """Create noisy versions with typos and variations"""
         print("Creating noisy symptom versions...")
         
-        # Common typos and variations
-        noise_patterns = {
-            'pain': ['pian', 'pane', 'pian'],
-            'fever': ['fevr', 'fever', 'fevre'],
-            'nausea': ['nausia', 'nausa', 'nasea'],
-            'vomiting': ['vomitting', 'vomiting', 'vomiting'],
-            'fatigue': ['fatige', 'fatigue', 'fatigue'],
-            'headache': ['headach', 'headache', 'head ache'],
-            'cough': ['cough', 'coughing', 'cough'],
-            'abdominal': ['abdomnal', 'abdominal', 'abdominal'],
-            'chest': ['chest', 'chest', 'chest'],
-            'shortness': ['shortnes', 'shortness', 'shortness']
-        }
-        
-        noisy_data = []
-        
-        for idx, row in self.df.iterrows():
-            disease = row['Disease']
-            symptoms_list = eval(row['symptoms_list'])
-            
-            # Create noisy version
-            noisy_symptoms = []
-            for symptom in symptoms_list:
-                if random.random() < noise_probability and symptom in noise_patterns:
-                    noisy_symptoms.append(random.choice(noise_patterns[symptom]))
-                else:
-                    noisy_symptoms.append(symptom)
-            
-            noisy_data.append({
-                'Disease': disease,
-                'Symptoms': '; '.join(noisy_symptoms),
-                'symptoms_list': str(noisy_symptoms),
-                'symptoms_text': ' '.join(noisy_symptoms),
-                'symptom_count': len(noisy_symptoms),
-                'is_augmented': True,
-                'is_noisy': True,
-                'original_index': idx
-            })
-        
-        self.noisy_df = pd.DataFrame(noisy_data)
+        noisy = self.get_engine().noisy_symptoms(NOISE_PATTERNS, noise_probability, self.rng)
+        self.noisy_df = self._noisy_frame(noisy)
         print(f"Created {len(self.noisy_df)} noisy symptom versions")
         
         return self.noisy_df
     
+    def _shard_plan(self, shard_size):
+        """Fixed shard boundaries and one spawned seed per shard"""
+        num_rows = len(self.symptom_lists)
+        bounds = list(range(0, num_rows, shard_size)) + [num_rows]
+        return bounds, np.random.SeedSequence(self.seed).spawn(len(bounds) - 1)
+    
+    def augment_sharded(self, augmentation_factor=3, partial_factors=[0.6, 0.7, 0.8],
+                        noise_probability=0.1, n_jobs=-1, shard_size=8, shard_dir=None):
+        """Run all augmentation strategies over disease shards in a process pool
+        
+        Shard boundaries depend only on ``shard_size`` and every shard draws from
+        its own generator spawned from the master seed, so the merged result is
+        bit-identical for any ``n_jobs``.
+        """
+        num_rows = len(self.symptom_lists)
+        bounds, shard_seeds = self._shard_plan(shard_size)
+        print(f"Augmenting {num_rows} diseases in {len(shard_seeds)} shards "
+              f"(factor {augmentation_factor}, n_jobs={n_jobs})...")
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            shard_dir = shard_dir or tmp_dir
+            os.makedirs(shard_dir, exist_ok=True)
+            shard_paths = Parallel(n_jobs=n_jobs)(
+                delayed(_augment_shard)(
+                    self.symptom_lists[start:end],
+                    start,
+                    self.symptom_variations,
+                    self.body_system_symptoms,
+                    shard_seed,
+                    augmentation_factor,
+                    partial_factors,
+                    noise_probability,
+                    os.path.join(shard_dir, f'shard_{i:05d}.npz')
+                )
+                for i, (start, end, shard_seed) in enumerate(zip(bounds[:-1], bounds[1:], shard_seeds))
+            )
+            
+            # Merge shards in shard order, remapping shard-local ids to the global vocabulary
+            engine = self.get_engine()
+            merged = {kind: [] for kind in SHARD_KINDS}
+            partial_factor_parts = []
+            for path in shard_paths:
+                with np.load(path) as shard:
+                    remap = np.array([engine.intern(symptom) for symptom in shard['vocab'].tolist()], dtype=np.int32)
+                    for kind in SHARD_KINDS:
+                        merged[kind].append(RaggedSymptoms(
+                            remap[shard[f'{kind}_ids']],
+                            shard[f'{kind}_offsets'],
+                            shard[f'{kind}_rows']
+                        ))
+                    partial_factor_parts.append(shard['partial_factors'])
+        
+        merged = {kind: RaggedSymptoms.concat(batches) for kind, batches in merged.items()}
+        self.augmented_df = self._variation_frame(merged['variation'])
+        self.partial_df = self._partial_frame(merged['partial'], np.concatenate(partial_factor_parts))
+        self.noisy_df = self._noisy_frame(merged['noisy'])
+        print(f"Merged {len(shard_paths)} shards: {len(self.augmented_df)} variation, "
+              f"{len(self.partial_df)} partial, {len(self.noisy_df)} noisy samples")
+        
+        return self.augmented_df, self.partial_df, self.noisy_df
+    
+    def iter_augmented_chunks(self, augmentation_factor=3, partial_factors=[0.6, 0.7, 0.8],
+                              noise_probability=0.1, shard_size=8):
+        """Yield the combined dataset one disease shard at a time
+        
+        Each chunk holds the original rows of a shard followed by its variation,
+        partial and noisy samples, with the same columns as ``combined_df``.
+        Shards use the seeds of ``augment_sharded``, so the chunks contain the
+        same samples it produces for an equal ``shard_size``.
+        """
+        bounds, shard_seeds = self._shard_plan(shard_size)
+        diseases = self.df['Disease'].values
+        
+        for start, end, shard_seed in zip(bounds[:-1], bounds[1:], shard_seeds):
+            engine, batches, factors = _augment_shard_batches(
+                self.symptom_lists[start:end],
+                self.symptom_variations,
+                self.body_system_symptoms,
+                shard_seed,
+                augmentation_factor,
+                partial_factors,
+                noise_probability
+            )
+            shard_diseases = diseases[start:end]
+            chunk = pd.concat([
+                engine.to_frame(engine.base, shard_diseases,
+                                is_augmented=False, augmentation_type='original'),
+                engine.to_frame(batches['variation'], shard_diseases,
+                                is_augmented=True, augmentation_type='symptom_variation'),
+                engine.to_frame(batches['partial'], shard_diseases,
+                                is_augmented=True, is_partial=True, partial_factor=factors,
+                                augmentation_type='partial_symptoms'),
+                engine.to_frame(batches['noisy'], shard_diseases,
+                                is_augmented=True, is_noisy=True, augmentation_type='noisy_symptoms')
+            ], ignore_index=True)
+            chunk['original_index'] = self.df.index.values[chunk['original_index'] + start]
+            yield chunk
+    
     def combine_all_augmentations(self):
         """Combine all augmentation strategies"""
         print("Combining all augmentation strategies...")
@@ -341,8 +411,12 @@ class DiseaseSymptomAugmenter:
         print(f"  - {output_dir}/noisy_symptoms.csv (noisy symptom versions)")
         print(f"  - {output_dir}/augmentation_metadata.json (augmentation metadata)")
     
-    def run_full_augmentation(self, augmentation_factor=3):
-        """Run the complete augmentation pipeline"""
+    def run_full_augmentation(self, augmentation_factor=3, n_jobs=None, shard_size=8):
+        """Run the complete augmentation pipeline
+        
+        With ``n_jobs`` set, diseases are augmented in seeded shards across a
+        process pool (see ``augment_sharded``); otherwise in a single process.
+        """
         print("=" * 60)
         print("DISEASE-SYMPTOM DATA AUGMENTATION PIPELINE")
         print("=" * 60)
@@ -355,9 +429,12 @@ class DiseaseSymptomAugmenter:
         self.create_body_system_symptoms()
         
         # Apply augmentation strategies
-        self.augment_dataset(augmentation_factor)
-        self.create_partial_symptom_sets()
-        self.create_noisy_symptoms()
+        if n_jobs is not None:
+            self.augment_sharded(augmentation_factor, n_jobs=n_jobs, shard_size=shard_size)
+        else:
+            self.augment_dataset(augmentation_factor)
+            self.create_partial_symptom_sets()
+            self.create_noisy_symptoms()
         
         # Combine all augmentations
         self.combine_all_augmentations()
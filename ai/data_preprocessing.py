@@ -5,8 +5,14 @@ import string
 from collections import Counter
 import pickle
 import json
+import os
+import hashlib
+import sklearn
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import LabelEncoder
+from feature_store import sparse_frame
+from hashing_features import HashedTfidfVectorizer, save_vectorizer
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
@@ -29,7 +35,13 @@ except LookupError:
     nltk.download('wordnet')
 
 class DiseaseSymptomPreprocessor:
-    def __init__(self):
+    FEATURE_MODES = ('tfidf', 'hashing')
+    
+    def __init__(self, feature_mode='tfidf', hashing_features=2 ** 12):
+        if feature_mode not in self.FEATURE_MODES:
+            raise ValueError(f"feature_mode must be one of {self.FEATURE_MODES}, got {feature_mode!r}")
+        self.feature_mode = feature_mode
+        self.hashing_features = hashing_features
         self.lemmatizer = WordNetLemmatizer()
         self.stop_words = set(stopwords.words('english'))
         # Medical terms that should not be removed as stop words
@@ -147,33 +159,89 @@ class DiseaseSymptomPreprocessor:
         
         return self.df
     
-    def create_tfidf_features(self, max_features=1000, min_df=1, max_df=0.95):
-        """Create TF-IDF features from symptoms"""
-        print("Creating TF-IDF features...")
-        
-        self.tfidf_vectorizer = TfidfVectorizer(
-            max_features=max_features,
-            min_df=min_df,
-            max_df=max_df,
-            stop_words=list(self.stop_words),
-            ngram_range=(1, 2),  # Include unigrams and bigrams
-            lowercase=True
-        )
-        
-        # Fit and transform symptoms
-        tfidf_matrix = self.tfidf_vectorizer.fit_transform(self.df['symptoms_text'])
-        
-        # Convert to DataFrame for easier handling
+    def tfidf_cache_key(self, texts, params):
+        """Hash of the corpus and vectorizer parameters identifying a fitted TF-IDF"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(params, sort_keys=True, default=list).encode('utf-8'))
+        digest.update(sklearn.__version__.encode('utf-8'))
+        for text in texts:
+            digest.update(b'\x1e')
+            digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def create_tfidf_features(self, max_features=1000, min_df=1, max_df=0.95,
+                              cache_dir='processed_data/tfidf_cache'):
+        """Create TF-IDF features from symptoms
+        
+        The fitted vectorizer and its sparse matrix are cached under a hash of the
+        corpus and parameters, so an unchanged corpus is never refit. Pass
+        ``cache_dir=None`` to always fit.
+        """
+        print(f"Creating TF-IDF features ({self.feature_mode} mode)...")
+        
+        params = {
+            'feature_mode': self.feature_mode,
+            'hashing_features': self.hashing_features,
+            'max_features': max_features,
+            'min_df': min_df,
+            'max_df': max_df,
+            'stop_words': sorted(self.stop_words),
+            'ngram_range': (1, 2),  # Include unigrams and bigrams
+            'lowercase': True
+        }
+        texts = self.df['symptoms_text'].tolist()
+        
+        cache_key = self.tfidf_cache_key(texts, params) if cache_dir else None
+        vectorizer_path = os.path.join(cache_dir, f'{cache_key}.pkl') if cache_dir else None
+        matrix_path = os.path.join(cache_dir, f'{cache_key}.npz') if cache_dir else None
+        
+        cached = bool(cache_dir) and os.path.exists(vectorizer_path) and os.path.exists(matrix_path)
+        if cached:
+            print(f"Loading cached TF-IDF ({cache_key[:12]})...")
+            with open(vectorizer_path, 'rb') as f:
+                self.tfidf_vectorizer = pickle.load(f)
+            tfidf_matrix = sparse.load_npz(matrix_path).tocsr()
+        elif self.feature_mode == 'hashing':
+            # Stateless hashing with a stored IDF array; vocabulary limits do not apply
+            self.tfidf_vectorizer = HashedTfidfVectorizer(
+                n_features=self.hashing_features,
+                ngram_range=params['ngram_range'],
+                stop_words=self.stop_words,
+                lowercase=params['lowercase']
+            )
+        else:
+            self.tfidf_vectorizer = TfidfVectorizer(
+                max_features=max_features,
+                min_df=min_df,
+                max_df=max_df,
+                stop_words=list(self.stop_words),
+                ngram_range=params['ngram_range'],
+                lowercase=params['lowercase']
+            )
+        
+        if not cached:
+            # Fit and transform symptoms
+            tfidf_matrix = self.tfidf_vectorizer.fit_transform(texts).tocsr()
+            
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+                sparse.save_npz(matrix_path, tfidf_matrix)
+                with open(vectorizer_path, 'wb') as f:
+                    pickle.dump(self.tfidf_vectorizer, f)
+        
+        self.tfidf_matrix = tfidf_matrix
+        
+        # Keep the DataFrame sparse-backed; no dense copy of the matrix is made
         feature_names = self.tfidf_vectorizer.get_feature_names_out()
-        self.tfidf_df = pd.DataFrame(
-            tfidf_matrix.toarray(),
-            columns=[f'tfidf_{name}' for name in feature_names],
+        self.tfidf_df = sparse_frame(
+            tfidf_matrix,
+            [f'tfidf_{name}' for name in feature_names],
             index=self.df.index
         )
         
         print(f"TF-IDF features created: {tfidf_matrix.shape}")
         print(f"Top 10 most important features:")
-        feature_importance = np.mean(tfidf_matrix.toarray(), axis=0)
+        feature_importance = np.asarray(tfidf_matrix.mean(axis=0)).ravel()
         top_features_idx = np.argsort(feature_importance)[-10:][::-1]
         for idx in top_features_idx:
             print(f"  {feature_names[idx]}: {feature_importance[idx]:.4f}")
@@ -277,7 +345,6 @@ class DiseaseSymptomPreprocessor:
     
     def save_processed_data(self, X, y, output_dir='processed_data'):
         """Save processed data and preprocessors"""
-        import os
         os.makedirs(output_dir, exist_ok=True)
         
         print(f"Saving processed data to {output_dir}/...")
@@ -291,8 +358,7 @@ class DiseaseSymptomPreprocessor:
         
         # Save preprocessors
         if self.tfidf_vectorizer:
-            with open(f'{output_dir}/tfidf_vectorizer.pkl', 'wb') as f:
-                pickle.dump(self.tfidf_vectorizer, f)
+            save_vectorizer(self.tfidf_vectorizer, output_dir)
         
         if self.label_encoder:
             with open(f'{output_dir}/label_encoder.pkl', 'wb') as f:
@@ -302,6 +368,7 @@ class DiseaseSymptomPreprocessor:
         metadata = {
             'num_diseases': len(self.df),
             'num_features': X.shape[1],
+            'feature_mode': self.feature_mode,
             'feature_names': list(X.columns),
             'disease_classes': list(self.label_encoder.classes_) if self.label_encoder else [],
             'medical_synonyms': self.medical_synonyms,
@@ -325,7 +392,10 @@ class DiseaseSymptomPreprocessor:
         print(f"  - {output_dir}/features.csv (feature matrix)")
         print(f"  - {output_dir}/labels.csv (encoded labels)")
         print(f"  - {output_dir}/preprocessed_data.csv (full preprocessed dataset)")
-        print(f"  - {output_dir}/tfidf_vectorizer.pkl (TF-IDF vectorizer)")
+        if self.feature_mode == 'hashing':
+            print(f"  - {output_dir}/hashed_tfidf.npz (hashing vectorizer IDF weights)")
+        else:
+            print(f"  - {output_dir}/tfidf_vectorizer.pkl (TF-IDF vectorizer)")
         print(f"  - {output_dir}/label_encoder.pkl (label encoder)")
         print(f"  - {output_dir}/metadata.json (preprocessing metadata)")
     
@@ -342,7 +412,7 @@ class DiseaseSymptomPreprocessor:
         self.preprocess_symptoms()
         
         # Create TF-IDF features
-        self.create_tfidf_features()
+        self.create_tfidf_features(cache_dir=f'{output_dir}/tfidf_cache')
         
         # Encode labels
         self.encode_labels()
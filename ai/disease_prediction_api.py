@@ -2,25 +2,184 @@ from flask import Flask, request, jsonify, render_template_string
 from flask_cors import CORS
 from disease_predictor import DiseasePredictor
 from medical_dictionary import MedicalDictionary
-import json
+from serialization import install
+from response_cache import ResponseCache
+from result_sink import sink_from_env
+from history_store import history_store_from_env, NullHistoryStore
+from supabase_auth import authenticated_user_id
+from micro_batcher import MicroBatcher
+from functools import lru_cache
 import os
+import time
 from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+install(app)  # Fast JSON encoding and gzip/brotli responses
 
-# Initialize the disease predictor
-predictor = DiseasePredictor()
+# Initialize the disease predictor ('full', 'student' or 'cascade')
+predictor = DiseasePredictor(serving_profile=os.environ.get('SERVING_PROFILE', 'full'))
 
 # Initialize the medical dictionary
 medical_dict = MedicalDictionary()
 
+# Comprehensive-analysis results are appended in the background
+# (RESULT_SINK=jsonl|sqlite|none, RESULT_SINK_PATH, RESULT_SINK_QUEUE)
+result_sink = sink_from_env()
+
+# Concurrent single predictions share one predict_batch pass
+# (MICRO_BATCH_SIZE <= 1 disables batching)
+MICRO_BATCH_SIZE = int(os.environ.get('MICRO_BATCH_SIZE', 32))
+micro_batcher = MicroBatcher(
+    predictor, max_batch_size=MICRO_BATCH_SIZE,
+    max_wait_ms=float(os.environ.get('MICRO_BATCH_WAIT_MS', 2.0))
+) if MICRO_BATCH_SIZE > 1 else None
+
+# Per-user prediction history, inserted in batches off the request path
+# (HISTORY_STORE=sqlite|none, HISTORY_DB_PATH). Off by default; rows are only
+# recorded for, and only readable by, the user of a verified Supabase JWT
+# (SUPABASE_JWT_SECRET), matching the auth.uid() policy on symptom_analysis_history
+SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET')
+if SUPABASE_JWT_SECRET:
+    history_store = history_store_from_env()
+else:
+    if os.environ.get('HISTORY_STORE', 'none').lower() != 'none':
+        print("Warning: HISTORY_STORE is set but SUPABASE_JWT_SECRET is not; history is disabled.")
+    history_store = NullHistoryStore()
+
+# Memoized responses of the read-only dictionary and model endpoints
+response_cache = ResponseCache(max_age=int(os.environ.get('API_CACHE_MAX_AGE', 300)))
+
 # Load models on startup
 if not predictor.load_models():
     print("Warning: Failed to load models. API may not work correctly.")
 
 print(f"Medical Dictionary loaded with {len(medical_dict.get_all_diseases())} diseases")
 
+
+def _predict_one(symptoms, top_k):
+    """Single prediction, through the micro-batcher when it is enabled"""
+    if micro_batcher is not None:
+        return micro_batcher.predict(symptoms, top_k=top_k)
+    return predictor.predict_disease(symptoms, top_k=top_k)
+
+def _authenticated_user_id():
+    """User id of the request's verified Supabase JWT, or None"""
+    return authenticated_user_id(request.headers.get('Authorization'), SUPABASE_JWT_SECRET)
+
+def _record_history(results, latency_ms):
+    """Queue predictions for the authenticated user; anonymous calls are not recorded"""
+    user_id = _authenticated_user_id()
+    if user_id is not None:
+        for result in results:
+            history_store.record(user_id, result, latency_ms)
+
+def _dictionary_version():
+    return medical_dict.content_version()
+
+def _model_version():
+    return predictor.model_version or 'unloaded'
+
+@lru_cache(maxsize=4096)
+def _enrichment(disease_name, version=None):
+    """medical_info and care_plan of a disease (keyed by dictionary version); treat as read-only"""
+    return medical_dict.get_disease_info(disease_name), medical_dict.get_care_plan(disease_name)
+
+# Per-prediction fields each /predict profile returns ('full' is the default)
+PREDICTION_FIELDS = ('rank', 'disease', 'percentage', 'confidence', 'medical_info', 'care_plan', 'urgency_level')
+PREDICTION_PROFILES = {
+    'minimal': ('rank', 'disease', 'confidence'),
+    'standard': ('rank', 'disease', 'percentage', 'confidence', 'urgency_level'),
+    'full': PREDICTION_FIELDS
+}
+
+# Sections /comprehensive-analysis computes for each profile
+ANALYSIS_SECTIONS = ('disease_information', 'nutritional_recommendations', 'medical_terminology')
+ANALYSIS_PROFILES = {
+    'minimal': (),
+    'standard': ('disease_information', 'medical_terminology'),
+    'full': ANALYSIS_SECTIONS
+}
+
+def _requested_fields(data, profiles, allowed):
+    """Profile name and fields selected by a request's ``profile``/``fields`` options
+    
+    An explicit ``fields`` list takes precedence over the profile's fields.
+    Raises ValueError for unknown profiles or fields.
+    """
+    profile = data.get('profile', 'full')
+    if profile not in profiles:
+        raise ValueError(f"profile must be one of {list(profiles)}")
+    fields = data.get('fields')
+    if fields is None:
+        return profile, profiles[profile]
+    if not isinstance(fields, list) or not all(isinstance(f, str) and f in allowed for f in fields):
+        raise ValueError(f"fields must be a list drawn from {list(allowed)}")
+    return profile, tuple(field for field in allowed if field in fields)
+
+def _analysis_request(data):
+    """Validated symptoms text and requested sections of a comprehensive-analysis body
+    
+    Raises:
+        ValueError: With the message to return as a 400
+    """
+    if not data or 'symptoms' not in data:
+        raise ValueError('Symptoms are required')
+    
+    symptoms = data['symptoms'].strip()
+    
+    if not symptoms:
+        raise ValueError('Symptoms cannot be empty')
+    
+    # Sections to compute (defaults to every section)
+    _, sections = _requested_fields(data, ANALYSIS_PROFILES, ANALYSIS_SECTIONS)
+    return symptoms, sections
+
+def _comprehensive_result(prediction_result, sections, disease_info, nutrition_recs):
+    """Assemble the comprehensive-analysis payload for the top prediction"""
+    top_disease = prediction_result.get('predicted_disease', '')
+    comprehensive_result = {
+        'input_symptoms': prediction_result.get('input_symptoms', []),
+        'prediction': {
+            'disease': top_disease,
+            'confidence': prediction_result.get('confidence', 0.0),
+            'all_predictions': prediction_result.get('top_k_predictions', [])
+        },
+        'timestamp': datetime.now().isoformat(),
+        'version': '2.0 - Comprehensive Analysis'
+    }
+    for section in sections:
+        comprehensive_result[section] = {}
+    
+    if top_disease and sections:
+        # Get disease information
+        if 'disease_information' in sections:
+            comprehensive_result['disease_information'] = disease_info.get('disease_info', {})
+        
+        # Get nutritional recommendations
+        if 'nutritional_recommendations' in sections:
+            comprehensive_result['nutritional_recommendations'] = nutrition_recs
+        
+        # Get medical terminology for the disease
+        if 'medical_terminology' in sections:
+            medical_terms = {}
+            if disease_info.get('disease_info'):
+                disease_data = disease_info['disease_info']
+                # Extract medical terms from disease information
+                medical_terms = {
+                    'disease_name': disease_data.get('disease_name', ''),
+                    'medical_definition': disease_data.get('medical_definition', ''),
+                    'body_system': disease_data.get('body_system', ''),
+                    'severity_level': disease_data.get('severity_level', ''),
+                    'common_symptoms': disease_data.get('common_symptoms', []),
+                    'causes': disease_data.get('causes', []),
+                    'risk_factors': disease_data.get('risk_factors', [])
+                }
+            
+            comprehensive_result['medical_terminology'] = medical_terms
+    
+    return comprehensive_result
+
 def _determine_urgency_level(confidence_percentage, disease_name):
     """
     Determine urgency level based on confidence and disease type
@@ -327,6 +486,7 @@ def index():
 @app.route('/predict', methods=['POST'])
 def predict():
     """API endpoint for disease prediction with medical dictionary integration"""
+    started = time.perf_counter()
     try:
         # DEBUG: Log incoming request
         print(f"\n🔍 DEBUG: Received request to /predict")
@@ -363,28 +523,32 @@ def predict():
         
         print(f"🔍 DEBUG: Using top_k: {top_k}")
         
+        # Response profile / field selection (defaults to the full response)
+        try:
+            profile, fields = _requested_fields(data, PREDICTION_PROFILES, PREDICTION_FIELDS)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         # Make prediction
         print(f"🔍 DEBUG: Calling predictor.predict_disease...")
-        prediction_result = predictor.predict_disease(symptoms, top_k=top_k)
+        prediction_result = _predict_one(symptoms, top_k)
         print(f"🔍 DEBUG: Prediction result: {prediction_result}")
         
-        # Enhance with medical dictionary information
+        # Enhance with medical dictionary information, only for requested fields
         enhanced_predictions = []
         for pred in prediction_result.get('top_k_predictions', []):
             disease_name = pred['disease']
             
-            # Get comprehensive medical information
-            medical_info = medical_dict.get_comprehensive_info(disease_name)
-            
-            enhanced_pred = {
-                'rank': pred['rank'],
-                'disease': disease_name,
-                'percentage': pred['percentage'],
-                'confidence': pred['percentage'] / 100.0,
-                'medical_info': medical_info.get('disease_info'),
-                'care_plan': medical_info.get('care_plan'),
-                'urgency_level': _determine_urgency_level(pred['percentage'], disease_name)
-            }
+            enhanced_pred = {}
+            for field in fields:
+                if field in ('medical_info', 'care_plan'):
+                    # Get comprehensive medical information (looked up once per disease)
+                    medical_info, care_plan = _enrichment(disease_name, _dictionary_version())
+                    enhanced_pred[field] = medical_info if field == 'medical_info' else care_plan
+                elif field == 'urgency_level':
+                    enhanced_pred[field] = _determine_urgency_level(pred['percentage'], disease_name)
+                else:
+                    enhanced_pred[field] = pred[field]
             
             enhanced_predictions.append(enhanced_pred)
         
@@ -398,15 +562,87 @@ def predict():
             'medical_disclaimer': 'This analysis is for informational purposes only. Always consult with a healthcare professional for proper diagnosis and treatment.',
             'version': '2.0 - Enhanced with Medical Dictionary'
         }
+        if profile == 'minimal':
+            # The echo of the input and the timestamp are the only optional
+            # top-level fields; the disclaimer is returned with every profile
+            del enhanced_result['input_symptoms'], enhanced_result['timestamp']
         
         print(f"🔍 DEBUG: Enhanced result: {enhanced_result}")
         print(f"✅ DEBUG: Sending response with {len(enhanced_predictions)} predictions")
         
+        _record_history([prediction_result], 1000 * (time.perf_counter() - started))
+        
         return jsonify(enhanced_result)
         
     except Exception as e:
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
+@app.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    """Predict diseases for a list of symptom texts in one model pass"""
+    started = time.perf_counter()
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('symptoms'), list) or not data['symptoms']:
+            return jsonify({'error': 'Symptoms must be a non-empty list'}), 400
+        
+        symptoms_batch = []
+        for i, symptoms in enumerate(data['symptoms']):
+            symptoms = symptoms.strip() if isinstance(symptoms, str) else ''
+            validation = predictor.validate_symptoms(symptoms)
+            if not validation['valid']:
+                return jsonify({
+                    'error': f"Entry {i}: {validation['message']}",
+                    'index': i,
+                    'suggestions': validation['suggestions']
+                }), 400
+            symptoms_batch.append(symptoms)
+        
+        top_k = data.get('top_k', 5)
+        if not isinstance(top_k, int) or top_k < 1 or top_k > 10:
+            top_k = 5
+        
+        results = predictor.predict_batch(symptoms_batch, top_k=top_k)
+        
+        _record_history(results, 1000 * (time.perf_counter() - started))
+        
+        return jsonify({
+            'results': results,
+            'count': len(results),
+            'medical_disclaimer': 'This analysis is for informational purposes only. Always consult with a healthcare professional for proper diagnosis and treatment.'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Batch prediction failed: {str(e)}'}), 500
+
+@app.route('/history', methods=['GET'])
+def get_history():
+    """Paginated prediction history of the authenticated user, newest first"""
+    try:
+        if isinstance(history_store, NullHistoryStore):
+            return jsonify({'error': 'History is disabled'}), 404
+        
+        user_id = _authenticated_user_id()
+        if user_id is None:
+            return jsonify({'error': 'A valid Supabase access token is required'}), 401
+        
+        limit = request.args.get('limit', 20, type=int)
+        if limit is None or limit < 1 or limit > 100:
+            return jsonify({'error': 'limit must be between 1 and 100'}), 400
+        
+        page = history_store.history(user_id, limit=limit, cursor=request.args.get('cursor'))
+        
+        return jsonify({
+            'user_id': user_id,
+            'items': page['items'],
+            'count': len(page['items']),
+            'next_cursor': page['next_cursor']
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get history: {str(e)}'}), 500
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
@@ -416,7 +652,19 @@ def health():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/metrics')
+def metrics():
+    """Serving counters, including cascade depth per request"""
+    metrics = predictor.get_metrics()
+    metrics['response_cache'] = response_cache.stats()
+    metrics['result_sink'] = result_sink.stats()
+    metrics['history_store'] = history_store.stats()
+    if micro_batcher is not None:
+        metrics['micro_batcher'] = micro_batcher.stats()
+    return jsonify(metrics)
+
 @app.route('/models')
+@response_cache.cached(_model_version)
 def models():
     """Get information about loaded models"""
     return jsonify({
@@ -443,6 +691,7 @@ def validate_symptoms():
         return jsonify({'error': f'Validation failed: {str(e)}'}), 500
 
 @app.route('/disease/<disease_name>', methods=['GET'])
+@response_cache.cached(_dictionary_version)
 def get_disease_info(disease_name):
     """Get comprehensive disease information"""
     try:
@@ -457,6 +706,7 @@ def get_disease_info(disease_name):
         return jsonify({'error': f'Failed to get disease information: {str(e)}'}), 500
 
 @app.route('/diseases', methods=['GET'])
+@response_cache.cached(_dictionary_version)
 def get_all_diseases():
     """Get list of all available diseases"""
     try:
@@ -496,6 +746,7 @@ def search_diseases():
         return jsonify({'error': f'Search failed: {str(e)}'}), 500
 
 @app.route('/care-plan/<disease_name>', methods=['GET'])
+@response_cache.cached(_dictionary_version)
 def get_care_plan(disease_name):
     """Get care plan for a specific disease"""
     try:
@@ -529,6 +780,7 @@ def get_food_nutrition(food_name):
         return jsonify({'error': f'Failed to get nutrition information: {str(e)}'}), 500
 
 @app.route('/health-tips/<condition>', methods=['GET'])
+@response_cache.cached(_dictionary_version)
 def get_health_tips(condition):
     """Get health tips for a specific condition"""
     try:
@@ -573,65 +825,25 @@ def get_enhanced_disease_info(disease_name):
 def comprehensive_analysis():
     """Get comprehensive analysis with predicted disease, nutrition, and medical terminology"""
     try:
-        data = request.get_json()
-        
-        if not data or 'symptoms' not in data:
-            return jsonify({'error': 'Symptoms are required'}), 400
-        
-        symptoms = data['symptoms'].strip()
-        
-        if not symptoms:
-            return jsonify({'error': 'Symptoms cannot be empty'}), 400
+        try:
+            symptoms, sections = _analysis_request(request.get_json())
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Get disease prediction
-        prediction_result = predictor.predict_disease(symptoms, top_k=3)
+        prediction_result = _predict_one(symptoms, 3)
         
-        # Get comprehensive information for top prediction
         top_disease = prediction_result.get('predicted_disease', '')
-        comprehensive_result = {
-            'input_symptoms': prediction_result.get('input_symptoms', []),
-            'prediction': {
-                'disease': top_disease,
-                'confidence': prediction_result.get('confidence', 0.0),
-                'all_predictions': prediction_result.get('top_k_predictions', [])
-            },
-            'disease_information': {},
-            'nutritional_recommendations': {},
-            'medical_terminology': {},
-            'timestamp': datetime.now().isoformat(),
-            'version': '2.0 - Comprehensive Analysis'
-        }
-        
-        if top_disease:
-            # Get disease information
+        disease_info, nutrition_recs = {}, {}
+        if top_disease and sections:
             disease_info = medical_dict.get_comprehensive_info(top_disease)
-            comprehensive_result['disease_information'] = disease_info.get('disease_info', {})
-            
-            # Get nutritional recommendations
-            nutrition_recs = medical_dict.get_nutritional_recommendations(top_disease)
-            comprehensive_result['nutritional_recommendations'] = nutrition_recs
-            
-            # Get medical terminology for the disease
-            medical_terms = {}
-            if disease_info.get('disease_info'):
-                disease_data = disease_info['disease_info']
-                # Extract medical terms from disease information
-                medical_terms = {
-                    'disease_name': disease_data.get('disease_name', ''),
-                    'medical_definition': disease_data.get('medical_definition', ''),
-                    'body_system': disease_data.get('body_system', ''),
-                    'severity_level': disease_data.get('severity_level', ''),
-                    'common_symptoms': disease_data.get('common_symptoms', []),
-                    'causes': disease_data.get('causes', []),
-                    'risk_factors': disease_data.get('risk_factors', [])
-                }
-            
-            comprehensive_result['medical_terminology'] = medical_terms
+            if 'nutritional_recommendations' in sections:
+                nutrition_recs = medical_dict.get_nutritional_recommendations(top_disease)
+        
+        comprehensive_result = _comprehensive_result(prediction_result, sections, disease_info, nutrition_recs)
         
-        # Save to output.json
-        output_file = 'output.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(comprehensive_result, f, indent=2, ensure_ascii=False)
+        # Record the result without blocking the request on disk I/O
+        result_sink.submit(comprehensive_result)
         
         return jsonify(comprehensive_result)
         
@@ -656,7 +868,10 @@ if __name__ == '__main__':
     print("API endpoints:")
     print("  Core Prediction:")
     print("    - Predict: http://localhost:5000/predict")
+    print("    - Batch predict: http://localhost:5000/predict-batch (POST)")
     print("    - Health check: http://localhost:5000/health")
+    print("    - Metrics: http://localhost:5000/metrics")
+    print("    - History: http://localhost:5000/history?limit=&cursor= (Bearer token, HISTORY_STORE=sqlite)")
     print("    - All diseases: http://localhost:5000/diseases")
     print("    - Disease info: http://localhost:5000/disease/<name>")
     print("    - Search: http://localhost:5000/search")
@@ -671,7 +886,7 @@ if __name__ == '__main__':
     print("Integrated Free APIs:")
     print("  - Open Food Facts: Nutrition information")
     print("  - Disease Ontology: Medical terminology")
-    print("  - Output: Saves results to output.json")
+    print(f"  - Output: Appends results via {result_sink.stats()['sink']} (RESULT_SINK)")
     print("=" * 80)
     
     app.run(debug=True, host='0.0.0.0', port=5000)
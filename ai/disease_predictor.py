@@ -3,18 +3,49 @@ import numpy as np
 import pickle
 import json
 from sklearn.preprocessing import StandardScaler
+import os
 import re
+import hashlib
+import threading
+from collections import Counter
 from datetime import datetime
+from forest_compiler import CompiledForest
+from cascade import CASCADE_CONFIG_FILE, DECISION_MEMBERS, load_cascade_config, majority_vote, passes_gate
+from hashing_features import load_vectorizer, vectorizer_path
+from model_evaluation import align_proba
+from quantized_inference import QuantizedDenseModel, QUANTIZATION_MODES
 
 class DiseasePredictor:
-    def __init__(self, model_path='trained_models', data_path='augmented_data'):
+    # 'full' averages every ensemble member; 'student' serves only the distilled model;
+    # 'cascade' runs members cheapest-first and stops once the calibrated gate is met
+    SERVING_PROFILES = ('full', 'student', 'cascade')
+    SCALED_MODELS = ('SVM', 'Logistic_Regression', 'Neural_Network')
+    
+    def __init__(self, model_path='trained_models', data_path='augmented_data', serving_profile='full',
+                 quantized=None, compiled_forest=True):
+        if serving_profile not in self.SERVING_PROFILES:
+            raise ValueError(f"serving_profile must be one of {self.SERVING_PROFILES}, got {serving_profile!r}")
+        if quantized is not None and quantized not in QUANTIZATION_MODES:
+            raise ValueError(f"quantized must be None or one of {QUANTIZATION_MODES}, got {quantized!r}")
         self.model_path = model_path
         self.data_path = data_path
+        self.serving_profile = serving_profile
+        self.quantized = quantized
+        self.compiled_forest = compiled_forest
         self.models = {}
+        self.student = None
         self.scaler = None
         self.label_encoder = None
         self.tfidf_vectorizer = None
         self.disease_classes = []
+        self.class_names = np.empty(0, dtype=object)
+        self.cascade_config = None
+        self.model_version = None
+        
+        # Request counters reported by the API's /metrics endpoint
+        self.metrics_lock = threading.Lock()
+        self.request_count = 0
+        self.cascade_depths = Counter()
         
         # Medical term standardization dictionary
         self.medical_synonyms = {
@@ -73,6 +104,20 @@ class DiseasePredictor:
                 'Neural_Network': 'neural_network_model.pkl'
             }
             
+            # The student profile never touches the ensemble members
+            if self.serving_profile == 'student':
+                model_files = {}
+            
+            # Prefer the memory-mapped compiled forest over the pickled estimator
+            compiled_path = f'{self.model_path}/random_forest_compiled'
+            if self.compiled_forest and 'Random_Forest' in model_files and os.path.isdir(compiled_path):
+                try:
+                    self.models['Random_Forest'] = CompiledForest.load(compiled_path)
+                    del model_files['Random_Forest']
+                    print("  ✓ Random_Forest (compiled) loaded successfully")
+                except ValueError as e:
+                    print(f"  ✗ Random_Forest (compiled) skipped: {e}")
+            
             for model_name, filename in model_files.items():
                 try:
                     with open(f'{self.model_path}/{filename}', 'rb') as f:
@@ -81,6 +126,34 @@ class DiseasePredictor:
                 except FileNotFoundError:
                     print(f"  ✗ {model_name} not found - skipping")
             
+            # Swap in NumPy exports of the MLP and linear members when requested
+            if self.quantized:
+                for model_name in ('Neural_Network', 'Logistic_Regression'):
+                    if model_name not in model_files:
+                        continue
+                    try:
+                        self.models[model_name] = QuantizedDenseModel.load(
+                            f'{self.model_path}/{model_name.lower()}_{self.quantized}.npz'
+                        )
+                        print(f"  ✓ {model_name} ({self.quantized}) export loaded successfully")
+                    except FileNotFoundError:
+                        print(f"  ✗ {model_name} {self.quantized} export not found - using sklearn model")
+            
+            # Load cascade order and gates learned during training
+            if self.serving_profile == 'cascade':
+                self.cascade_config = load_cascade_config(f'{self.model_path}/{CASCADE_CONFIG_FILE}')
+                print(f"  ✓ Cascade config loaded ({' -> '.join(self.cascade_config['order'])})")
+            
+            # Load distilled student (optional; required for the 'student' profile)
+            try:
+                with open(f'{self.model_path}/student_model.pkl', 'rb') as f:
+                    self.student = pickle.load(f)
+                print("  ✓ Student model loaded successfully")
+            except FileNotFoundError:
+                if self.serving_profile == 'student':
+                    raise
+                print("  ✗ Student model not found - skipping")
+            
             # Load scaler
             with open(f'{self.model_path}/scaler.pkl', 'rb') as f:
                 self.scaler = pickle.load(f)
@@ -90,13 +163,14 @@ class DiseasePredictor:
             with open(f'{self.data_path}/label_encoder.pkl', 'rb') as f:
                 self.label_encoder = pickle.load(f)
             self.disease_classes = list(self.label_encoder.classes_)
+            self.class_names = np.array(self.disease_classes, dtype=object)
             print("  ✓ Label encoder loaded successfully")
             
-            # Load TF-IDF vectorizer
-            with open(f'{self.data_path}/tfidf_vectorizer.pkl', 'rb') as f:
-                self.tfidf_vectorizer = pickle.load(f)
-            print("  ✓ TF-IDF vectorizer loaded successfully")
+            # Load TF-IDF vectorizer (hashing artifact or pickled vocabulary)
+            self.tfidf_vectorizer = load_vectorizer(self.data_path)
+            print(f"  ✓ TF-IDF vectorizer loaded successfully ({type(self.tfidf_vectorizer).__name__})")
             
+            self.model_version = self.artifact_version()
             print(f"Models loaded successfully! {len(self.models)} models available.")
             return True
             
@@ -104,6 +178,20 @@ class DiseasePredictor:
             print(f"Error loading models: {e}")
             return False
     
+    def artifact_version(self):
+        """Content hash of the model and preprocessing artifacts plus serving options"""
+        digest = hashlib.sha256(repr((self.serving_profile, self.quantized, self.compiled_forest)).encode())
+        paths = sorted(
+            os.path.join(root, name) for root, _, names in os.walk(self.model_path) for name in names
+        )
+        paths += [f'{self.data_path}/label_encoder.pkl', vectorizer_path(self.data_path)]
+        for path in paths:
+            digest.update(path.encode())
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+        return digest.hexdigest()[:16]
+    
     def clean_text(self, text):
         """Clean and normalize text"""
         if pd.isna(text) or not text:
@@ -129,12 +217,8 @@ class DiseasePredictor:
             text = re.sub(r'\b' + re.escape(synonym) + r'\b', standard_term, text)
         return text
     
-    def preprocess_symptoms(self, symptoms_text):
-        """Preprocess symptoms text into features"""
-        # Clean the text
-        cleaned_text = self.clean_text(symptoms_text)
-        cleaned_text = self.standardize_medical_terms(cleaned_text)
-        
+    def split_symptoms(self, cleaned_text):
+        """Split cleaned symptom text into individual symptoms"""
         # Enhanced symptom parsing - handle multiple separators
         symptoms_list = []
         
@@ -160,19 +244,14 @@ class DiseasePredictor:
                 symptoms_list = [cleaned_text.strip()] if cleaned_text.strip() else []
         
         # Additional cleaning for each symptom
-        symptoms_list = [
+        return [
             re.sub(r'\b(a|an|the|some|mild|severe|bad|terrible|awful)\b', '', symptom).strip()
             for symptom in symptoms_list
             if symptom.strip()
         ]
-        
-        # Create combined text for TF-IDF
-        symptoms_combined = ' '.join(symptoms_list)
-        
-        # Create TF-IDF features
-        tfidf_features = self.tfidf_vectorizer.transform([symptoms_combined])
-        
-        # Create additional features
+    
+    def engineered_features(self, symptoms_list, symptoms_combined):
+        """Symptom count, body system, severity and diversity features"""
         additional_features = []
         
         # Symptom count
@@ -190,82 +269,216 @@ class DiseasePredictor:
             additional_features.append(int(has_severity))
         
         # Symptom diversity (number of body systems affected)
-        system_columns = [f'has_{system}_symptoms' for system in self.body_systems.keys()]
         symptom_diversity = sum(additional_features[1:9])  # Body system features
         additional_features.append(symptom_diversity)
         
+        return additional_features
+    
+    def preprocess_symptoms(self, symptoms_text):
+        """Preprocess symptoms text into features"""
+        # Clean the text
+        cleaned_text = self.clean_text(symptoms_text)
+        cleaned_text = self.standardize_medical_terms(cleaned_text)
+        
+        symptoms_list = self.split_symptoms(cleaned_text)
+        
+        # Create combined text for TF-IDF
+        symptoms_combined = ' '.join(symptoms_list)
+        
+        # Create TF-IDF features
+        tfidf_features = self.tfidf_vectorizer.transform([symptoms_combined])
+        
+        # Create additional features
+        additional_features = self.engineered_features(symptoms_list, symptoms_combined)
+        
         # Combine TF-IDF and additional features
         tfidf_array = tfidf_features.toarray().flatten()
         feature_vector = np.concatenate([tfidf_array, additional_features])
         
         return feature_vector, symptoms_list
     
+    def predict_student(self, feature_matrix):
+        """Class indices and probabilities from the distilled student alone"""
+        proba = self.student.predict_proba(self.scaler.transform(feature_matrix))
+        proba = align_proba(proba, self.student.classes_, np.arange(len(self.disease_classes)))
+        return np.argmax(proba, axis=1), proba
+    
     def predict_disease(self, symptoms_text, top_k=5):
         """Predict disease from symptoms"""
-        if not self.models:
+        return self.predict_batch([symptoms_text], top_k=top_k)[0]
+    
+    def predict_batch(self, symptoms_texts, top_k=5):
+        """Predict diseases for several symptom texts with one call per model"""
+        if not self.models and self.student is None:
             raise ValueError("Models not loaded. Call load_models() first.")
         
         # Preprocess symptoms
-        feature_vector, symptoms_list = self.preprocess_symptoms(symptoms_text)
-        feature_vector = feature_vector.reshape(1, -1)
+        processed = [self.preprocess_symptoms(symptoms_text) for symptoms_text in symptoms_texts]
+        feature_matrix = np.vstack([feature_vector for feature_vector, _ in processed])
+        symptoms_lists = [symptoms_list for _, symptoms_list in processed]
+        
+        if self.serving_profile == 'student':
+            ensemble_preds, ensemble_probas = self.predict_student(feature_matrix)
+            self.record_requests(len(symptoms_lists))
+            return self.format_predictions(symptoms_lists, ensemble_preds, ensemble_probas,
+                                           {'Student': ensemble_preds}, top_k)
+        
+        feature_matrix_scaled = self.scaler.transform(feature_matrix)
+        if self.serving_profile == 'cascade':
+            return self.predict_cascade(feature_matrix, feature_matrix_scaled, symptoms_lists, top_k)
         
         # Get predictions from all models
         predictions = {}
         probabilities = {}
         
-        # Naive Bayes and Random Forest use original features
-        for model_name in ['Naive_Bayes', 'Random_Forest']:
-            if model_name in self.models:
-                pred = self.models[model_name].predict(feature_vector)[0]
-                pred_proba = self.models[model_name].predict_proba(feature_vector)[0]
-                predictions[model_name] = pred
-                probabilities[model_name] = pred_proba
-        
+        # Naive Bayes and Random Forest use original features,
         # SVM, LR, and MLP use scaled features
-        feature_vector_scaled = self.scaler.transform(feature_vector)
-        for model_name in ['SVM', 'Logistic_Regression', 'Neural_Network']:
+        for model_name in ['Naive_Bayes', 'Random_Forest', 'SVM', 'Logistic_Regression', 'Neural_Network']:
             if model_name in self.models:
-                pred = self.models[model_name].predict(feature_vector_scaled)[0]
-                pred_proba = self.models[model_name].predict_proba(feature_vector_scaled)[0]
-                predictions[model_name] = pred
-                probabilities[model_name] = pred_proba
-        
-        # Ensemble prediction (majority voting)
-        if predictions:
-            votes = list(predictions.values())
-            ensemble_pred = max(set(votes), key=votes.count)
-            
-            # Ensemble probabilities (average)
-            if probabilities:
-                ensemble_proba = np.mean(list(probabilities.values()), axis=0)
-            else:
-                ensemble_proba = np.zeros(len(self.disease_classes))
-                ensemble_proba[ensemble_pred] = 1.0
-        else:
+                X = feature_matrix_scaled if model_name in self.SCALED_MODELS else feature_matrix
+                predictions[model_name], probabilities[model_name] = self.predict_member(model_name, X)
+        
+        if not predictions:
             raise ValueError("No models available for prediction")
         
-        # Get top-k predictions
-        top_k_indices = np.argsort(ensemble_proba)[-top_k:][::-1]
-        top_k_diseases = []
-        
-        for i, idx in enumerate(top_k_indices):
-            disease_name = self.disease_classes[idx]
-            confidence = ensemble_proba[idx]
-            top_k_diseases.append({
-                'rank': i + 1,
-                'disease': disease_name,
-                'confidence': float(confidence),
-                'percentage': float(confidence * 100)
-            })
+        # Ensemble prediction (majority voting) and probabilities (average)
+        ensemble_preds = self.majority_vote(np.column_stack(list(predictions.values())))
+        ensemble_probas = np.mean(list(probabilities.values()), axis=0)
         
-        return {
-            'input_symptoms': symptoms_list,
-            'predicted_disease': self.disease_classes[ensemble_pred],
-            'confidence': float(ensemble_proba[ensemble_pred]),
-            'top_k_predictions': top_k_diseases,
-            'individual_predictions': {name: self.disease_classes[pred] for name, pred in predictions.items()},
-            'timestamp': datetime.now().isoformat()
+        self.record_requests(len(symptoms_lists))
+        return self.format_predictions(symptoms_lists, ensemble_preds, ensemble_probas, predictions, top_k)
+    
+    def predict_member(self, model_name, X):
+        """Hard predictions and class probabilities of one ensemble member"""
+        model = self.models[model_name]
+        pred_proba = model.predict_proba(X)
+        if model_name in DECISION_MEMBERS:
+            # Platt-scaled probabilities can disagree with the SVM decision
+            return model.predict(X), pred_proba
+        return model.classes_[np.argmax(pred_proba, axis=1)], pred_proba
+    
+    def majority_vote(self, votes):
+        """Most frequent class per row of an (n_rows x n_voters) matrix; ties go to the lowest class"""
+        return majority_vote(votes, len(self.disease_classes))
+    
+    def predict_cascade(self, feature_matrix, feature_matrix_scaled, symptoms_lists, top_k):
+        """Run members cheapest-first, stopping rows whose averaged probabilities pass the gate"""
+        gates = self.cascade_config['gates']
+        stages = [
+            (model_name, gates[i] if i < len(gates) else None)
+            for i, model_name in enumerate(self.cascade_config['order']) if model_name in self.models
+        ]
+        n_rows = len(symptoms_lists)
+        
+        running = np.zeros((n_rows, len(self.disease_classes)))
+        member_preds = {}
+        depth = np.zeros(n_rows, dtype=np.int64)
+        active = np.arange(n_rows)
+        
+        for stage, (model_name, gate) in enumerate(stages):
+            X = feature_matrix_scaled if model_name in self.SCALED_MODELS else feature_matrix
+            preds, proba = self.predict_member(model_name, X[active])
+            member_preds[model_name] = np.full(n_rows, -1, dtype=np.int64)
+            member_preds[model_name][active] = preds
+            running[active] += proba
+            depth[active] += 1
+            
+            # The last member always answers; earlier ones stop confident rows
+            if stage == len(stages) - 1:
+                break
+            stop = passes_gate(running[active] / depth[active, None], gate)
+            active = active[~stop]
+            if len(active) == 0:
+                break
+        
+        ensemble_probas = running / depth[:, None]
+        ensemble_preds = np.argmax(ensemble_probas, axis=1)
+        
+        # Full depth: same majority vote as the full profile
+        full = depth == len(stages)
+        if full.any():
+            votes = np.column_stack([member_preds[model_name][full] for model_name, _ in stages])
+            ensemble_preds[full] = self.majority_vote(votes)
+        
+        results = self.format_predictions(symptoms_lists, ensemble_preds, ensemble_probas, member_preds, top_k)
+        for result, row_depth in zip(results, depth.tolist()):
+            result['cascade_depth'] = row_depth
+        
+        self.record_requests(len(results), depth)
+        return results
+    
+    def record_requests(self, count, depths=()):
+        """Update the request and cascade-depth counters"""
+        with self.metrics_lock:
+            self.request_count += count
+            self.cascade_depths.update(int(d) for d in depths)
+    
+    def get_metrics(self):
+        """Snapshot of the serving counters"""
+        with self.metrics_lock:
+            total = sum(self.cascade_depths.values())
+            metrics = {
+                'serving_profile': self.serving_profile,
+                'requests': self.request_count
+            }
+            if self.serving_profile == 'cascade' and self.cascade_config:
+                metrics['cascade_depth_counts'] = {str(d): c for d, c in sorted(self.cascade_depths.items())}
+                metrics['cascade_mean_depth'] = (
+                    sum(d * c for d, c in self.cascade_depths.items()) / total if total else 0.0
+                )
+                metrics['cascade_max_depth'] = len(self.cascade_config['order'])
+            return metrics
+    
+    def top_k_indices(self, probas, top_k):
+        """Column indices of the ``top_k`` largest probabilities per row, best first"""
+        top_k = min(top_k, probas.shape[1])
+        candidates = np.argpartition(-probas, top_k - 1, axis=1)[:, :top_k]
+        order = np.argsort(-np.take_along_axis(probas, candidates, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(candidates, order, axis=1)
+    
+    def format_predictions(self, symptoms_lists, ensemble_preds, ensemble_probas, predictions, top_k):
+        """Build prediction results for a batch from the combined class probabilities
+        
+        ``predictions`` maps member names to per-row class indices; a negative
+        index marks a member that did not run for that row.
+        """
+        rows = np.arange(len(symptoms_lists))
+        
+        # Get top-k predictions
+        top_indices = self.top_k_indices(ensemble_probas, top_k)
+        top_names = self.class_names[top_indices].tolist()
+        top_confidences = np.take_along_axis(ensemble_probas, top_indices, axis=1)
+        top_percentages = (top_confidences * 100).tolist()
+        top_confidences = top_confidences.tolist()
+        ranks = range(1, top_indices.shape[1] + 1)
+        
+        predicted_names = self.class_names[ensemble_preds].tolist()
+        predicted_confidences = ensemble_probas[rows, ensemble_preds].tolist()
+        member_names = {
+            name: (self.class_names[np.maximum(preds, 0)].tolist(), (np.asarray(preds) >= 0).tolist())
+            for name, preds in predictions.items()
         }
+        timestamp = datetime.now().isoformat()
+        
+        return [
+            {
+                'input_symptoms': symptoms_list,
+                'predicted_disease': predicted_names[i],
+                'confidence': predicted_confidences[i],
+                'top_k_predictions': [
+                    {'rank': rank, 'disease': disease, 'confidence': confidence, 'percentage': percentage}
+                    for rank, disease, confidence, percentage in zip(
+                        ranks, top_names[i], top_confidences[i], top_percentages[i]
+                    )
+                ],
+                'individual_predictions': {
+                    name: names[i] for name, (names, ran) in member_names.items() if ran[i]
+                },
+                'serving_profile': self.serving_profile,
+                'timestamp': timestamp
+            }
+            for i, symptoms_list in enumerate(symptoms_lists)
+        ]
     
     def get_disease_info(self, disease_name):
         """Get information about a specific disease"""
@@ -287,37 +500,7 @@ class DiseasePredictor:
         
         # Use the same parsing logic as preprocess_symptoms
         cleaned_text = self.clean_text(symptoms_text)
-        
-        # Enhanced symptom parsing - handle multiple separators
-        symptoms_list = []
-        
-        # First try semicolon separation (current format)
-        if ';' in cleaned_text:
-            symptoms_list = [s.strip() for s in cleaned_text.split(';') if s.strip()]
-        # Then try comma separation (natural language)
-        elif ',' in cleaned_text:
-            symptoms_list = [s.strip() for s in cleaned_text.split(',') if s.strip()]
-        # Then try common conjunctions
-        else:
-            conjunctions = [' and ', ' with ', ' along with ', ' plus ', ' also ']
-            found_conjunction = False
-            
-            for conjunction in conjunctions:
-                if conjunction in cleaned_text:
-                    symptoms_list = [s.strip() for s in cleaned_text.split(conjunction) if s.strip()]
-                    found_conjunction = True
-                    break
-            
-            # If no separators found, treat as single symptom
-            if not found_conjunction:
-                symptoms_list = [cleaned_text.strip()] if cleaned_text.strip() else []
-        
-        # Additional cleaning for each symptom
-        symptoms_list = [
-            re.sub(r'\b(a|an|the|some|mild|severe|bad|terrible|awful)\b', '', symptom).strip()
-            for symptom in symptoms_list
-            if symptom.strip()
-        ]
+        symptoms_list = self.split_symptoms(cleaned_text)
         
         if len(symptoms_list) < 1:
             return {
@@ -0,0 +1,86 @@
+import time
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from model_evaluation import align_proba
+
+
+def soften(proba, temperature=1.0):
+    """Flatten (T > 1) or sharpen (T < 1) probability rows"""
+    if temperature == 1.0:
+        return proba
+    softened = np.power(proba, 1.0 / temperature)
+    return softened / softened.sum(axis=1, keepdims=True)
+
+
+def expand_soft_targets(X, soft_proba, classes, min_weight=1e-3):
+    """Turn soft targets into (X, y, sample_weight) for a hard-label learner
+
+    Every row is repeated once per class the teacher gives at least
+    ``min_weight`` probability, labelled with that class and weighted by it, so
+    minimizing weighted log-loss matches the teacher's distribution.
+    """
+    rows, columns = np.nonzero(soft_proba >= min_weight)
+    return X[rows], classes[columns], soft_proba[rows, columns]
+
+
+def topk_agreement(teacher_proba, student_proba, top_k=(1, 3, 5)):
+    """How often the student's top-k contains the teacher's top prediction"""
+    teacher_top = np.argmax(teacher_proba, axis=1)
+    student_ranked = np.argsort(-student_proba, axis=1)
+    return {
+        f'top{k}_agreement': float(np.mean((student_ranked[:, :k] == teacher_top[:, None]).any(axis=1)))
+        for k in top_k
+    }
+
+
+class StudentDistiller:
+    """Distill the ensemble into one multinomial LogisticRegression.
+
+    The student is fit on the teacher's (optionally temperature-softened)
+    probabilities over the training data and is meant to be served on the same
+    scaled features as the ensemble's linear members.
+    """
+
+    def __init__(self, C=10.0, max_iter=2000, temperature=1.0, min_weight=1e-3, random_state=42):
+        self.temperature = temperature
+        self.min_weight = min_weight
+        self.student = LogisticRegression(C=C, max_iter=max_iter, random_state=random_state)
+
+    def fit(self, X, teacher_proba, classes):
+        """Fit the student on soft targets
+
+        Args:
+            X: Feature matrix the student will be served on
+            teacher_proba: Teacher probabilities for X, columns ordered as ``classes``
+            classes: Class labels of the probability columns
+        """
+        self.classes = np.asarray(classes)
+        X_expanded, y_expanded, weights = expand_soft_targets(
+            np.asarray(X), soften(teacher_proba, self.temperature), self.classes, self.min_weight
+        )
+        print(f"Distilling student on {len(y_expanded)} weighted rows "
+              f"({len(X)} samples x soft targets)...")
+        self.student.fit(X_expanded, y_expanded, sample_weight=weights)
+        return self.student
+
+    def predict_proba(self, X):
+        """Student probabilities aligned to the teacher's class columns"""
+        return align_proba(self.student.predict_proba(X), self.student.classes_, self.classes)
+
+    def report(self, X_student, teacher, X_teacher, y_true=None):
+        """Top-k agreement with the teacher plus per-sample latency of both"""
+        start = time.perf_counter()
+        teacher_proba = teacher.predict_proba(X_teacher)
+        teacher_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        student_proba = self.predict_proba(X_student)
+        student_time = time.perf_counter() - start
+
+        report = topk_agreement(teacher_proba, student_proba)
+        if y_true is not None:
+            report['student_accuracy'] = float(np.mean(self.classes[np.argmax(student_proba, axis=1)] == y_true))
+            report['teacher_accuracy'] = float(np.mean(self.classes[np.argmax(teacher_proba, axis=1)] == y_true))
+        report['teacher_ms_per_sample'] = 1000 * teacher_time / len(student_proba)
+        report['student_ms_per_sample'] = 1000 * student_time / len(student_proba)
+        return report
@@ -0,0 +1,269 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from datetime import datetime
+
+
+def sparse_frame(matrix, columns, index=None):
+    """Sparse-backed DataFrame of a scipy matrix whose implicit entries read as 0.0
+
+    ``DataFrame.sparse.from_spmatrix`` uses NaN as the fill value on newer
+    pandas, so the columns are built explicitly with a zero fill.
+    """
+    matrix = sparse.csc_matrix(matrix)
+    return pd.DataFrame(
+        {
+            column: pd.arrays.SparseArray.from_spmatrix(matrix[:, i])
+            for i, column in enumerate(columns)
+        },
+        index=index
+    )
+
+
+class FeatureStore:
+    """Columnar binary store for the TF-IDF + engineered feature matrix.
+
+    The TF-IDF block is kept as CSR components and the engineered columns as a
+    dense block, each in its own ``.npy`` file so they can be memory-mapped. A
+    ``manifest.json`` written last describes the schema and marks the store as
+    complete.
+    """
+
+    SCHEMA_VERSION = 1
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def exists(self):
+        """Whether a complete store is present at this path"""
+        return os.path.exists(self._file(self.MANIFEST))
+
+    def read_manifest(self):
+        """Load and validate the store manifest"""
+        with open(self._file(self.MANIFEST), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('schema_version') != self.SCHEMA_VERSION:
+            raise ValueError(
+                f"Unsupported feature store schema {manifest.get('schema_version')} "
+                f"(expected {self.SCHEMA_VERSION})"
+            )
+        return manifest
+
+    def write(self, tfidf_matrix, engineered, labels, tfidf_feature_names,
+              engineered_columns, row_keys=None, extra=None):
+        """Persist a feature matrix
+
+        Args:
+            tfidf_matrix: Sparse TF-IDF matrix (n_rows x n_tfidf)
+            engineered: Dense engineered feature block (n_rows x n_engineered)
+            labels: Encoded labels (n_rows,)
+            tfidf_feature_names: Column names of the TF-IDF block
+            engineered_columns: Column names of the engineered block
+            row_keys: Optional per-row content hashes used for incremental rebuilds
+            extra: Optional additional manifest entries
+        """
+        os.makedirs(self.path, exist_ok=True)
+
+        # Remove the manifest first so a crash mid-write never leaves a store
+        # that looks complete but mixes old and new arrays
+        if self.exists():
+            os.remove(self._file(self.MANIFEST))
+
+        tfidf_matrix = sparse.csr_matrix(tfidf_matrix)
+        tfidf_matrix.sort_indices()
+        arrays = {
+            'tfidf_data': tfidf_matrix.data.astype(np.float64),
+            'tfidf_indices': tfidf_matrix.indices.astype(np.int32),
+            'tfidf_indptr': tfidf_matrix.indptr.astype(np.int64),
+            'engineered': np.ascontiguousarray(np.asarray(engineered, dtype=np.float64)),
+            'labels': np.asarray(labels, dtype=np.int64)
+        }
+        if row_keys is not None:
+            arrays['row_keys'] = np.asarray(row_keys)
+        for name, array in arrays.items():
+            np.save(self._file(f'{name}.npy'), array)
+
+        return self._write_manifest(
+            tfidf_matrix.shape,
+            tfidf_matrix.nnz,
+            tfidf_feature_names,
+            engineered_columns,
+            {name: (array.dtype, array.shape) for name, array in arrays.items()},
+            extra
+        )
+
+    def _write_manifest(self, tfidf_shape, nnz, tfidf_feature_names, engineered_columns,
+                        array_specs, extra=None):
+        """Write the manifest that marks the store as complete"""
+        manifest = {
+            'schema_version': self.SCHEMA_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'num_rows': int(tfidf_shape[0]),
+            'tfidf': {
+                'num_features': int(tfidf_shape[1]),
+                'nnz': int(nnz),
+                'feature_names': list(tfidf_feature_names)
+            },
+            'engineered': {
+                'columns': list(engineered_columns)
+            },
+            'arrays': {
+                name: {'file': f'{name}.npy', 'dtype': str(np.dtype(dtype)), 'shape': [int(n) for n in shape]}
+                for name, (dtype, shape) in array_specs.items()
+            }
+        }
+        if extra:
+            manifest.update(extra)
+
+        with open(self._file(self.MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        return manifest
+
+    def writer(self):
+        """Open a writer that appends feature rows chunk by chunk"""
+        return FeatureStoreWriter(self)
+
+    def load(self, mmap=True):
+        """Load (tfidf_matrix, engineered, labels, manifest), memory-mapped by default"""
+        manifest = self.read_manifest()
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(self._file(spec['file']), mmap_mode=mmap_mode)
+            for name, spec in manifest['arrays'].items()
+            if name != 'row_keys'
+        }
+
+        tfidf_matrix = sparse.csr_matrix(
+            (arrays['tfidf_data'], arrays['tfidf_indices'], arrays['tfidf_indptr']),
+            shape=(manifest['num_rows'], manifest['tfidf']['num_features']),
+            copy=False
+        )
+        return tfidf_matrix, arrays['engineered'], arrays['labels'], manifest
+
+    def load_row_keys(self):
+        """Load the per-row content hashes, or None if the store has none"""
+        spec = self.read_manifest()['arrays'].get('row_keys')
+        if spec is None:
+            return None
+        return np.load(self._file(spec['file']))
+
+    def load_frame(self):
+        """Load the dense feature DataFrame and labels used by the trainers"""
+        tfidf_matrix, engineered, labels, manifest = self.load()
+        columns = manifest['tfidf']['feature_names'] + manifest['engineered']['columns']
+        X = pd.DataFrame(
+            np.hstack([tfidf_matrix.toarray(), np.asarray(engineered)]),
+            columns=columns
+        )
+        return X, np.asarray(labels)
+
+
+class FeatureStoreWriter:
+    """Append feature chunks to a FeatureStore with bounded memory.
+
+    Each chunk is spilled to part files as it arrives; ``close`` stitches the
+    parts into the store's arrays through ``open_memmap`` one part at a time and
+    only then writes the manifest.
+    """
+
+    DTYPES = {
+        'tfidf_data': np.float64,
+        'tfidf_indices': np.int32,
+        'tfidf_indptr': np.int64,
+        'engineered': np.float64,
+        'labels': np.int64
+    }
+
+    def __init__(self, store):
+        self.store = store
+        self.parts_dir = store._file('_parts')
+        self.parts = []
+        self.num_features = None
+
+        os.makedirs(store.path, exist_ok=True)
+        if store.exists():
+            os.remove(store._file(store.MANIFEST))
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        os.makedirs(self.parts_dir)
+
+    def append(self, tfidf_matrix, engineered, labels, row_keys=None):
+        """Spill one chunk of rows to part files"""
+        tfidf_matrix = sparse.csr_matrix(tfidf_matrix)
+        tfidf_matrix.sort_indices()
+        if self.num_features is None:
+            self.num_features = tfidf_matrix.shape[1]
+        elif tfidf_matrix.shape[1] != self.num_features:
+            raise ValueError(
+                f"Chunk has {tfidf_matrix.shape[1]} TF-IDF features, expected {self.num_features}"
+            )
+
+        arrays = {
+            'tfidf_data': tfidf_matrix.data,
+            'tfidf_indices': tfidf_matrix.indices,
+            'tfidf_indptr': tfidf_matrix.indptr,
+            'engineered': np.asarray(engineered),
+            'labels': np.asarray(labels)
+        }
+        if row_keys is not None:
+            arrays['row_keys'] = np.asarray(row_keys)
+
+        part = {'num_rows': tfidf_matrix.shape[0], 'nnz': tfidf_matrix.nnz, 'files': {}}
+        for name, array in arrays.items():
+            path = os.path.join(self.parts_dir, f'{name}_{len(self.parts):05d}.npy')
+            np.save(path, array.astype(self.DTYPES.get(name, array.dtype), copy=False))
+            part['files'][name] = path
+        self.parts.append(part)
+
+    def _concat_parts(self, name, length):
+        """Copy one array's parts into its final memory-mapped file"""
+        first = np.load(self.parts[0]['files'][name], mmap_mode='r')
+        shape = (length,) + first.shape[1:]
+        out = np.lib.format.open_memmap(self.store._file(f'{name}.npy'), mode='w+',
+                                        dtype=first.dtype, shape=shape)
+        position, nnz_offset = 0, 0
+        for part in self.parts:
+            chunk = np.load(part['files'][name], mmap_mode='r')
+            if name == 'tfidf_indptr':
+                # Drop each part's closing pointer and shift by the nonzeros before it
+                out[position:position + part['num_rows']] = chunk[:-1] + nnz_offset
+                position += part['num_rows']
+                nnz_offset += part['nnz']
+            else:
+                out[position:position + len(chunk)] = chunk
+                position += len(chunk)
+        if name == 'tfidf_indptr':
+            out[-1] = nnz_offset
+        out.flush()
+        return first.dtype, shape
+
+    def close(self, tfidf_feature_names, engineered_columns, extra=None):
+        """Assemble the part files into the store and write its manifest"""
+        if not self.parts:
+            raise ValueError("No feature chunks were appended")
+
+        num_rows = sum(part['num_rows'] for part in self.parts)
+        nnz = sum(part['nnz'] for part in self.parts)
+        lengths = {'tfidf_data': nnz, 'tfidf_indices': nnz, 'tfidf_indptr': num_rows + 1}
+
+        specs = {
+            name: self._concat_parts(name, lengths.get(name, num_rows))
+            for name in self.parts[0]['files']
+        }
+
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        return self.store._write_manifest(
+            (num_rows, self.num_features),
+            nnz,
+            tfidf_feature_names,
+            engineered_columns,
+            specs,
+            extra
+        )
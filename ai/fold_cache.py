@@ -0,0 +1,52 @@
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+
+class FoldCache:
+    """Precomputed stratified folds with their fitted fold transformers.
+
+    The folds and the per-fold StandardScaler are computed once and shared by
+    every candidate or model that is fitted on them, so the scaler is never
+    refitted for the same fold.
+    """
+
+    def __init__(self, X, y, n_splits=3, random_state=42):
+        self.X = np.ascontiguousarray(np.asarray(X, dtype=np.float64))
+        self.y = np.asarray(y)
+        self.classes = np.unique(self.y)
+        self.n_splits = self._effective_splits(n_splits)
+        self.random_state = random_state
+        self.folds = []
+        self._build_folds()
+
+    def _effective_splits(self, n_splits):
+        """Clamp the number of folds to what the rarest class allows"""
+        _, counts = np.unique(self.y, return_counts=True)
+        return int(min(n_splits, max(2, counts.min())))
+
+    def _build_folds(self):
+        """Split once and cache the scaled matrices of every fold"""
+        splitter = StratifiedKFold(
+            n_splits=self.n_splits, shuffle=True, random_state=self.random_state
+        )
+        for train_idx, val_idx in splitter.split(self.X, self.y):
+            scaler = StandardScaler()
+            X_train_scaled = scaler.fit_transform(self.X[train_idx])
+            X_val_scaled = scaler.transform(self.X[val_idx])
+            self.folds.append({
+                'train_idx': train_idx,
+                'val_idx': val_idx,
+                'scaler': scaler,
+                'X_train_scaled': X_train_scaled,
+                'X_val_scaled': X_val_scaled
+            })
+
+    def get_fold(self, fold_index, scaled):
+        """Return (X_train, y_train, X_val, y_val) for a fold"""
+        fold = self.folds[fold_index]
+        if scaled:
+            X_train, X_val = fold['X_train_scaled'], fold['X_val_scaled']
+        else:
+            X_train, X_val = self.X[fold['train_idx']], self.X[fold['val_idx']]
+        return X_train, self.y[fold['train_idx']], X_val, self.y[fold['val_idx']]
@@ -0,0 +1,126 @@
+import os
+import json
+import numpy as np
+
+
+class CompiledForest:
+    """RandomForestClassifier compiled into flat, memory-mappable node arrays.
+
+    The nodes of every tree are laid out back to back with global child
+    indices, and leaf class distributions live in one ``leaf_values`` block.
+    Prediction walks all trees for a whole batch at once: one vectorized step
+    per tree level instead of Python dispatch per estimator. The arrays are
+    stored in exactly the dtype and layout traversal indexes with, so a loaded
+    forest works on the memory-mapped pages directly and processes share them.
+    """
+
+    ARRAYS = ('split_feature', 'threshold', 'children', 'node_leaf', 'leaf_values', 'roots')
+    META = 'forest.json'
+    FORMAT = 2
+
+    def __init__(self, split_feature, threshold, children, node_leaf, leaf_values, roots,
+                 classes, max_depth):
+        self.split_feature = split_feature  # int64 split feature, 0 at leaves (never decides)
+        self.threshold = threshold          # float64 split threshold
+        self.children = children            # int64 interleaved (left, right) global child indices; leaves point at themselves
+        self.node_leaf = node_leaf          # int32 row of leaf_values for leaf nodes, -1 otherwise
+        self.leaf_values = leaf_values      # float64 normalized class distribution per leaf
+        self.roots = roots                  # int64 global index of each tree's root
+        self.classes_ = np.asarray(classes)
+        self.max_depth = int(max_depth)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        """Flatten a fitted RandomForestClassifier (single output)"""
+        features, thresholds, children, node_leaves, leaf_values, roots = [], [], [], [], [], []
+        offset, leaf_offset, max_depth = 0, 0, 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            local = np.arange(tree.node_count)
+
+            # Leaves point at themselves so extra traversal steps are no-ops
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            thresholds.append(tree.threshold.astype(np.float64))
+            left = np.where(is_leaf, local, tree.children_left) + offset
+            right = np.where(is_leaf, local, tree.children_right) + offset
+            children.append(np.stack([left, right], axis=1).ravel().astype(np.int64))
+
+            leaf_rows = np.full(tree.node_count, -1, dtype=np.int32)
+            leaf_rows[is_leaf] = leaf_offset + np.arange(is_leaf.sum())
+            node_leaves.append(leaf_rows)
+
+            values = tree.value[is_leaf, 0, :]
+            leaf_values.append(values / values.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            offset += tree.node_count
+            leaf_offset += int(is_leaf.sum())
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            np.concatenate(features),
+            np.concatenate(thresholds),
+            np.concatenate(children),
+            np.concatenate(node_leaves),
+            np.concatenate(leaf_values),
+            np.array(roots, dtype=np.int64),
+            forest.classes_,
+            max_depth
+        )
+
+    def apply(self, X):
+        """Global leaf node reached in every tree, shape (n_samples, n_trees)"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        n_trees = len(self.roots)
+        values = X.ravel()
+        row_starts = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, n_trees)
+        nodes = np.tile(self.roots, n_samples)
+
+        # One flat gather per level; leaves loop back to themselves
+        for _ in range(self.max_depth):
+            go_right = np.take(values, row_starts + np.take(self.split_feature, nodes)) > np.take(self.threshold, nodes)
+            nodes = np.take(self.children, 2 * nodes + go_right)
+        return nodes.reshape(n_samples, n_trees)
+
+    def predict_proba(self, X):
+        leaves = self.node_leaf[self.apply(X)]
+        return self.leaf_values[leaves].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def save(self, path):
+        """Write one ``.npy`` per array plus a small JSON header"""
+        os.makedirs(path, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, self.META), 'w') as f:
+            json.dump({
+                'format': self.FORMAT,
+                'classes': self.classes_.tolist(),
+                'max_depth': self.max_depth,
+                'n_trees': len(self.roots),
+                'n_nodes': len(self.threshold)
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Load a compiled forest, memory-mapping its arrays by default"""
+        with open(os.path.join(path, cls.META), 'r') as f:
+            meta = json.load(f)
+        if meta.get('format') != cls.FORMAT:
+            raise ValueError(f"{path} was compiled in an older layout; re-run export_compiled_forest")
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+            for name in cls.ARRAYS
+        }
+        return cls(classes=meta['classes'], max_depth=meta['max_depth'], **arrays)
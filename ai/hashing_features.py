@@ -0,0 +1,124 @@
+import os
+import pickle
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+HASHED_VECTORIZER_FILE = 'hashed_tfidf.npz'
+TFIDF_VECTORIZER_FILE = 'tfidf_vectorizer.pkl'
+
+
+class HashedTfidfVectorizer:
+    """TF-IDF over a stateless hashing vectorizer.
+
+    Terms are mapped to a fixed number of columns by hashing, so there is no
+    vocabulary dict to pickle or look up; the only fitted state is one IDF
+    weight per column, stored as a small ``.npz`` artifact. Weighting follows
+    ``TfidfVectorizer`` defaults (smooth IDF, L2-normalized rows).
+    """
+
+    def __init__(self, n_features=2 ** 12, ngram_range=(1, 2), stop_words=None,
+                 lowercase=True, idf=None):
+        self.n_features = int(n_features)
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = sorted(stop_words) if stop_words is not None else None
+        self.lowercase = bool(lowercase)
+        self.idf_ = idf
+        self.hasher = HashingVectorizer(
+            n_features=self.n_features,
+            ngram_range=self.ngram_range,
+            stop_words=self.stop_words,
+            lowercase=self.lowercase,
+            alternate_sign=False,
+            norm=None
+        )
+
+    def fit(self, texts):
+        """Learn per-column IDF weights from the corpus"""
+        counts = self.hasher.transform(texts).tocsc()
+        document_frequency = np.diff(counts.indptr)
+        num_documents = counts.shape[0]
+        self.idf_ = np.log((1 + num_documents) / (1 + document_frequency)) + 1
+        return self
+
+    def transform(self, texts):
+        """Hash, IDF-weight and L2-normalize a batch of texts"""
+        if self.idf_ is None:
+            raise ValueError("HashedTfidfVectorizer is not fitted")
+        matrix = self.hasher.transform(texts).tocsr().astype(np.float64)
+        matrix.data *= self.idf_[matrix.indices]
+        return normalize(matrix, norm='l2', copy=False)
+
+    def fit_transform(self, texts):
+        return self.fit(texts).transform(texts)
+
+    def get_feature_names_out(self):
+        width = len(str(self.n_features - 1))
+        return np.array([f'hash_{i:0{width}d}' for i in range(self.n_features)], dtype=object)
+
+    def save(self, path):
+        """Write the IDF weights and hashing parameters to an ``.npz`` artifact
+
+        Columns no training document hashed into all share the maximum IDF, so
+        only the columns that were seen are stored.
+        """
+        unseen_idf = self.idf_.max()
+        seen = np.flatnonzero(self.idf_ != unseen_idf).astype(np.int32)
+        np.savez_compressed(
+            path,
+            idf_columns=seen,
+            idf_values=self.idf_[seen],
+            unseen_idf=unseen_idf,
+            n_features=self.n_features,
+            ngram_range=np.array(self.ngram_range),
+            stop_words=np.array(self.stop_words if self.stop_words is not None else [], dtype=str),
+            has_stop_words=self.stop_words is not None,
+            lowercase=self.lowercase
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as artifact:
+            n_features = int(artifact['n_features'])
+            idf = np.full(n_features, float(artifact['unseen_idf']))
+            idf[artifact['idf_columns']] = artifact['idf_values']
+            return cls(
+                n_features=n_features,
+                ngram_range=tuple(int(n) for n in artifact['ngram_range']),
+                stop_words=artifact['stop_words'].tolist() if bool(artifact['has_stop_words']) else None,
+                lowercase=bool(artifact['lowercase']),
+                idf=idf
+            )
+
+
+def vectorizer_path(data_path):
+    """Path of the vectorizer artifact saved in ``data_path``"""
+    hashed = os.path.join(data_path, HASHED_VECTORIZER_FILE)
+    if os.path.exists(hashed):
+        return hashed
+    return os.path.join(data_path, TFIDF_VECTORIZER_FILE)
+
+
+def load_vectorizer(data_path):
+    """Load the hashing artifact if present, else the pickled TfidfVectorizer"""
+    path = vectorizer_path(data_path)
+    if path.endswith('.npz'):
+        return HashedTfidfVectorizer.load(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def save_vectorizer(vectorizer, data_path):
+    """Save a vectorizer in its native format, replacing any artifact of the other kind"""
+    hashed = os.path.join(data_path, HASHED_VECTORIZER_FILE)
+    pickled = os.path.join(data_path, TFIDF_VECTORIZER_FILE)
+    if isinstance(vectorizer, HashedTfidfVectorizer):
+        vectorizer.save(hashed)
+        stale = pickled
+    else:
+        with open(pickled, 'wb') as f:
+            pickle.dump(vectorizer, f)
+        stale = hashed
+    if os.path.exists(stale):
+        os.remove(stale)
+    return vectorizer_path(data_path)
@@ -0,0 +1,183 @@
+import os
+import uuid
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from serialization import dumps, loads
+from result_sink import BackgroundWriter, NullSink
+
+# Mirrors symptom_analysis_history in supabase_schema.sql (arrays and JSONB
+# stored as JSON text), plus the request latency
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symptom_analysis_history (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    symptoms TEXT NOT NULL,
+    predicted_disease VARCHAR(255) NOT NULL,
+    confidence_score DECIMAL(5,2) NOT NULL,
+    top_predictions TEXT,
+    analysis_timestamp TEXT NOT NULL,
+    follow_up_required BOOLEAN DEFAULT 0,
+    follow_up_notes TEXT,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_symptom_analysis_user_id ON symptom_analysis_history(user_id);
+CREATE INDEX IF NOT EXISTS idx_symptom_analysis_timestamp ON symptom_analysis_history(analysis_timestamp);
+"""
+
+HISTORY_COLUMNS = (
+    'id', 'user_id', 'symptoms', 'predicted_disease', 'confidence_score', 'top_predictions',
+    'analysis_timestamp', 'follow_up_required', 'follow_up_notes', 'latency_ms'
+)
+
+
+def history_row(user_id, prediction_result, latency_ms=None):
+    """Flatten a predictor result into a symptom_analysis_history row"""
+    return {
+        'id': str(uuid.uuid4()),
+        'user_id': user_id,
+        'symptoms': prediction_result.get('input_symptoms', []),
+        'predicted_disease': prediction_result.get('predicted_disease', ''),
+        'confidence_score': round(prediction_result.get('confidence', 0.0) * 100, 2),
+        'top_predictions': [
+            {'rank': pred['rank'], 'disease': pred['disease'], 'confidence': pred['confidence']}
+            for pred in prediction_result.get('top_k_predictions', [])
+        ],
+        'analysis_timestamp': datetime.now(timezone.utc).isoformat(),
+        'follow_up_required': False,
+        'follow_up_notes': None,
+        'latency_ms': latency_ms
+    }
+
+
+class SQLiteHistoryStore(BackgroundWriter):
+    """Local stand-in for symptom_analysis_history with batched background inserts.
+
+    Rows are inserted by the writer thread one transaction per batch; reads use
+    a per-thread connection and see rows once their batch is committed.
+    Pages are ordered newest first and continue from an opaque cursor, so a
+    read walks the user_id / timestamp indexes instead of an OFFSET scan.
+    """
+
+    def __init__(self, path='analysis_history.db', **kwargs):
+        self.path = path
+        self.connection = None
+        self.readers = threading.local()
+        self._create_schema()
+        super().__init__(**kwargs)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        # WAL lets readers run alongside the writer; NORMAL skips the per-commit fsync
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _create_schema(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        connection.executescript(HISTORY_SCHEMA)
+        connection.close()
+
+    def open(self):
+        self.connection = self._connect()
+
+    def write(self, records):
+        with self.connection:
+            self.connection.executemany(
+                f"INSERT INTO symptom_analysis_history ({', '.join(HISTORY_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in HISTORY_COLUMNS)})",
+                [
+                    (
+                        row['id'], row['user_id'], dumps(row['symptoms']).decode('utf-8'),
+                        row['predicted_disease'], row['confidence_score'],
+                        dumps(row['top_predictions']).decode('utf-8'), row['analysis_timestamp'],
+                        int(row['follow_up_required']), row['follow_up_notes'], row['latency_ms']
+                    )
+                    for row in records
+                ]
+            )
+
+    def close_resources(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def record(self, user_id, prediction_result, latency_ms=None):
+        """Queue one prediction for insertion"""
+        return self.submit(history_row(user_id, prediction_result, latency_ms))
+
+    def _reader(self):
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path)
+            connection.row_factory = sqlite3.Row
+            self.readers.connection = connection
+        return connection
+
+    def history(self, user_id, limit=20, cursor=None):
+        """One page of a user's analyses, newest first
+
+        Args:
+            user_id: User whose history to read
+            limit: Maximum rows in the page
+            cursor: ``next_cursor`` of the previous page, or None for the first page
+
+        Returns:
+            Dict with ``items`` and ``next_cursor`` (None on the last page)
+        """
+        query = f"SELECT {', '.join(HISTORY_COLUMNS)} FROM symptom_analysis_history WHERE user_id = ?"
+        params = [user_id]
+        if cursor:
+            timestamp, _, row_id = cursor.partition('|')
+            query += " AND (analysis_timestamp < ? OR (analysis_timestamp = ? AND id < ?))"
+            params += [timestamp, timestamp, row_id]
+        query += " ORDER BY analysis_timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._reader().execute(query, params).fetchall()
+        items = [
+            {
+                **dict(row),
+                'symptoms': loads(row['symptoms']),
+                'top_predictions': loads(row['top_predictions']) if row['top_predictions'] else [],
+                'follow_up_required': bool(row['follow_up_required'])
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = f"{last['analysis_timestamp']}|{last['id']}"
+        return {'items': items, 'next_cursor': next_cursor}
+
+
+class NullHistoryStore(NullSink):
+    """Disabled history: predictions are not recorded"""
+
+    def record(self, user_id, prediction_result, latency_ms=None):
+        return True
+
+    def history(self, user_id, limit=20, cursor=None):
+        return {'items': [], 'next_cursor': None}
+
+
+HISTORY_STORES = ('sqlite', 'none')
+
+
+def history_store_from_env(default='none'):
+    """Build the history store from ``HISTORY_STORE`` ('sqlite' or 'none') and ``HISTORY_DB_PATH``
+
+    History holds symptoms and diagnoses, so it is off unless explicitly enabled.
+    """
+    kind = os.environ.get('HISTORY_STORE', default).lower()
+    if kind not in HISTORY_STORES:
+        raise ValueError(f"HISTORY_STORE must be one of {HISTORY_STORES}, got {kind!r}")
+    if kind == 'none':
+        return NullHistoryStore()
+    return SQLiteHistoryStore(
+        path=os.environ.get('HISTORY_DB_PATH', 'analysis_history.db'),
+        max_queue=int(os.environ.get('HISTORY_QUEUE', 10000)),
+        flush_interval=0.25
+    )
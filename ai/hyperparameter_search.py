@@ -0,0 +1,187 @@
+import math
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import SVC
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+from fold_cache import FoldCache
+
+# Base estimators mirror DiseasePredictionTrainer; the grids only vary the
+# parameters worth tuning. SVM is searched without probability calibration
+# because candidates are ranked on accuracy only.
+SEARCH_SPACES = {
+    'Naive_Bayes': {
+        'estimator': MultinomialNB(alpha=1.0),
+        'scaled': False,
+        'param_grid': {'alpha': [0.01, 0.1, 0.5, 1.0]}
+    },
+    'SVM': {
+        'estimator': SVC(kernel='linear', C=1.0, random_state=42),
+        'scaled': True,
+        'param_grid': {'C': [0.01, 0.1, 1.0, 10.0]}
+    },
+    'Random_Forest': {
+        'estimator': RandomForestClassifier(
+            n_estimators=100, max_depth=10, random_state=42, class_weight='balanced'
+        ),
+        'scaled': False,
+        'param_grid': {'n_estimators': [100, 200], 'max_depth': [10, 20, None]}
+    },
+    'Logistic_Regression': {
+        'estimator': LogisticRegression(
+            C=1.0, random_state=42, max_iter=1000, class_weight='balanced'
+        ),
+        'scaled': True,
+        'param_grid': {'C': [0.01, 0.1, 1.0, 10.0]}
+    },
+    'Neural_Network': {
+        'estimator': MLPClassifier(
+            hidden_layer_sizes=(512, 256, 128),
+            activation='relu',
+            solver='adam',
+            alpha=0.001,
+            batch_size=32,
+            learning_rate='adaptive',
+            max_iter=500,
+            random_state=42,
+            early_stopping=True,
+            validation_fraction=0.1
+        ),
+        'scaled': True,
+        'param_grid': {
+            'hidden_layer_sizes': [(512, 256, 128), (256, 128), (128,)],
+            'alpha': [0.0001, 0.001],
+            'batch_size': [32, 64]
+        }
+    }
+}
+
+
+def expand_grid(param_grid):
+    """Expand a parameter grid into a list of candidate parameter dicts"""
+    candidates = [{}]
+    for name, values in param_grid.items():
+        candidates = [dict(candidate, **{name: value}) for candidate in candidates for value in values]
+    return candidates
+
+
+def _fit_and_score(estimator, params, X_train, y_train, X_val, y_val):
+    """Fit one candidate on one fold and return its validation accuracy"""
+    start = time.perf_counter()
+    model = clone(estimator).set_params(**params)
+    model.fit(X_train, y_train)
+    accuracy = accuracy_score(y_val, model.predict(X_val))
+    return accuracy, time.perf_counter() - start
+
+
+class HyperparameterSearch:
+    """Successive-halving search over all model families on cached CV folds.
+
+    Every rung fits the surviving candidates of all families on the folds they
+    have not been scored on yet, in one process pool. Folds play the role of
+    the halving resource: rung ``i`` scores candidates on ``eta ** i`` folds
+    and keeps the best ``1 / eta`` of each family for the next rung.
+    """
+
+    def __init__(self, X, y, n_splits=3, n_jobs=-1, eta=3, time_budget=None,
+                 random_state=42, search_spaces=None):
+        self.fold_cache = FoldCache(X, y, n_splits=n_splits, random_state=random_state)
+        self.n_jobs = n_jobs
+        self.eta = eta
+        self.time_budget = time_budget
+        self.search_spaces = search_spaces or SEARCH_SPACES
+        self.results = {}
+        self.best_params = {}
+        self._scores = {}
+
+    def _rung_folds(self, rung):
+        """Number of folds a candidate is scored on at a given rung"""
+        return min(self.fold_cache.n_splits, self.eta ** rung)
+
+    def _mean_score(self, family, candidate_index):
+        """Mean accuracy of a candidate over the folds scored so far"""
+        scores = self._scores.get((family, candidate_index))
+        return float(np.mean(list(scores.values()))) if scores else 0.0
+
+    def _run_rung(self, survivors, candidates, n_folds):
+        """Score the survivors of every family on the first n_folds folds"""
+        tasks = []
+        for family, indices in survivors.items():
+            space = self.search_spaces[family]
+            for idx in indices:
+                for fold in range(n_folds):
+                    if fold in self._scores.get((family, idx), {}):
+                        continue
+                    tasks.append((family, idx, fold, space))
+
+        outputs = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_and_score)(
+                space['estimator'], candidates[family][idx],
+                *self.fold_cache.get_fold(fold, space['scaled'])
+            )
+            for family, idx, fold, space in tasks
+        )
+
+        fit_time = 0.0
+        for (family, idx, fold, _), (accuracy, elapsed) in zip(tasks, outputs):
+            self._scores.setdefault((family, idx), {})[fold] = accuracy
+            fit_time += elapsed
+        return len(tasks), fit_time
+
+    def run(self, families=None):
+        """Run the search and return the best parameters per model family"""
+        families = families or list(self.search_spaces.keys())
+        candidates = {
+            family: expand_grid(self.search_spaces[family]['param_grid'])
+            for family in families
+        }
+        survivors = {family: list(range(len(candidates[family]))) for family in families}
+
+        print(f"Searching {sum(len(c) for c in candidates.values())} candidates "
+              f"across {len(families)} model families "
+              f"({self.fold_cache.n_splits} folds, eta={self.eta}, n_jobs={self.n_jobs})")
+
+        start = time.perf_counter()
+        rung = 0
+        while True:
+            n_folds = self._rung_folds(rung)
+            n_fits, fit_time = self._run_rung(survivors, candidates, n_folds)
+            elapsed = time.perf_counter() - start
+            print(f"  Rung {rung}: {n_fits} fits on {n_folds} fold(s), "
+                  f"{fit_time:.1f}s of fitting in {elapsed:.1f}s wall time")
+
+            for family in families:
+                ranked = sorted(
+                    survivors[family], key=lambda idx: self._mean_score(family, idx), reverse=True
+                )
+                keep = max(1, math.ceil(len(ranked) / self.eta))
+                survivors[family] = ranked[:keep]
+
+            finished = n_folds >= self.fold_cache.n_splits or all(
+                len(indices) == 1 for indices in survivors.values()
+            )
+            if finished:
+                break
+            if self.time_budget is not None and elapsed >= self.time_budget:
+                print(f"  Time budget of {self.time_budget}s reached - stopping early")
+                break
+            rung += 1
+
+        for family in families:
+            best_idx = survivors[family][0]
+            self.best_params[family] = candidates[family][best_idx]
+            self.results[family] = {
+                'best_params': candidates[family][best_idx],
+                'best_score': self._mean_score(family, best_idx),
+                'candidates_evaluated': len(candidates[family]),
+                'rungs': rung + 1
+            }
+            print(f"  {family}: {candidates[family][best_idx]} "
+                  f"(CV accuracy {self.results[family]['best_score']:.4f})")
+
+        return self.best_params
@@ -8,6 +8,8 @@ and patient care recommendations for the disease prediction system.
 
 import json
 import os
+import asyncio
+import hashlib
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from api_integrations import MedicalAPIIntegrations
@@ -29,6 +31,7 @@ class MedicalDictionary:
         self.disease_database = {}
         self.medical_to_layman = {}
         self.care_plans = {}
+        self._content_version = None
         
         # Initialize API integrations
         self.api_integrations = MedicalAPIIntegrations()
@@ -47,6 +50,7 @@ class MedicalDictionary:
     
     def load_disease_database(self):
         """Load disease database from JSON file"""
+        self._content_version = None
         db_path = os.path.join(self.data_path, 'disease_database.json')
         if os.path.exists(db_path):
             try:
@@ -59,6 +63,7 @@ class MedicalDictionary:
     
     def load_medical_translations(self):
         """Load medical-to-layman translations"""
+        self._content_version = None
         trans_path = os.path.join(self.data_path, 'medical_translations.json')
         if os.path.exists(trans_path):
             try:
@@ -71,6 +76,7 @@ class MedicalDictionary:
     
     def load_care_plans(self):
         """Load care plans from JSON file"""
+        self._content_version = None
         care_path = os.path.join(self.data_path, 'care_plans.json')
         if os.path.exists(care_path):
             try:
@@ -83,6 +89,7 @@ class MedicalDictionary:
     
     def save_disease_database(self):
         """Save disease database to JSON file"""
+        self._content_version = None
         db_path = os.path.join(self.data_path, 'disease_database.json')
         try:
             with open(db_path, 'w', encoding='utf-8') as f:
@@ -93,6 +100,7 @@ class MedicalDictionary:
     
     def save_medical_translations(self):
         """Save medical translations to JSON file"""
+        self._content_version = None
         trans_path = os.path.join(self.data_path, 'medical_translations.json')
         try:
             with open(trans_path, 'w', encoding='utf-8') as f:
@@ -103,6 +111,7 @@ class MedicalDictionary:
     
     def save_care_plans(self):
         """Save care plans to JSON file"""
+        self._content_version = None
         care_path = os.path.join(self.data_path, 'care_plans.json')
         try:
             with open(care_path, 'w', encoding='utf-8') as f:
@@ -419,6 +428,24 @@ class MedicalDictionary:
         
         return result
     
+    def content_version(self) -> str:
+        """
+        Hash of the disease database, care plans and translations
+        
+        Recomputed only after the dictionary is loaded or saved, so it can be
+        used to version cached responses.
+        
+        Returns:
+            Short hex digest identifying the current dictionary content
+        """
+        if self._content_version is None:
+            content = json.dumps(
+                [self.disease_database, self.care_plans, self.medical_to_layman],
+                sort_keys=True, ensure_ascii=False
+            )
+            self._content_version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        return self._content_version
+    
     def _normalize_disease_name(self, disease_name: str) -> str:
         """
         Normalize disease name for consistent lookup
@@ -607,6 +634,40 @@ class MedicalDictionary:
         Returns:
             Nutritional recommendations with food information
         """
+        recommended_foods, foods_to_avoid, food_names = self._food_recommendations(disease_name)
+        
+        # Get nutrition information for recommended foods
+        food_nutrition = {}
+        for food_name in food_names:
+            nutrition_info = self.get_food_nutrition(food_name)
+            if nutrition_info:
+                food_nutrition[food_name] = nutrition_info
+        
+        return self._nutritional_recommendations(disease_name, recommended_foods, foods_to_avoid, food_nutrition)
+    
+    async def get_nutritional_recommendations_async(self, disease_name: str, api_integrations) -> Dict[str, Any]:
+        """
+        Get nutritional recommendations for a disease, looking up foods concurrently
+        
+        Args:
+            disease_name: Name of the disease
+            api_integrations: AsyncMedicalAPIIntegrations used for the food lookups
+            
+        Returns:
+            Nutritional recommendations with food information
+        """
+        recommended_foods, foods_to_avoid, food_names = self._food_recommendations(disease_name)
+        
+        results = await asyncio.gather(*(api_integrations.get_food_nutrition(name) for name in food_names))
+        food_nutrition = {
+            food_name: nutrition_info
+            for food_name, nutrition_info in zip(food_names, results) if nutrition_info
+        }
+        
+        return self._nutritional_recommendations(disease_name, recommended_foods, foods_to_avoid, food_nutrition)
+    
+    def _food_recommendations(self, disease_name: str):
+        """Recommended foods, foods to avoid and the food names to look up"""
         # Get disease-specific foods from care plan
         care_plan = self.get_care_plan(disease_name)
         recommended_foods = []
@@ -621,16 +682,17 @@ class MedicalDictionary:
                     elif 'avoid' in rec.lower() or 'don\'t' in rec.lower():
                         foods_to_avoid.append(rec)
         
-        # Get nutrition information for recommended foods
-        food_nutrition = {}
+        food_names = []
         for food_rec in recommended_foods[:3]:  # Limit to first 3 foods
             # Extract food name from recommendation
             food_name = self._extract_food_name(food_rec)
-            if food_name:
-                nutrition_info = self.get_food_nutrition(food_name)
-                if nutrition_info:
-                    food_nutrition[food_name] = nutrition_info
+            if food_name and food_name not in food_names:
+                food_names.append(food_name)
         
+        return recommended_foods, foods_to_avoid, food_names
+    
+    def _nutritional_recommendations(self, disease_name: str, recommended_foods: List[str],
+                                     foods_to_avoid: List[str], food_nutrition: Dict) -> Dict[str, Any]:
         return {
             'disease': disease_name,
             'recommended_foods': recommended_foods,
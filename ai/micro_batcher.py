@@ -0,0 +1,109 @@
+import time
+import queue
+import threading
+import atexit
+from collections import Counter
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Coalesces concurrent single predictions into ``predict_batch`` calls.
+
+    Callers block on a future while one worker thread drains the queue: it
+    takes everything already waiting, up to ``max_batch_size``, and runs one
+    vectorized pass through TF-IDF, the scaler and the ensemble. The worker
+    only holds a batch open for ``max_wait_ms`` while the previous batch had
+    more than one request, so an idle server answers without added delay and
+    a busy one fills batches from the requests that arrive during each pass.
+    """
+
+    def __init__(self, predictor, max_batch_size=32, max_wait_ms=2.0):
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.batch_sizes = Counter()
+        self.thread = threading.Thread(target=self._run, name='MicroBatcher', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, symptoms_text, top_k=5):
+        """Queue one prediction; returns a Future resolving to its result"""
+        future = Future()
+        if not self.thread.is_alive():
+            future.set_exception(RuntimeError("MicroBatcher is closed"))
+            return future
+        self.queue.put((symptoms_text, top_k, future))
+        return future
+
+    def predict(self, symptoms_text, top_k=5):
+        """Same result as ``predictor.predict_disease``, computed in a shared batch"""
+        return self.submit(symptoms_text, top_k).result()
+
+    def _collect(self, first, wait):
+        batch = [first]
+        deadline = time.monotonic() + wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self.queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        last_size = 1
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            batch = self._collect(item, self.max_wait if last_size > 1 else 0)
+            last_size = len(batch)
+            with self.lock:
+                self.batch_sizes[last_size] += 1
+            self._predict(batch)
+
+    def _predict(self, batch):
+        # Run at the batch's largest top_k and trim each result to its own
+        top_k = max(k for _, k, _ in batch)
+        try:
+            results = self.predictor.predict_batch([text for text, _, _ in batch], top_k=top_k)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][2].set_exception(e)
+            else:
+                # Retry one by one so a bad input only fails its own request
+                for item in batch:
+                    self._predict([item])
+            return
+
+        for (_, k, future), result in zip(batch, results):
+            if k < top_k:
+                result['top_k_predictions'] = result['top_k_predictions'][:k]
+            future.set_result(result)
+
+    def close(self, timeout=5.0):
+        """Finish queued predictions and stop the worker thread"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            batches = sum(self.batch_sizes.values())
+            requests = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'batches': batches,
+                'requests': requests,
+                'mean_batch_size': requests / batches if batches else 0.0,
+                'batch_size_histogram': {str(size): count for size, count in sorted(self.batch_sizes.items())}
+            }
@@ -0,0 +1,145 @@
+import time
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import precision_score, recall_score, f1_score
+from fold_cache import FoldCache
+from cascade import DECISION_MEMBERS, majority_vote
+
+
+def align_proba(proba, model_classes, classes):
+    """Place a model's probability columns at the positions of the full class list"""
+    if len(model_classes) == len(classes) and np.array_equal(model_classes, classes):
+        return proba
+    aligned = np.zeros((proba.shape[0], len(classes)))
+    aligned[:, np.searchsorted(classes, model_classes)] = proba
+    return aligned
+
+
+def proba_metrics(y_true, proba, classes, top_k=(3, 5), y_pred=None):
+    """Compute accuracy, precision, recall, F1 and top-k from one probability matrix
+
+    ``y_pred`` overrides the argmax of ``proba`` for the label metrics, for
+    models whose served decision is not their most probable class.
+    """
+    ranked = np.argsort(-proba, axis=1)[:, :max(top_k)]
+    if y_pred is None:
+        y_pred = classes[ranked[:, 0]]
+    true_idx = np.searchsorted(classes, y_true)
+
+    metrics = {
+        'accuracy': float(np.mean(y_pred == y_true)),
+        'precision': precision_score(y_true, y_pred, average='weighted', zero_division=0),
+        'recall': recall_score(y_true, y_pred, average='weighted', zero_division=0),
+        'f1_score': f1_score(y_true, y_pred, average='weighted', zero_division=0),
+        'predictions': y_pred
+    }
+    for k in top_k:
+        metrics[f'top{k}_accuracy'] = float(np.mean((ranked[:, :k] == true_idx[:, None]).any(axis=1)))
+    return metrics
+
+
+def served_predictions(model_name, model, X, proba, classes):
+    """Hard predictions the way DiseasePredictor.predict_member serves them
+
+    ``proba`` is the model's probability matrix aligned to ``classes``.
+    """
+    if model_name in DECISION_MEMBERS:
+        return model.predict(X)
+    return classes[np.argmax(proba, axis=1)]
+
+
+def served_vote(member_predictions, classes):
+    """The full profile's majority vote over members' hard predictions (ties to the lowest class)"""
+    votes = np.column_stack([np.searchsorted(classes, pred) for pred in member_predictions])
+    return classes[majority_vote(votes, len(classes))]
+
+
+def _fit_fold(model_name, model, X_train, y_train, X_val, classes):
+    """Fit a clone of the model on one fold; returns aligned validation probabilities and served predictions"""
+    start = time.perf_counter()
+    fitted = clone(model).fit(X_train, y_train)
+    proba = align_proba(fitted.predict_proba(X_val), fitted.classes_, classes)
+    y_pred = served_predictions(model_name, fitted, X_val, proba, classes)
+    return proba, y_pred, time.perf_counter() - start
+
+
+class CrossValidationEngine:
+    """Cross-validate ensemble members once on the training split.
+
+    Folds and per-fold scalers come from a shared FoldCache, every (model, fold)
+    fit runs in one process pool, and the out-of-fold probabilities are kept so
+    the ensemble's CV score is derived from its members without any refit.
+    Scores use the decisions serving makes: ``predict`` for the DECISION_MEMBERS,
+    the most probable class for the other members, and the members' majority
+    vote for the ensemble.
+    """
+
+    def __init__(self, X, y, n_splits=3, n_jobs=-1, random_state=42, fold_cache=None):
+        self.fold_cache = fold_cache or FoldCache(X, y, n_splits=n_splits, random_state=random_state)
+        self.n_jobs = n_jobs
+        self.classes = self.fold_cache.classes
+        self.results = {}
+
+    def _fold_scores(self, oof_pred):
+        """Accuracy of out-of-fold predictions on each fold"""
+        y = self.fold_cache.y
+        return np.array([
+            np.mean(oof_pred[fold['val_idx']] == y[fold['val_idx']])
+            for fold in self.fold_cache.folds
+        ])
+
+    def run(self, models, scaled_models, ensemble_name='Ensemble'):
+        """Cross-validate every model and the majority-vote ensemble
+
+        Args:
+            models: Dictionary of (fitted or unfitted) estimators to clone
+            scaled_models: Names of the models that train on scaled features
+            ensemble_name: Name under which the averaged ensemble is reported
+        """
+        print(f"Cross-validating {len(models)} models on "
+              f"{self.fold_cache.n_splits} cached training folds...")
+
+        tasks = [
+            (name, fold_index)
+            for name in models
+            for fold_index in range(self.fold_cache.n_splits)
+        ]
+        outputs = Parallel(n_jobs=self.n_jobs)(
+            delayed(_fit_fold)(
+                name,
+                models[name],
+                *self.fold_cache.get_fold(fold_index, name in scaled_models)[:3],
+                self.classes
+            )
+            for name, fold_index in tasks
+        )
+
+        n_samples = len(self.fold_cache.y)
+        oof = {name: np.zeros((n_samples, len(self.classes))) for name in models}
+        oof_pred = {name: np.empty(n_samples, dtype=self.classes.dtype) for name in models}
+        fit_times = {name: 0.0 for name in models}
+        for (name, fold_index), (proba, y_pred, elapsed) in zip(tasks, outputs):
+            val_idx = self.fold_cache.folds[fold_index]['val_idx']
+            oof[name][val_idx] = proba
+            oof_pred[name][val_idx] = y_pred
+            fit_times[name] += elapsed
+
+        for name in models:
+            self.results[name] = {
+                'cv_scores': self._fold_scores(oof_pred[name]),
+                'oof_proba': oof[name],
+                'oof_pred': oof_pred[name],
+                'fit_time': fit_times[name]
+            }
+
+        if ensemble_name and len(models) > 1:
+            ensemble_pred = served_vote([oof_pred[name] for name in models], self.classes)
+            self.results[ensemble_name] = {
+                'cv_scores': self._fold_scores(ensemble_pred),
+                'oof_proba': np.mean([oof[name] for name in models], axis=0),
+                'oof_pred': ensemble_pred,
+                'fit_time': 0.0
+            }
+
+        return self.results
@@ -2,12 +2,11 @@ import pandas as pd
 import numpy as np
 import pickle
 import json
-from sklearn.model_selection import train_test_split, cross_val_score, StratifiedKFold
+import os
+import ast
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (
-    classification_report, confusion_matrix, accuracy_score,
-    precision_score, recall_score, f1_score, top_k_accuracy_score
-)
+from sklearn.metrics import confusion_matrix
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.svm import SVC
 from sklearn.ensemble import RandomForestClassifier, VotingClassifier
@@ -16,10 +15,25 @@ from sklearn.neural_network import MLPClassifier
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
+from feature_store import FeatureStore
+from hyperparameter_search import HyperparameterSearch
+from parallel_training import ParallelModelTrainer
+from model_evaluation import CrossValidationEngine, align_proba, proba_metrics, served_vote
+from distillation import StudentDistiller
+from quantized_inference import QuantizedDenseModel, drift_report
+from forest_compiler import CompiledForest
+from cascade import CASCADE_CONFIG_FILE, DECISION_MEMBERS, calibrate_cascade, measure_member_costs, save_cascade_config
+from augmentation_engine import AugmentationEngine
+from data_augmentation import NOISE_PATTERNS
+from disease_predictor import DiseasePredictor
+from hashing_features import load_vectorizer
 import warnings
 warnings.filterwarnings('ignore')
 
 class DiseasePredictionTrainer:
+    # Models trained on standardized features; the rest use the raw matrix
+    SCALED_MODELS = ('SVM', 'Logistic_Regression', 'Neural_Network')
+    
     def __init__(self, data_path='augmented_data'):
         self.data_path = data_path
         self.models = {}
@@ -31,14 +45,28 @@ class DiseasePredictionTrainer:
         self.y_test = None
         self.X_val = None
         self.y_val = None
+        self.best_params = {}
+        self.search_results = {}
+        self.training_times = {}
+        self.cv_results = {}
+        self.student = None
+        self.distillation_report = {}
+        self.quantization_report = {}
+        self.forest_report = {}
+        self.compiled_forest = None
+        self.cascade_config = {}
         
     def load_data(self):
         """Load preprocessed features and labels"""
         print("Loading preprocessed data...")
         
-        # Load features and labels
-        self.X = pd.read_csv(f'{self.data_path}/features.csv')
-        self.y = pd.read_csv(f'{self.data_path}/labels.csv').values.ravel()
+        # Load features and labels, preferring the binary feature store
+        store = FeatureStore(f'{self.data_path}/feature_store')
+        if store.exists():
+            self.X, self.y = store.load_frame()
+        else:
+            self.X = pd.read_csv(f'{self.data_path}/features.csv')
+            self.y = pd.read_csv(f'{self.data_path}/labels.csv').values.ravel()
         
         # Load metadata
         with open(f'{self.data_path}/metadata.json', 'r') as f:
@@ -92,43 +120,88 @@ class DiseasePredictionTrainer:
         
         return self.X_train_scaled, self.X_val_scaled, self.X_test_scaled
     
+    def search_hyperparameters(self, n_jobs=-1, time_budget=None, families=None):
+        """Search hyperparameters for every model family on the training split"""
+        print("=" * 60)
+        print("HYPERPARAMETER SEARCH")
+        print("=" * 60)
+        
+        search = HyperparameterSearch(
+            self.X_train, self.y_train, n_jobs=n_jobs, time_budget=time_budget
+        )
+        self.best_params = search.run(families)
+        self.search_results = search.results
+        
+        print("Hyperparameter search completed!")
+        
+        return self.best_params
+    
+    def create_models(self):
+        """Create unfitted models with default or searched hyperparameters"""
+        models = {
+            # Naive Bayes (works well with TF-IDF features)
+            'Naive_Bayes': MultinomialNB(alpha=1.0),
+            'SVM': SVC(kernel='linear', C=1.0, random_state=42, probability=True),
+            'Random_Forest': RandomForestClassifier(
+                n_estimators=100, 
+                max_depth=10, 
+                random_state=42,
+                class_weight='balanced'
+            ),
+            'Logistic_Regression': LogisticRegression(
+                C=1.0, 
+                random_state=42, 
+                max_iter=1000,
+                class_weight='balanced'
+            ),
+            'Neural_Network': MLPClassifier(
+                hidden_layer_sizes=(512, 256, 128),
+                activation='relu',
+                solver='adam',
+                alpha=0.001,
+                batch_size=32,
+                learning_rate='adaptive',
+                max_iter=500,
+                random_state=42,
+                early_stopping=True,
+                validation_fraction=0.1
+            )
+        }
+        
+        for model_name, model in models.items():
+            model.set_params(**self.best_params.get(model_name, {}))
+        
+        return models
+    
     def train_baseline_models(self):
         """Train baseline models"""
         print("=" * 60)
         print("TRAINING BASELINE MODELS")
         print("=" * 60)
         
+        models = self.create_models()
+        
         # 1. Naive Bayes (works well with TF-IDF features)
         print("Training Naive Bayes...")
-        nb_model = MultinomialNB(alpha=1.0)
+        nb_model = models['Naive_Bayes']
         nb_model.fit(self.X_train, self.y_train)
         self.models['Naive_Bayes'] = nb_model
         
         # 2. Support Vector Machine
         print("Training Support Vector Machine...")
-        svm_model = SVC(kernel='linear', C=1.0, random_state=42, probability=True)
+        svm_model = models['SVM']
         svm_model.fit(self.X_train_scaled, self.y_train)
         self.models['SVM'] = svm_model
         
         # 3. Random Forest
         print("Training Random Forest...")
-        rf_model = RandomForestClassifier(
-            n_estimators=100, 
-            max_depth=10, 
-            random_state=42,
-            class_weight='balanced'
-        )
+        rf_model = models['Random_Forest']
         rf_model.fit(self.X_train, self.y_train)
         self.models['Random_Forest'] = rf_model
         
         # 4. Logistic Regression
         print("Training Logistic Regression...")
-        lr_model = LogisticRegression(
-            C=1.0, 
-            random_state=42, 
-            max_iter=1000,
-            class_weight='balanced'
-        )
+        lr_model = models['Logistic_Regression']
         lr_model.fit(self.X_train_scaled, self.y_train)
         self.models['Logistic_Regression'] = lr_model
         
@@ -144,18 +217,7 @@ class DiseasePredictionTrainer:
         
         # Multi-layer Perceptron
         print("Training Multi-layer Perceptron...")
-        mlp_model = MLPClassifier(
-            hidden_layer_sizes=(512, 256, 128),
-            activation='relu',
-            solver='adam',
-            alpha=0.001,
-            batch_size=32,
-            learning_rate='adaptive',
-            max_iter=500,
-            random_state=42,
-            early_stopping=True,
-            validation_fraction=0.1
-        )
+        mlp_model = self.create_models()['Neural_Network']
         
         mlp_model.fit(self.X_train_scaled, self.y_train)
         self.models['Neural_Network'] = mlp_model
@@ -164,6 +226,27 @@ class DiseasePredictionTrainer:
         
         return mlp_model
     
+    def train_models_parallel(self, n_jobs=-1):
+        """Train all ensemble members concurrently in worker processes"""
+        print("=" * 60)
+        print("TRAINING MODELS IN PARALLEL")
+        print("=" * 60)
+        
+        trainer = ParallelModelTrainer(n_jobs=n_jobs)
+        fitted_models = trainer.fit(
+            self.create_models(),
+            self.X_train,
+            self.X_train_scaled,
+            self.y_train,
+            scaled_models=self.SCALED_MODELS
+        )
+        self.models.update(fitted_models)
+        self.training_times = trainer.training_times
+        
+        print("All models trained successfully!")
+        
+        return self.models
+    
     def create_ensemble_model(self):
         """Create ensemble model combining best models"""
         print("=" * 60)
@@ -234,59 +317,74 @@ class DiseasePredictionTrainer:
         
         return ensemble_model
     
-    def evaluate_model(self, model, model_name, X_test, y_test):
-        """Evaluate a single model"""
+    def cross_validate_models(self, n_jobs=-1, n_splits=3):
+        """Cross-validate the ensemble members once on the training data"""
+        print("=" * 60)
+        print("CROSS-VALIDATING MODELS")
+        print("=" * 60)
+        
+        members = {name: model for name, model in self.models.items() if name != 'Ensemble'}
+        engine = CrossValidationEngine(self.X_train, self.y_train, n_splits=n_splits, n_jobs=n_jobs)
+        self.cv_results = engine.run(members, scaled_models=self.SCALED_MODELS)
+        
+        for model_name, cv_result in self.cv_results.items():
+            print(f"  {model_name}: {cv_result['cv_scores'].mean():.4f} "
+                  f"(fit time {cv_result['fit_time']:.2f}s)")
+        
+        return self.cv_results
+    
+    def evaluate_model(self, model, model_name, X_test, y_test, y_pred=None):
+        """Evaluate a single model
+        
+        Label metrics use the served decision: ``y_pred`` when given, ``predict``
+        for the DECISION_MEMBERS and the most probable class otherwise.
+        """
         print(f"\nEvaluating {model_name}...")
         
-        # Make predictions
-        y_pred = model.predict(X_test)
-        y_pred_proba = model.predict_proba(X_test) if hasattr(model, 'predict_proba') else None
-        
-        # Calculate metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, average='weighted')
-        recall = recall_score(y_test, y_pred, average='weighted')
-        f1 = f1_score(y_test, y_pred, average='weighted')
-        
-        # Top-k accuracy
-        top3_accuracy = top_k_accuracy_score(y_test, y_pred_proba, k=3) if y_pred_proba is not None else 0
-        top5_accuracy = top_k_accuracy_score(y_test, y_pred_proba, k=5) if y_pred_proba is not None else 0
-        
-        # Cross-validation score (use fewer folds due to small dataset)
-        try:
-            cv_scores = cross_val_score(model, X_test, y_test, cv=3, scoring='accuracy')
-        except ValueError:
-            # If still too few samples, use 2-fold or skip CV
-            try:
-                cv_scores = cross_val_score(model, X_test, y_test, cv=2, scoring='accuracy')
-            except ValueError:
-                cv_scores = np.array([accuracy])  # Use test accuracy as fallback
+        # Every metric is derived from a single predict_proba call
+        if hasattr(model, 'predict_proba'):
+            y_pred_proba = model.predict_proba(X_test)
+            classes = getattr(model, 'classes_', np.unique(self.y_train))
+        else:
+            y_pred = model.predict(X_test)
+            classes = np.unique(self.y_train)
+            y_pred_proba = (np.asarray(y_pred)[:, None] == classes).astype(float)
+        if y_pred is None and model_name in DECISION_MEMBERS:
+            y_pred = model.predict(X_test)
+        metrics = proba_metrics(np.asarray(y_test), y_pred_proba, np.asarray(classes), y_pred=y_pred)
+        
+        # Cross-validation score computed once on the training folds
+        cv_result = self.cv_results.get(model_name)
+        cv_scores = cv_result['cv_scores'] if cv_result else np.array([metrics['accuracy']])
         
         results = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-            'f1_score': f1,
-            'top3_accuracy': top3_accuracy,
-            'top5_accuracy': top5_accuracy,
+            'accuracy': metrics['accuracy'],
+            'precision': metrics['precision'],
+            'recall': metrics['recall'],
+            'f1_score': metrics['f1_score'],
+            'top3_accuracy': metrics['top3_accuracy'],
+            'top5_accuracy': metrics['top5_accuracy'],
             'cv_mean': cv_scores.mean(),
             'cv_std': cv_scores.std(),
-            'predictions': y_pred,
+            'predictions': metrics['predictions'],
             'probabilities': y_pred_proba
         }
         
-        print(f"  Accuracy: {accuracy:.4f}")
-        print(f"  Precision: {precision:.4f}")
-        print(f"  Recall: {recall:.4f}")
-        print(f"  F1-Score: {f1:.4f}")
-        print(f"  Top-3 Accuracy: {top3_accuracy:.4f}")
-        print(f"  Top-5 Accuracy: {top5_accuracy:.4f}")
+        print(f"  Accuracy: {results['accuracy']:.4f}")
+        print(f"  Precision: {results['precision']:.4f}")
+        print(f"  Recall: {results['recall']:.4f}")
+        print(f"  F1-Score: {results['f1_score']:.4f}")
+        print(f"  Top-3 Accuracy: {results['top3_accuracy']:.4f}")
+        print(f"  Top-5 Accuracy: {results['top5_accuracy']:.4f}")
         print(f"  CV Score: {cv_scores.mean():.4f} (+/- {cv_scores.std() * 2:.4f})")
         
         return results
     
-    def evaluate_all_models(self):
+    def evaluate_all_models(self, n_jobs=-1):
         """Evaluate all trained models"""
+        if not self.cv_results:
+            self.cross_validate_models(n_jobs=n_jobs)
+        
         print("=" * 60)
         print("EVALUATING ALL MODELS")
         print("=" * 60)
@@ -301,12 +399,207 @@ class DiseasePredictionTrainer:
             'Ensemble': (self.X_test, self.y_test)  # Custom ensemble uses original features
         }
         
-        for model_name, model in self.models.items():
+        members = [name for name in self.models if name != 'Ensemble']
+        for model_name in members:
             X_test_model, y_test_model = model_features[model_name]
-            self.results[model_name] = self.evaluate_model(model, model_name, X_test_model, y_test_model)
+            self.results[model_name] = self.evaluate_model(self.models[model_name], model_name, X_test_model, y_test_model)
+        
+        # The ensemble is scored on the majority vote the full profile serves
+        if 'Ensemble' in self.models:
+            X_test_model, y_test_model = model_features['Ensemble']
+            y_pred = served_vote([self.results[name]['predictions'] for name in members], np.unique(self.y_train))
+            self.results['Ensemble'] = self.evaluate_model(
+                self.models['Ensemble'], 'Ensemble', X_test_model, y_test_model, y_pred=y_pred
+            )
         
         return self.results
     
+    def distill_student(self, temperature=1.0, C=10.0):
+        """Distill the ensemble into a compact student for low-latency serving"""
+        print("=" * 60)
+        print("DISTILLING STUDENT MODEL")
+        print("=" * 60)
+        
+        teacher = self.models['Ensemble']
+        classes = np.unique(self.y_train)
+        distiller = StudentDistiller(C=C, temperature=temperature)
+        
+        # The student is served on the same scaled features as the linear members
+        self.student = distiller.fit(self.X_train_scaled, teacher.predict_proba(self.X_train), classes)
+        self.distillation_report = distiller.report(
+            self.X_test_scaled, teacher, self.X_test, y_true=np.asarray(self.y_test)
+        )
+        self.distillation_report['temperature'] = temperature
+        
+        for metric, value in self.distillation_report.items():
+            print(f"  {metric}: {value:.4f}")
+        
+        return self.student
+    
+    def export_quantized_models(self, output_dir='trained_models', mode='float32'):
+        """Export the MLP and linear members for NumPy float32/int8 inference
+
+        int8 exports stay int8 in memory as well as on disk, trading some
+        per-request latency for a quarter of the float32 resident weights.
+        """
+        print("=" * 60)
+        print(f"EXPORTING QUANTIZED MODELS ({mode})")
+        print("=" * 60)
+        
+        import os
+        os.makedirs(output_dir, exist_ok=True)
+        
+        for model_name in ('Neural_Network', 'Logistic_Regression'):
+            if model_name not in self.models:
+                continue
+            exported = QuantizedDenseModel.from_sklearn(self.models[model_name], mode=mode)
+            exported.save(f'{output_dir}/{model_name.lower()}_{mode}.npz')
+            
+            report = drift_report(self.models[model_name], exported, self.X_test_scaled, np.asarray(self.y_test))
+            self.quantization_report[f'{model_name}_{mode}'] = report
+            print(f"  {model_name}: top-1 agreement {report['top1_agreement']:.4f}, "
+                  f"max |dp| {report['max_abs_proba_diff']:.2e}, "
+                  f"{report['reference_param_bytes'] / 1e6:.2f} MB -> {report['exported_param_bytes'] / 1e6:.2f} MB")
+        
+        return self.quantization_report
+    
+    def export_compiled_forest(self, output_dir='trained_models'):
+        """Export the Random Forest as flat, memory-mappable node arrays"""
+        print("=" * 60)
+        print("COMPILING RANDOM FOREST")
+        print("=" * 60)
+        
+        if 'Random_Forest' not in self.models:
+            print("  Random Forest not trained - skipping")
+            return self.forest_report
+        
+        import time
+        forest = self.models['Random_Forest']
+        compiled = CompiledForest.from_sklearn(forest)
+        self.compiled_forest = compiled
+        compiled.save(f'{output_dir}/random_forest_compiled')
+        
+        X_test = np.asarray(self.X_test)
+        start = time.perf_counter()
+        reference_proba = forest.predict_proba(self.X_test)
+        reference_time = time.perf_counter() - start
+        start = time.perf_counter()
+        compiled_proba = compiled.predict_proba(X_test)
+        compiled_time = time.perf_counter() - start
+        
+        pickle_bytes = len(pickle.dumps(forest))
+        
+        self.forest_report = {
+            'n_trees': int(len(compiled.roots)),
+            'n_nodes': int(len(compiled.threshold)),
+            'max_depth': compiled.max_depth,
+            'max_abs_proba_diff': float(np.abs(reference_proba - compiled_proba).max()),
+            'pickle_bytes': pickle_bytes,
+            'compiled_bytes': int(compiled.nbytes),
+            'sklearn_ms_per_sample': 1000 * reference_time / len(X_test),
+            'compiled_ms_per_sample': 1000 * compiled_time / len(X_test)
+        }
+        print(f"  {self.forest_report['n_trees']} trees, {self.forest_report['n_nodes']} nodes, "
+              f"max |dp| {self.forest_report['max_abs_proba_diff']:.2e}")
+        print(f"  {pickle_bytes / 1e6:.2f} MB pickle -> {compiled.nbytes / 1e6:.2f} MB arrays")
+        
+        return self.forest_report
+    
+    def cascade_calibration_inputs(self, n_queries=3, max_symptoms=3, noise_probability=0.3,
+                                   word_keep=0.6, seed=42):
+        """Short, noisy queries built from the validation rows and featurized like serving input
+        
+        Every disease comes from a single source list, so clean validation rows
+        are near-copies of training rows and the cheap members look far more
+        certain on them than on typed queries. Each validation row instead
+        yields ``n_queries`` queries of 2 to ``max_symptoms`` of its symptoms,
+        some with typos and each symptom cut to a random part of its words,
+        run through DiseasePredictor.preprocess_symptoms.
+        
+        Returns:
+            Raw feature matrix, or None when the validation rows' symptom lists
+            (processed_augmented_data.csv) are not available
+        """
+        path = f'{self.data_path}/processed_augmented_data.csv'
+        if not os.path.exists(path):
+            return None
+        symptom_lists = pd.read_csv(path, usecols=['symptoms_list'])['symptoms_list']
+        if len(symptom_lists) != len(self.X):
+            return None
+        symptom_lists = [ast.literal_eval(symptoms) for symptoms in symptom_lists.values[self.X_val.index]]
+        
+        engine = AugmentationEngine(symptom_lists, {}, {})
+        rng = np.random.default_rng(seed)
+        noise_table, noise_counts = engine.lookup_table(NOISE_PATTERNS)
+        batch = engine.base.take(np.repeat(np.arange(len(engine.base)), n_queries))
+        batch = engine.replace_tokens(batch, noise_table, noise_counts, noise_probability, rng)
+        batch = engine.keep_random(batch, rng.integers(2, max_symptoms + 1, len(batch)), rng)
+        
+        predictor = DiseasePredictor(data_path=self.data_path)
+        predictor.tfidf_vectorizer = load_vectorizer(self.data_path)
+        tokens = np.array(engine.vocab, dtype=object)[batch.ids]
+        queries = []
+        for start, end in zip(batch.offsets[:-1], batch.offsets[1:]):
+            symptoms = []
+            for symptom in tokens[start:end]:
+                # Typed queries often name part of a symptom ("pain" for "joint pain")
+                words = symptom.split()
+                kept = [word for word in words if rng.random() < word_keep]
+                symptoms.append(' '.join(kept or [words[rng.integers(len(words))]]))
+            queries.append(', '.join(symptoms))
+        return np.vstack([predictor.preprocess_symptoms(query)[0] for query in queries])
+    
+    def calibrate_cascade(self, target_agreement=0.99, top_k=3, output_dir='trained_models'):
+        """Learn cheap-first cascade gates on short, noisy validation queries"""
+        print("=" * 60)
+        print("CALIBRATING CASCADE")
+        print("=" * 60)
+        
+        # Time the members as they will be served
+        members = {name: model for name, model in self.models.items() if name != 'Ensemble'}
+        if self.compiled_forest is not None and 'Random_Forest' in members:
+            members['Random_Forest'] = self.compiled_forest
+        
+        X_calibration = self.cascade_calibration_inputs()
+        if X_calibration is None:
+            print("  Validation symptom lists not found - calibrating on the clean validation split")
+            calibration_set = 'validation'
+            X_calibration, X_calibration_scaled = np.asarray(self.X_val), self.X_val_scaled
+        else:
+            calibration_set = 'noisy_partial_validation_queries'
+            X_calibration_scaled = self.scaler.transform(pd.DataFrame(X_calibration, columns=self.X.columns))
+        print(f"  Calibration inputs: {len(X_calibration)} ({calibration_set})")
+        
+        inputs = {
+            name: X_calibration_scaled if name in self.SCALED_MODELS else X_calibration
+            for name in members
+        }
+        classes = np.unique(self.y)
+        member_probas = {
+            name: align_proba(model.predict_proba(inputs[name]), model.classes_, classes)
+            for name, model in members.items()
+        }
+        # Hard predictions as DiseasePredictor.predict_member makes them, for the majority vote
+        member_votes = {
+            name: np.searchsorted(classes, model.predict(inputs[name])) if name in DECISION_MEMBERS
+            else np.argmax(member_probas[name], axis=1)
+            for name, model in members.items()
+        }
+        costs = measure_member_costs(members, inputs)
+        
+        self.cascade_config = calibrate_cascade(member_probas, costs, top_k=top_k, target_agreement=target_agreement,
+                                                member_votes=member_votes)
+        self.cascade_config['calibration_set'] = calibration_set
+        os.makedirs(output_dir, exist_ok=True)
+        save_cascade_config(self.cascade_config, f'{output_dir}/{CASCADE_CONFIG_FILE}')
+        
+        print(f"  Order: {' -> '.join(self.cascade_config['order'])}")
+        print(f"  Validation top-{top_k} agreement: {self.cascade_config[f'val_top{top_k}_agreement']:.4f}, "
+              f"mean depth {self.cascade_config['val_mean_depth']:.2f}")
+        print(f"  Expected {self.cascade_config['expected_ms']:.2f} ms vs full {self.cascade_config['full_ms']:.2f} ms")
+        
+        return self.cascade_config
+    
     def create_model_comparison(self):
         """Create comparison of all models"""
         print("=" * 60)
@@ -411,16 +704,23 @@ class DiseasePredictionTrainer:
         
         print(f"Saving models and results to {output_dir}/...")
         
-        # Save individual models
-        for model_name, model in self.models.items():
-            filename = f'{output_dir}/{model_name.lower().replace(" ", "_")}_model.pkl'
-            with open(filename, 'wb') as f:
-                pickle.dump(model, f)
-        
         # Save scaler
         with open(f'{output_dir}/scaler.pkl', 'wb') as f:
             pickle.dump(self.scaler, f)
         
+        # Save distilled student (kept apart from the ensemble members)
+        if self.student is not None:
+            with open(f'{output_dir}/student_model.pkl', 'wb') as f:
+                pickle.dump(self.student, f)
+        
+        # Save individual models; the Ensemble is a local class that cannot be
+        # pickled, and the predictor rebuilds it from the members
+        members = {name: model for name, model in self.models.items() if name != 'Ensemble'}
+        for model_name, model in members.items():
+            filename = f'{output_dir}/{model_name.lower().replace(" ", "_")}_model.pkl'
+            with open(filename, 'wb') as f:
+                pickle.dump(model, f)
+        
         # Save results
         results_to_save = {}
         for model_name, results in self.results.items():
@@ -451,18 +751,43 @@ class DiseasePredictionTrainer:
             'best_model': max(self.results.items(), key=lambda x: x[1]['accuracy'])[0]
         }
         
+        if self.search_results:
+            training_metadata['hyperparameter_search'] = self.search_results
+        
+        if self.training_times:
+            training_metadata['training_times'] = self.training_times
+        
+        if self.distillation_report:
+            training_metadata['distillation'] = self.distillation_report
+        
+        if self.quantization_report:
+            training_metadata['quantization'] = self.quantization_report
+        
+        if self.forest_report:
+            training_metadata['compiled_forest'] = self.forest_report
+        
+        if self.cascade_config:
+            training_metadata['cascade'] = self.cascade_config
+        
         with open(f'{output_dir}/training_metadata.json', 'w') as f:
             json.dump(training_metadata, f, indent=2)
         
         print("Models and results saved successfully!")
         print(f"Files saved:")
-        for model_name in self.models.keys():
+        for model_name in members:
             print(f"  - {output_dir}/{model_name.lower().replace(' ', '_')}_model.pkl")
         print(f"  - {output_dir}/scaler.pkl")
+        if self.student is not None:
+            print(f"  - {output_dir}/student_model.pkl")
+        if self.forest_report:
+            print(f"  - {output_dir}/random_forest_compiled/")
+        if self.cascade_config:
+            print(f"  - {output_dir}/{CASCADE_CONFIG_FILE}")
         print(f"  - {output_dir}/model_results.json")
         print(f"  - {output_dir}/training_metadata.json")
     
-    def run_full_training(self):
+    def run_full_training(self, search=False, n_jobs=-1, time_budget=None, distill=True,
+                          quantize='float32', compile_forest=True, cascade_target=0.99):
         """Run the complete training pipeline"""
         print("=" * 80)
         print("DISEASE PREDICTION MODEL TRAINING PIPELINE")
@@ -477,13 +802,36 @@ class DiseasePredictionTrainer:
         # Scale features
         self.scale_features()
         
-        # Train models
-        self.train_baseline_models()
-        self.train_neural_network()
+        # Optionally tune hyperparameters before the final fits
+        if search:
+            self.search_hyperparameters(n_jobs=n_jobs, time_budget=time_budget)
+        
+        # Train models (members are independent once features are scaled)
+        if n_jobs == 1:
+            self.train_baseline_models()
+            self.train_neural_network()
+        else:
+            self.train_models_parallel(n_jobs=n_jobs)
         self.create_ensemble_model()
         
         # Evaluate models
-        self.evaluate_all_models()
+        self.evaluate_all_models(n_jobs=n_jobs)
+        
+        # Distill the ensemble into a single serving model
+        if distill:
+            self.distill_student()
+        
+        # Export NumPy inference artifacts for the MLP and linear members
+        if quantize:
+            self.export_quantized_models(mode=quantize)
+        
+        # Flatten the Random Forest into memory-mappable node arrays
+        if compile_forest:
+            self.export_compiled_forest()
+        
+        # Calibrate the confidence-gated cascade against the full ensemble
+        if cascade_target:
+            self.calibrate_cascade(target_agreement=cascade_target)
         
         # Create comparison
         comparison_df = self.create_model_comparison()
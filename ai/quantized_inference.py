@@ -0,0 +1,204 @@
+import threading
+import numpy as np
+
+QUANTIZATION_MODES = ('float32', 'int8')
+
+
+def _relu(x):
+    np.maximum(x, 0, out=x)
+
+
+def _logistic(x):
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    np.reciprocal(x, out=x)
+
+
+def _softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {
+    'identity': lambda x: None,
+    'relu': _relu,
+    'logistic': _logistic,
+    'tanh': lambda x: np.tanh(x, out=x),
+    'softmax': _softmax
+}
+
+
+INT8_BLOCK_ROWS = 256
+
+
+def quantize_int8(weights):
+    """Symmetric per-output-channel int8 quantization: weights ~= q * scale[None, :]"""
+    scale = np.abs(weights).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    q = np.clip(np.round(weights / scale), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+class QuantizedDenseModel:
+    """Float32 forward pass over exported dense layers.
+
+    Exported from an ``MLPClassifier`` or ``LogisticRegression``. Each thread
+    reuses preallocated activation buffers, so a request does no intermediate
+    allocations. float32 exports do one GEMM per layer; int8 exports keep the
+    weights resident as int8 (a quarter of the float32 footprint) and widen
+    ``INT8_BLOCK_ROWS`` rows at a time into a per-thread scratch block, applying
+    the per-channel scales once to each layer's output.
+    """
+
+    def __init__(self, weights, biases, hidden_activation, output_activation, classes,
+                 mode='float32', scales=None):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"mode must be one of {QUANTIZATION_MODES}, got {mode!r}")
+        self.mode = mode
+        self.classes_ = np.asarray(classes)
+        self.hidden_activation = hidden_activation
+        self.output_activation = output_activation
+        if mode == 'int8':
+            self.weights = [np.ascontiguousarray(q, dtype=np.int8) for q in weights]
+            self.scales = [np.asarray(scale, dtype=np.float32) for scale in scales]
+        else:
+            self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+            self.scales = None
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self._local = threading.local()
+
+    @classmethod
+    def from_sklearn(cls, model, mode='float32'):
+        """Export a fitted MLPClassifier or LogisticRegression"""
+        if hasattr(model, 'coefs_'):
+            weights, biases = list(model.coefs_), list(model.intercepts_)
+            hidden_activation, output_activation = model.activation, model.out_activation_
+        elif hasattr(model, 'coef_'):
+            weights, biases = [model.coef_.T], [model.intercept_]
+            hidden_activation = 'identity'
+            output_activation = 'logistic' if model.coef_.shape[0] == 1 else 'softmax'
+        else:
+            raise TypeError(f"Cannot export {type(model).__name__}")
+
+        scales = None
+        if mode == 'int8':
+            quantized = [quantize_int8(np.asarray(w, dtype=np.float64)) for w in weights]
+            weights = [q for q, _ in quantized]
+            scales = [scale for _, scale in quantized]
+        return cls(weights, biases, hidden_activation, output_activation, model.classes_,
+                   mode=mode, scales=scales)
+
+    def _buffers(self, n_rows):
+        """Per-thread activation buffers with room for at least ``n_rows`` rows"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None or buffers[0].shape[0] < n_rows:
+            capacity = max(n_rows, 1)
+            buffers = [np.empty((capacity, w.shape[1]), dtype=np.float32) for w in self.weights]
+            self._local.buffers = buffers
+            if self.mode == 'int8':
+                self._local.products = [np.empty((capacity, w.shape[1]), dtype=np.float32) for w in self.weights]
+                self._local.blocks = [np.empty((min(INT8_BLOCK_ROWS, w.shape[0]), w.shape[1]), dtype=np.float32)
+                                      for w in self.weights]
+        return [buffer[:n_rows] for buffer in buffers]
+
+    def _int8_dot(self, layer, activations, out):
+        """``out = activations @ (q * scale)`` without widening the whole int8 matrix"""
+        q = self.weights[layer]
+        block = self._local.blocks[layer]
+        product = self._local.products[layer][:out.shape[0]]
+        out.fill(0)
+        for start in range(0, q.shape[0], block.shape[0]):
+            rows = q[start:start + block.shape[0]]
+            widened = block[:rows.shape[0]]
+            np.copyto(widened, rows, casting='unsafe')
+            np.dot(activations[:, start:start + rows.shape[0]], widened, out=product)
+            out += product
+        out *= self.scales[layer]
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        activations = X
+        buffers = self._buffers(X.shape[0])
+        last = len(self.weights) - 1
+        for i, (weights, bias, buffer) in enumerate(zip(self.weights, self.biases, buffers)):
+            if self.mode == 'int8':
+                self._int8_dot(i, activations, buffer)
+            else:
+                np.dot(activations, weights, out=buffer)
+            buffer += bias
+            ACTIVATIONS[self.output_activation if i == last else self.hidden_activation](buffer)
+            activations = buffer
+
+        if activations.shape[1] == 1:
+            # Binary logistic output: expand to two columns like sklearn
+            return np.hstack([1 - activations, activations]).astype(np.float64)
+        return activations.astype(np.float64)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the exported parameters (int8 weights plus their scales)"""
+        return (sum(w.nbytes for w in self.weights) + sum(b.nbytes for b in self.biases)
+                + sum(s.nbytes for s in self.scales or ()))
+
+    def save(self, path):
+        """Write the export to an ``.npz`` artifact"""
+        arrays = {
+            'mode': self.mode,
+            'classes': self.classes_,
+            'activations': np.array([self.hidden_activation, self.output_activation]),
+            'num_layers': len(self.weights)
+        }
+        for i, (weights, bias) in enumerate(zip(self.weights, self.biases)):
+            arrays[f'weights_{i}'] = weights
+            if self.mode == 'int8':
+                arrays[f'scale_{i}'] = self.scales[i]
+            arrays[f'bias_{i}'] = bias
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as artifact:
+            mode = str(artifact['mode'])
+            num_layers = int(artifact['num_layers'])
+            hidden_activation, output_activation = artifact['activations'].tolist()
+            return cls(
+                [artifact[f'weights_{i}'] for i in range(num_layers)],
+                [artifact[f'bias_{i}'] for i in range(num_layers)],
+                hidden_activation,
+                output_activation,
+                artifact['classes'],
+                mode=mode,
+                scales=[artifact[f'scale_{i}'] for i in range(num_layers)] if mode == 'int8' else None
+            )
+
+
+def drift_report(reference, exported, X, y=None, top_k=(3, 5)):
+    """Compare an exported model against its float64 sklearn reference"""
+    reference_proba = reference.predict_proba(X)
+    exported_proba = exported.predict_proba(X)
+    reference_top = np.argmax(reference_proba, axis=1)
+    exported_ranked = np.argsort(-exported_proba, axis=1)
+
+    report = {
+        'mode': exported.mode,
+        'max_abs_proba_diff': float(np.abs(reference_proba - exported_proba).max()),
+        'top1_agreement': float(np.mean(exported_ranked[:, 0] == reference_top)),
+        'reference_param_bytes': int(sum(
+            a.nbytes for a in getattr(reference, 'coefs_', [getattr(reference, 'coef_', np.empty(0))])
+        ) + sum(
+            a.nbytes for a in getattr(reference, 'intercepts_', [getattr(reference, 'intercept_', np.empty(0))])
+        )),
+        'exported_param_bytes': int(exported.nbytes)
+    }
+    for k in top_k:
+        report[f'top{k}_agreement'] = float(np.mean((exported_ranked[:, :k] == reference_top[:, None]).any(axis=1)))
+    if y is not None:
+        classes = exported.classes_
+        report['reference_accuracy'] = float(np.mean(classes[reference_top] == y))
+        report['exported_accuracy'] = float(np.mean(classes[exported_ranked[:, 0]] == y))
+    return report
@@ -0,0 +1,66 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import make_response, request
+
+
+class ResponseCache:
+    """In-process memo of JSON responses with versioned ETags.
+
+    A cached view's body is computed once per (path, content version) and
+    replayed byte-for-byte afterwards, so embedded timestamps stay stable and
+    the ETag only changes when the underlying content does. Conditional
+    requests with a matching ``If-None-Match`` get a 304.
+    """
+
+    def __init__(self, max_age=300, maxsize=1024):
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, version):
+        """Decorator memoizing successful responses of a GET view
+
+        Args:
+            version: Callable returning the content version the view depends on
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                content_version = version()
+                key = (request.path, content_version)
+                with self.lock:
+                    entry = self.entries.get(key)
+                    if entry is not None:
+                        self.entries.move_to_end(key)
+                        self.hits += 1
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    body = response.get_data()
+                    etag = f'{content_version}-{hashlib.sha1(body).hexdigest()[:12]}'
+                    entry = (body, response.mimetype, etag)
+                    with self.lock:
+                        self.misses += 1
+                        self.entries[key] = entry
+                        while len(self.entries) > self.maxsize:
+                            self.entries.popitem(last=False)
+
+                body, mimetype, etag = entry
+                response = make_response(body)
+                response.mimetype = mimetype
+                response.set_etag(etag, weak=True)
+                response.headers['Cache-Control'] = f'public, max-age={self.max_age}'
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,200 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+import atexit
+from datetime import datetime
+from serialization import dumps
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Bounded queue drained by one daemon thread in batches.
+
+    ``submit`` never blocks: when the queue is full the record is dropped and
+    counted. The writer thread collects up to ``batch_size`` records, or
+    whatever arrived within ``flush_interval`` seconds, and hands them to
+    ``write`` in one call. Subclasses open their resources in ``open``, which
+    runs on the writer thread (SQLite connections are thread-bound).
+    """
+
+    def __init__(self, max_queue=10000, batch_size=256, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record):
+        """Queue a record; returns False if it had to be dropped"""
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+
+    def open(self):
+        pass
+
+    def write(self, records):
+        raise NotImplementedError
+
+    def close_resources(self):
+        pass
+
+    def _run(self):
+        self.open()
+        stopping = False
+        while not stopping:
+            record = self.queue.get()
+            if record is _STOP:
+                break
+            batch = [record]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    record = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+            try:
+                self.write(batch)
+                with self.lock:
+                    self.written += len(batch)
+            except Exception as e:
+                with self.lock:
+                    self.failed += len(batch)
+                print(f"{type(self).__name__}: failed to write {len(batch)} records: {e}")
+        self.close_resources()
+
+    def close(self, timeout=5.0):
+        """Flush queued records and stop the writer thread"""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'sink': type(self).__name__,
+                'queued': self.queue.qsize(),
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed
+            }
+
+
+class NullSink:
+    """Disabled sink: accepts and discards records"""
+
+    def submit(self, record):
+        return True
+
+    def close(self, timeout=5.0):
+        pass
+
+    def stats(self):
+        return {'sink': 'NullSink'}
+
+
+class JSONLSink(BackgroundWriter):
+    """Append records as JSON lines to size-rotated files in ``directory``"""
+
+    def __init__(self, directory='analysis_results', prefix='results', max_bytes=50 * 1024 * 1024, **kwargs):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.file = None
+        super().__init__(**kwargs)
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        # One file per process, so concurrent workers never share a file
+        self.file = open(os.path.join(self.directory, f'{self.prefix}-{stamp}-{os.getpid()}.jsonl'), 'ab')
+
+    def write(self, records):
+        if self.file is None or self.file.tell() >= self.max_bytes:
+            self._rotate()
+        self.file.write(b''.join(dumps(record) + b'\n' for record in records))
+        self.file.flush()
+
+    def close_resources(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class SQLiteSink(BackgroundWriter):
+    """Insert records as JSON rows into one SQLite table, one transaction per batch"""
+
+    def __init__(self, path='analysis_results.db', table='analysis_results', **kwargs):
+        self.path = path
+        self.table = table
+        self.connection = None
+        super().__init__(**kwargs)
+
+    def open(self):
+        self.connection = sqlite3.connect(self.path)
+        # WAL lets readers run alongside the writer; NORMAL skips the per-commit fsync
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.execute(
+            f'CREATE TABLE IF NOT EXISTS {self.table} ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, created_at TEXT NOT NULL, payload TEXT NOT NULL)'
+        )
+        self.connection.commit()
+
+    def write(self, records):
+        created_at = datetime.now().isoformat()
+        with self.connection:
+            self.connection.executemany(
+                f'INSERT INTO {self.table} (created_at, payload) VALUES (?, ?)',
+                [(created_at, dumps(record).decode('utf-8')) for record in records]
+            )
+
+    def close_resources(self):
+        if self.connection is not None:
+            self.connection.close()
+
+
+RESULT_SINKS = ('jsonl', 'sqlite', 'none')
+
+
+def sink_from_env(prefix='RESULT_SINK', default='jsonl', path=None):
+    """Build a sink from ``{prefix}`` ('jsonl', 'sqlite' or 'none') and related env vars
+
+    ``{prefix}_PATH`` is the JSONL directory or SQLite file,
+    ``{prefix}_QUEUE`` the queue bound and ``{prefix}_MAX_BYTES`` the JSONL
+    rotation size.
+    """
+    kind = os.environ.get(prefix, default).lower()
+    if kind not in RESULT_SINKS:
+        raise ValueError(f"{prefix} must be one of {RESULT_SINKS}, got {kind!r}")
+    if kind == 'none':
+        return NullSink()
+    options = {'max_queue': int(os.environ.get(f'{prefix}_QUEUE', 10000))}
+    path = os.environ.get(f'{prefix}_PATH', path)
+    if kind == 'sqlite':
+        return SQLiteSink(path=path or 'analysis_results.db', **options)
+    return JSONLSink(
+        directory=path or 'analysis_results',
+        max_bytes=int(os.environ.get(f'{prefix}_MAX_BYTES', 50 * 1024 * 1024)),
+        **options
+    )
@@ -0,0 +1,127 @@
+import gzip
+import json
+import numpy as np
+from flask import request
+from flask.json.provider import JSONProvider
+
+# orjson and brotli are optional; without them responses use the stdlib json
+# encoder and only gzip is offered
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _default(obj):
+    """Encode NumPy values the base encoders don't handle"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def negotiate_encoding(accept_encoding):
+    """Pick 'br', 'gzip' or None from an Accept-Encoding header"""
+    accepted = set()
+    for item in (accept_encoding or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted or '*' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def encode_response(payload, accept_encoding=None, min_size=MIN_COMPRESS_BYTES):
+    """Serialize and, when worthwhile, compress a payload
+
+    Returns the body bytes and the headers to send with it.
+    """
+    body = dumps(payload)
+    headers = {'Content-Type': 'application/json', 'Vary': 'Accept-Encoding'}
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= min_size else None
+    if encoding:
+        body = compress(body, encoding)
+        headers['Content-Encoding'] = encoding
+    return body, headers
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by ``dumps``/``loads`` above
+
+    Output is always compact, also under ``debug=True``.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def install(app, min_size=MIN_COMPRESS_BYTES):
+    """Serve every ``jsonify`` response through the fast encoder with compression"""
+    app.json = FastJSONProvider(app)
+
+    @app.after_request
+    def compress_response(response):
+        if (response.mimetype != 'application/json' or response.direct_passthrough
+                or 'Content-Encoding' in response.headers or response.status_code < 200
+                or response.status_code in (204, 304)):
+            return response
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+        if encoding and len(body) >= min_size:
+            response.set_data(compress(body, encoding))
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
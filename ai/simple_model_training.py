@@ -14,6 +14,7 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.neural_network import MLPClassifier
 from datetime import datetime
+from feature_store import FeatureStore
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -28,9 +29,13 @@ class SimpleDiseaseTrainer:
         """Load preprocessed features and labels"""
         print("Loading preprocessed data...")
         
-        # Load features and labels
-        self.X = pd.read_csv(f'{self.data_path}/features.csv')
-        self.y = pd.read_csv(f'{self.data_path}/labels.csv').values.ravel()
+        # Load features and labels, preferring the binary feature store
+        store = FeatureStore(f'{self.data_path}/feature_store')
+        if store.exists():
+            self.X, self.y = store.load_frame()
+        else:
+            self.X = pd.read_csv(f'{self.data_path}/features.csv')
+            self.y = pd.read_csv(f'{self.data_path}/labels.csv').values.ravel()
         
         # Load metadata
         with open(f'{self.data_path}/metadata.json', 'r') as f:
@@ -0,0 +1,55 @@
+import hmac
+import json
+import time
+import base64
+import hashlib
+
+
+def _b64decode(segment):
+    return base64.urlsafe_b64decode(segment + '=' * (-len(segment) % 4))
+
+
+def verify_supabase_token(token, secret, audience='authenticated', leeway=30):
+    """Claims of a Supabase access token signed with the project's JWT secret
+
+    Only HS256 tokens are accepted; the signature, expiry and audience are
+    checked. Raises ValueError when the token is not valid.
+    """
+    try:
+        header_segment, payload_segment, signature_segment = token.split('.')
+        header = json.loads(_b64decode(header_segment))
+        claims = json.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except (ValueError, TypeError, AttributeError):
+        raise ValueError("Malformed token")
+
+    if header.get('alg') != 'HS256':
+        raise ValueError(f"Unsupported token algorithm {header.get('alg')!r}")
+    expected = hmac.new(
+        secret.encode('utf-8'), f'{header_segment}.{payload_segment}'.encode('ascii'), hashlib.sha256
+    ).digest()
+    if not hmac.compare_digest(signature, expected):
+        raise ValueError("Invalid token signature")
+
+    if not isinstance(claims, dict) or not claims.get('sub'):
+        raise ValueError("Token has no subject")
+    if 'exp' not in claims or time.time() > float(claims['exp']) + leeway:
+        raise ValueError("Token has expired")
+    token_audience = claims.get('aud')
+    audiences = token_audience if isinstance(token_audience, list) else [token_audience]
+    if audience is not None and audience not in audiences:
+        raise ValueError("Token audience mismatch")
+    return claims
+
+
+def authenticated_user_id(authorization, secret):
+    """User id (``sub``) of a ``Bearer`` Authorization header, or None if it does not verify"""
+    if not secret or not authorization:
+        return None
+    scheme, _, token = authorization.partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        return None
+    try:
+        return verify_supabase_token(token.strip(), secret)['sub']
+    except ValueError:
+        return None
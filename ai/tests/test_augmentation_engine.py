@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from augmentation_engine import AugmentationEngine
+from data_augmentation import NOISE_PATTERNS
+
+SYMPTOM_LISTS = [
+    ['fever', 'cough', 'fatigue', 'headache', 'chest pain'],
+    ['nausea', 'vomiting', 'abdominal pain'],
+    ['rash', 'itching', 'fever', 'joint pain', 'fatigue', 'swelling'],
+    ['headache', 'dizziness'],
+]
+VARIATIONS = {
+    'fever': ['high fever', 'low-grade fever'],
+    'cough': ['dry cough', 'productive cough'],
+    'headache': ['severe headache'],
+}
+BODY_SYSTEMS = {
+    'respiratory': ['cough', 'shortness of breath', 'wheezing', 'chest pain'],
+    'gastrointestinal': ['nausea', 'vomiting', 'diarrhea', 'abdominal pain'],
+    'neurological': ['headache', 'dizziness', 'confusion'],
+}
+DISEASES = ['Flu', 'Gastritis', 'Lupus', 'Migraine']
+
+
+def engine():
+    return AugmentationEngine(SYMPTOM_LISTS, VARIATIONS, BODY_SYSTEMS)
+
+
+def augment(seed):
+    """Every strategy drawn from one generator, as a DiseaseSymptomAugmenter run does"""
+    rng = np.random.default_rng(seed)
+    augmenter = engine()
+    partial, factors = augmenter.partial_symptom_sets([0.6, 0.8], rng)
+    return {
+        'variation': augmenter.to_frame(augmenter.symptom_variations(5, rng), DISEASES),
+        'partial': augmenter.to_frame(partial, DISEASES, partial_factor=factors),
+        'noisy': augmenter.to_frame(augmenter.noisy_symptoms(NOISE_PATTERNS, 0.5, rng), DISEASES),
+    }
+
+
+def test_same_seed_gives_identical_output():
+    first, second = augment(7), augment(7)
+
+    for kind in first:
+        assert first[kind].equals(second[kind]), kind
+
+
+def test_different_seeds_differ():
+    assert not augment(7)['variation'].equals(augment(8)['variation'])
+
+
+def test_base_round_trips_through_the_vocabulary():
+    augmenter = engine()
+    columns = augmenter.to_columns(augmenter.base, DISEASES)
+
+    assert columns['symptoms_list'] == [str(symptoms) for symptoms in SYMPTOM_LISTS]
+    assert list(columns['symptom_count']) == [len(symptoms) for symptoms in SYMPTOM_LISTS]
+    assert list(columns['Disease']) == DISEASES
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_operator_invariants(seed):
+    augmenter = engine()
+    rng = np.random.default_rng(seed)
+    batch = augmenter.base.take(np.repeat(np.arange(len(SYMPTOM_LISTS)), 20))
+
+    added = augmenter.add_related_symptoms(batch, 1.0, rng)
+    for row in range(len(added)):
+        symptoms = added.ids[added.offsets[row]:added.offsets[row + 1]]
+        assert len(set(symptoms.tolist())) == len(symptoms)
+        assert len(symptoms) - batch.lengths[row] in (0, 1)
+
+    dropped = augmenter.drop_symptom(batch, 1.0, rng)
+    expected = np.where(batch.lengths >= 4, batch.lengths - 1, batch.lengths)
+    assert np.array_equal(dropped.lengths, expected)
+
+    subset = augmenter.sample_subset(batch, 0.6, rng)
+    expected = np.minimum(batch.lengths, np.maximum(2, (batch.lengths * 0.6).astype(np.int64)))
+    assert np.array_equal(subset.lengths, expected)
+    for row in range(len(subset)):
+        original = set(batch.ids[batch.offsets[row]:batch.offsets[row + 1]].tolist())
+        assert set(subset.ids[subset.offsets[row]:subset.offsets[row + 1]].tolist()) <= original
+
+    shuffled = augmenter.shuffle_symptoms(batch, 1.0, rng)
+    assert np.array_equal(shuffled.offsets, batch.offsets)
+    for row in range(len(shuffled)):
+        assert sorted(shuffled.ids[shuffled.offsets[row]:shuffled.offsets[row + 1]]) == \
+            sorted(batch.ids[batch.offsets[row]:batch.offsets[row + 1]])
@@ -0,0 +1,51 @@
+import numpy as np
+
+from cascade import calibrate_cascade, majority_vote, passes_gate
+
+
+def test_majority_vote_ties_go_to_the_lowest_class():
+    votes = np.array([[2, 2, 1], [0, 1, 2], [1, 2, 2], [3, 3, 3]])
+
+    assert majority_vote(votes, 4).tolist() == [2, 0, 2, 3]
+
+
+def make_members(n_rows=400, n_classes=5, seed=0):
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(0, n_classes, n_rows)
+    probas, votes = {}, {}
+    for name, sharpness in [('cheap', 2.0), ('middle', 4.0), ('slow', 8.0)]:
+        logits = rng.normal(size=(n_rows, n_classes))
+        logits[np.arange(n_rows), truth] += sharpness * rng.random(n_rows)
+        proba = np.exp(logits)
+        probas[name] = proba / proba.sum(axis=1, keepdims=True)
+        votes[name] = np.argmax(probas[name], axis=1)
+    return probas, votes
+
+
+def test_stopped_rows_agree_with_the_served_vote():
+    probas, votes = make_members()
+    costs = {'slow': 10.0, 'cheap': 1.0, 'middle': 3.0}
+    config = calibrate_cascade(probas, costs, top_k=3, target_agreement=0.95, member_votes=votes)
+
+    assert config['order'] == ['cheap', 'middle', 'slow']
+    assert len(config['gates']) == 2
+    assert config['val_top3_agreement'] >= 0.95
+    assert config['expected_ms'] <= config['full_ms'] == 14.0
+
+    # Replay the first gate: the rows it stops must meet the target against the vote
+    reference = majority_vote(np.column_stack([votes[name] for name in config['order']]), 5)
+    gate = config['gates'][0]
+    if gate is not None:
+        stopped = passes_gate(probas['cheap'], gate)
+        top3 = np.argsort(-probas['cheap'], axis=1)[:, :3]
+        assert (top3[stopped] == reference[stopped, None]).any(axis=1).mean() >= 0.95
+
+
+def test_unreachable_target_sends_every_row_to_full_depth():
+    probas, votes = make_members(seed=1)
+    config = calibrate_cascade(probas, {'cheap': 1.0, 'middle': 2.0, 'slow': 3.0},
+                               top_k=1, target_agreement=1.01, member_votes=votes)
+
+    assert config['gates'] == [None, None]
+    assert config['val_depth_counts'] == {3: 400}
+    assert config['val_top1_agreement'] == 1.0
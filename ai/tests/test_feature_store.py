@@ -0,0 +1,93 @@
+import json
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from feature_store import FeatureStore, sparse_frame
+
+TFIDF_NAMES = ['tfidf_cough', 'tfidf_fever', 'tfidf_headache', 'tfidf_rash']
+ENGINEERED_COLUMNS = ['symptom_count', 'symptom_diversity']
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    tfidf = sparse.random(20, len(TFIDF_NAMES), density=0.3, format='csr', random_state=0)
+    engineered = rng.integers(0, 5, size=(20, len(ENGINEERED_COLUMNS))).astype(np.float64)
+    labels = rng.integers(0, 3, size=20)
+    return tfidf, engineered, labels
+
+
+def test_round_trip(tmp_path, features):
+    tfidf, engineered, labels = features
+    store = FeatureStore(str(tmp_path / 'store'))
+    row_keys = np.array([bytes([i]) * 16 for i in range(20)], dtype='S16')
+    store.write(tfidf, engineered, labels, TFIDF_NAMES, ENGINEERED_COLUMNS,
+                row_keys=row_keys, extra={'vectorizer_version': 'abc'})
+
+    loaded_tfidf, loaded_engineered, loaded_labels, manifest = store.load()
+
+    assert isinstance(loaded_engineered, np.memmap)
+    assert (loaded_tfidf != tfidf).nnz == 0
+    assert np.array_equal(loaded_engineered, engineered)
+    assert np.array_equal(loaded_labels, labels)
+    assert np.array_equal(store.load_row_keys(), row_keys)
+    assert manifest['num_rows'] == 20
+    assert manifest['tfidf']['nnz'] == tfidf.nnz
+    assert manifest['vectorizer_version'] == 'abc'
+
+    X, y = store.load_frame()
+    assert list(X.columns) == TFIDF_NAMES + ENGINEERED_COLUMNS
+    assert np.array_equal(X.values, np.hstack([tfidf.toarray(), engineered]))
+    assert np.array_equal(y, labels)
+
+
+def test_incomplete_or_foreign_store_is_rejected(tmp_path, features):
+    store = FeatureStore(str(tmp_path / 'store'))
+    assert not store.exists()
+
+    store.write(*features, TFIDF_NAMES, ENGINEERED_COLUMNS)
+    assert store.load_row_keys() is None
+    manifest_path = tmp_path / 'store' / FeatureStore.MANIFEST
+    manifest = json.loads(manifest_path.read_text())
+    manifest['schema_version'] = FeatureStore.SCHEMA_VERSION + 1
+    manifest_path.write_text(json.dumps(manifest))
+
+    with pytest.raises(ValueError, match='Unsupported feature store schema'):
+        store.load()
+
+
+def test_sparse_frame_fills_with_zero(features):
+    tfidf, _, _ = features
+    frame = sparse_frame(tfidf, TFIDF_NAMES)
+
+    assert not frame.isna().any().any()
+    assert np.array_equal(frame.sparse.to_dense().values, tfidf.toarray())
+
+
+def test_chunked_writer_matches_single_write(tmp_path, features):
+    tfidf, engineered, labels = features
+    FeatureStore(str(tmp_path / 'whole')).write(tfidf, engineered, labels, TFIDF_NAMES, ENGINEERED_COLUMNS)
+    chunked = FeatureStore(str(tmp_path / 'chunked'))
+    writer = chunked.writer()
+    for start in range(0, 20, 7):
+        writer.append(tfidf[start:start + 7], engineered[start:start + 7], labels[start:start + 7])
+    writer.close(TFIDF_NAMES, ENGINEERED_COLUMNS)
+
+    expected = FeatureStore(str(tmp_path / 'whole')).load(mmap=False)
+    actual = chunked.load(mmap=False)
+    assert (actual[0] != expected[0]).nnz == 0
+    assert np.array_equal(actual[0].indptr, expected[0].indptr)
+    assert np.array_equal(actual[1], expected[1])
+    assert np.array_equal(actual[2], expected[2])
+    assert not (tmp_path / 'chunked' / '_parts').exists()
+
+
+def test_writer_rejects_mismatched_chunks(tmp_path, features):
+    tfidf, engineered, labels = features
+    writer = FeatureStore(str(tmp_path / 'store')).writer()
+    writer.append(tfidf[:5], engineered[:5], labels[:5])
+
+    with pytest.raises(ValueError, match='TF-IDF features'):
+        writer.append(sparse.csr_matrix((5, 2)), engineered[:5], labels[:5])
@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from forest_compiler import CompiledForest
+
+
+@pytest.fixture(scope='module')
+def data():
+    X, y = make_classification(n_samples=300, n_features=20, n_informative=8, n_classes=4, random_state=0)
+    labels = np.array(['Asthma', 'Flu', 'Migraine', 'Typhoid'])[y]
+    return X, labels
+
+
+@pytest.fixture(scope='module')
+def forest(data):
+    X, y = data
+    return RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+
+
+def test_matches_sklearn(forest, data):
+    X, _ = data
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X))
+    assert np.array_equal(compiled.predict(X), forest.predict(X))
+    assert np.array_equal(compiled.predict(X[:1]), forest.predict(X[:1]))
+
+
+def test_unbounded_depth_matches_sklearn(data):
+    X, y = data
+    forest = RandomForestClassifier(n_estimators=10, random_state=1).fit(X, y)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    assert np.allclose(compiled.predict_proba(X), forest.predict_proba(X))
+
+
+def test_loaded_forest_indexes_the_memory_map(tmp_path, forest, data):
+    X, _ = data
+    CompiledForest.from_sklearn(forest).save(str(tmp_path / 'forest'))
+    loaded = CompiledForest.load(str(tmp_path / 'forest'))
+
+    for name in CompiledForest.ARRAYS:
+        assert isinstance(getattr(loaded, name), np.memmap), name
+    assert np.allclose(loaded.predict_proba(X), forest.predict_proba(X))
+    assert list(loaded.classes_) == list(forest.classes_)
+
+
+def test_older_layout_is_rejected(tmp_path, forest):
+    path = tmp_path / 'forest'
+    CompiledForest.from_sklearn(forest).save(str(path))
+    meta = json.loads((path / CompiledForest.META).read_text())
+    del meta['format']
+    (path / CompiledForest.META).write_text(json.dumps(meta))
+
+    with pytest.raises(ValueError, match='older layout'):
+        CompiledForest.load(str(path))
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from history_store import NullHistoryStore, SQLiteHistoryStore, history_row, history_store_from_env
+
+
+def prediction(disease, confidence=0.5):
+    return {
+        'input_symptoms': ['fever', 'cough'],
+        'predicted_disease': disease,
+        'confidence': confidence,
+        'top_k_predictions': [{'rank': 1, 'disease': disease, 'confidence': confidence, 'extra': 'dropped'}]
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteHistoryStore(path=str(tmp_path / 'history.db'), flush_interval=0.01)
+    yield store
+    store.close()
+
+
+def fill(store, rows):
+    for row in rows:
+        assert store.submit(row)
+    # Closing drains the queue, after which every row is committed
+    store.close()
+
+
+def test_cursor_pages_walk_newest_first_without_gaps(store):
+    rows = []
+    for i in range(7):
+        row = history_row('alice', prediction(f'Disease {i}'), latency_ms=float(i))
+        # Pairs of rows share a timestamp, so paging must break ties on id
+        row['analysis_timestamp'] = f'2026-01-01T00:00:0{i // 2}+00:00'
+        rows.append(row)
+    rows.append(history_row('bob', prediction('Flu')))
+    fill(store, rows)
+
+    seen, cursor = [], None
+    while True:
+        page = store.history('alice', limit=3, cursor=cursor)
+        assert len(page['items']) <= 3
+        seen += page['items']
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    expected = sorted(rows[:7], key=lambda row: (row['analysis_timestamp'], row['id']), reverse=True)
+    assert [item['id'] for item in seen] == [row['id'] for row in expected]
+    assert len(seen) == 7
+
+
+def test_rows_round_trip(store):
+    row = history_row('alice', prediction('Flu', confidence=0.8765), latency_ms=12.5)
+    fill(store, [row])
+
+    item, = store.history('alice')['items']
+    assert item['symptoms'] == ['fever', 'cough']
+    assert item['confidence_score'] == 87.65
+    assert item['top_predictions'] == [{'rank': 1, 'disease': 'Flu', 'confidence': 0.8765}]
+    assert item['follow_up_required'] is False
+    assert item['latency_ms'] == 12.5
+    assert store.history('bob') == {'items': [], 'next_cursor': None}
+
+
+def test_history_is_off_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('HISTORY_STORE', raising=False)
+
+    assert isinstance(history_store_from_env(), NullHistoryStore)
+    assert os.listdir(tmp_path) == []
+
+    monkeypatch.setenv('HISTORY_STORE', 'postgres')
+    with pytest.raises(ValueError):
+        history_store_from_env()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.naive_bayes import MultinomialNB
+
+from hyperparameter_search import HyperparameterSearch, expand_grid
+
+ALPHAS = [0.001, 0.01, 0.1, 1.0, 2.0, 5.0, 10.0, 50.0, 100.0]
+
+
+@pytest.fixture
+def search():
+    X, y = make_classification(n_samples=180, n_features=12, n_informative=6, n_classes=3, random_state=0)
+    spaces = {
+        'Naive_Bayes': {
+            'estimator': MultinomialNB(),
+            'scaled': False,
+            'param_grid': {'alpha': ALPHAS}
+        }
+    }
+    return HyperparameterSearch(np.abs(X), y, n_splits=3, n_jobs=1, eta=3, search_spaces=spaces)
+
+
+def test_expand_grid_is_the_cartesian_product():
+    candidates = expand_grid({'a': [1, 2], 'b': ['x', 'y', 'z']})
+
+    assert len(candidates) == 6
+    assert {'a': 2, 'b': 'z'} in candidates
+    assert expand_grid({}) == [{}]
+
+
+def test_rungs_halve_candidates_and_add_folds(search, capsys):
+    best = search.run()
+    output = capsys.readouterr().out
+
+    # 9 candidates on 1 fold, then the best 3 on the 2 folds they have not seen
+    assert '  Rung 0: 9 fits on 1 fold(s)' in output
+    assert '  Rung 1: 6 fits on 3 fold(s)' in output
+    fold_counts = sorted(len(scores) for scores in search._scores.values())
+    assert fold_counts == [1] * 6 + [3] * 3
+
+    result = search.results['Naive_Bayes']
+    assert result['rungs'] == 2
+    assert result['candidates_evaluated'] == len(ALPHAS)
+    assert best['Naive_Bayes'] in expand_grid({'alpha': ALPHAS})
+    best_index = ALPHAS.index(best['Naive_Bayes']['alpha'])
+    assert result['best_score'] == pytest.approx(np.mean(list(search._scores[('Naive_Bayes', best_index)].values())))
+    assert result['best_score'] == max(
+        np.mean(list(scores.values())) for scores in search._scores.values() if len(scores) == 3
+    )
+
+
+def test_time_budget_stops_after_the_first_rung(search, capsys):
+    search.time_budget = 0
+    search.run()
+
+    assert 'Time budget of 0s reached' in capsys.readouterr().out
+    assert search.results['Naive_Bayes']['rungs'] == 1
+    assert all(len(scores) == 1 for scores in search._scores.values())
@@ -0,0 +1,81 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+
+from create_augmented_features import create_features_for_augmented_data
+from feature_store import FeatureStore
+from hashing_features import save_vectorizer
+
+ROWS = [
+    ('Flu', 'high fever, cough, muscle aches'),
+    ('Flu', 'cough, sore throat, fatigue'),
+    ('Migraine', 'severe headache, nausea, dizziness'),
+    ('Migraine', 'headache, sensitivity to light'),
+    ('Eczema', 'itching, skin rash, chronic dryness'),
+    ('Eczema', 'mild rash, swelling'),
+]
+
+
+@pytest.fixture
+def feature_dir(tmp_path, monkeypatch):
+    """A small augmented dataset and its preprocessors laid out like the ai/ tree"""
+    os.makedirs(tmp_path / 'processed_data')
+    os.makedirs(tmp_path / 'augmented_data')
+    texts = [text for _, text in ROWS]
+    save_vectorizer(TfidfVectorizer().fit(texts), str(tmp_path / 'processed_data'))
+    with open(tmp_path / 'processed_data' / 'label_encoder.pkl', 'wb') as f:
+        pickle.dump(LabelEncoder().fit([disease for disease, _ in ROWS]), f)
+    write_dataset(tmp_path, ROWS)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_dataset(root, rows):
+    pd.DataFrame({
+        'Disease': [disease for disease, _ in rows],
+        'symptoms_text': [text for _, text in rows],
+        'symptom_count': [len(text.split(',')) for _, text in rows],
+        'augmentation_type': ['original'] * len(rows)
+    }).to_csv(root / 'augmented_data' / 'augmented_dataset.csv', index=False)
+
+
+def stored_features():
+    tfidf_matrix, engineered, labels, _ = FeatureStore('augmented_data/feature_store').load(mmap=False)
+    return tfidf_matrix.tocsr(), np.asarray(engineered), np.asarray(labels)
+
+
+def assert_same_features(left, right):
+    assert left[0].shape == right[0].shape
+    assert (left[0] != right[0]).nnz == 0
+    assert np.array_equal(left[1], right[1])
+    assert np.array_equal(left[2], right[2])
+
+
+def test_cached_rebuild_matches_full_rebuild(feature_dir):
+    create_features_for_augmented_data(incremental=True)
+    create_features_for_augmented_data(incremental=True)
+    incremental = stored_features()
+    create_features_for_augmented_data(incremental=False)
+
+    assert_same_features(incremental, stored_features())
+
+
+def test_changed_rows_are_refeaturized(feature_dir, capsys):
+    create_features_for_augmented_data(incremental=True)
+    changed = list(ROWS)
+    changed[2] = ('Migraine', 'intense headache, vomiting')
+    changed.append(('Flu', 'fever, chest congestion'))
+    write_dataset(feature_dir, changed)
+    capsys.readouterr()
+
+    create_features_for_augmented_data(incremental=True)
+    assert f'Reusing {len(ROWS) - 1} cached rows, featurizing 2 new or changed rows' in capsys.readouterr().out
+    incremental = stored_features()
+    create_features_for_augmented_data(incremental=False)
+
+    assert_same_features(incremental, stored_features())
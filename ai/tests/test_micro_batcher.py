@@ -0,0 +1,87 @@
+import threading
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+class RecordingPredictor:
+    """Predictor double whose first call blocks, so later requests queue into one batch"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+    def predict_batch(self, texts, top_k=5):
+        self.calls.append((list(texts), top_k))
+        if len(self.calls) == 1:
+            self.started.set()
+            self.release.wait(5)
+        if 'bad input' in texts:
+            raise ValueError('cannot featurize bad input')
+        return [
+            {
+                'predicted_disease': text.upper(),
+                'top_k_predictions': [{'rank': rank + 1, 'disease': f'{text}-{rank}'} for rank in range(top_k)]
+            }
+            for text in texts
+        ]
+
+
+@pytest.fixture
+def predictor():
+    return RecordingPredictor()
+
+
+@pytest.fixture
+def batcher(predictor):
+    batcher = MicroBatcher(predictor, max_batch_size=8, max_wait_ms=1)
+    yield batcher
+    predictor.release.set()
+    batcher.close()
+
+
+def hold_worker(batcher, predictor):
+    """Occupy the worker with one request so the next submissions wait together"""
+    blocker = batcher.submit('blocker')
+    assert predictor.started.wait(5)
+    return blocker
+
+
+def test_queued_requests_fan_out_from_one_batch(batcher, predictor):
+    blocker = hold_worker(batcher, predictor)
+    futures = {text: batcher.submit(text, top_k=k) for text, k in [('fever', 5), ('cough', 2), ('rash', 3)]}
+    predictor.release.set()
+
+    assert blocker.result(5)['predicted_disease'] == 'BLOCKER'
+    assert predictor.calls[1] == (['fever', 'cough', 'rash'], 5)
+    for text, k in [('fever', 5), ('cough', 2), ('rash', 3)]:
+        result = futures[text].result(5)
+        assert result['predicted_disease'] == text.upper()
+        assert [pred['disease'] for pred in result['top_k_predictions']] == [f'{text}-{rank}' for rank in range(k)]
+    assert batcher.stats()['batch_size_histogram'] == {'1': 1, '3': 1}
+
+
+def test_a_failing_input_only_fails_its_own_request(batcher, predictor):
+    hold_worker(batcher, predictor)
+    good = batcher.submit('fever')
+    bad = batcher.submit('bad input')
+    other = batcher.submit('cough')
+    predictor.release.set()
+
+    assert good.result(5)['predicted_disease'] == 'FEVER'
+    assert other.result(5)['predicted_disease'] == 'COUGH'
+    with pytest.raises(ValueError, match='bad input'):
+        bad.result(5)
+    # The failed batch was retried one request at a time
+    assert [texts for texts, _ in predictor.calls[2:]] == [['fever'], ['bad input'], ['cough']]
+
+
+def test_closed_batcher_rejects_new_requests(batcher, predictor):
+    predictor.release.set()
+    assert batcher.predict('fever')['predicted_disease'] == 'FEVER'
+    batcher.close()
+
+    with pytest.raises(RuntimeError, match='closed'):
+        batcher.submit('cough').result(1)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.svm import SVC
+
+from model_evaluation import CrossValidationEngine, served_vote
+
+
+def test_served_vote_breaks_ties_towards_the_lowest_class():
+    classes = np.array(['Asthma', 'Flu', 'Migraine'])
+    members = [
+        np.array(['Flu', 'Migraine', 'Asthma']),
+        np.array(['Flu', 'Asthma', 'Migraine']),
+        np.array(['Asthma', 'Flu', 'Flu']),
+    ]
+
+    assert served_vote(members, classes).tolist() == ['Flu', 'Asthma', 'Asthma']
+
+
+@pytest.fixture(scope='module')
+def cv_results():
+    X, y = make_classification(n_samples=240, n_features=10, n_informative=5, n_classes=3,
+                               flip_y=0.1, random_state=0)
+    models = {
+        'Naive_Bayes': MultinomialNB(),
+        'SVM': SVC(kernel='linear', probability=True, random_state=0),
+        'Logistic_Regression': LogisticRegression(max_iter=1000),
+    }
+    engine = CrossValidationEngine(np.abs(X), y, n_splits=3, n_jobs=1)
+    return engine, models, engine.run(models, scaled_models={'SVM', 'Logistic_Regression'})
+
+
+def test_svm_is_scored_with_its_decision_function(cv_results):
+    engine, models, results = cv_results
+    expected = np.empty(len(engine.fold_cache.y), dtype=engine.classes.dtype)
+    for fold_index, fold in enumerate(engine.fold_cache.folds):
+        X_train, y_train, X_val, _ = engine.fold_cache.get_fold(fold_index, scaled=True)
+        expected[fold['val_idx']] = clone(models['SVM']).fit(X_train, y_train).predict(X_val)
+
+    assert np.array_equal(results['SVM']['oof_pred'], expected)
+    accuracy = np.mean(expected == engine.fold_cache.y)
+    assert results['SVM']['cv_scores'].mean() == pytest.approx(accuracy, abs=0.01)
+
+
+def test_ensemble_is_scored_by_majority_vote(cv_results):
+    engine, models, results = cv_results
+    vote = served_vote([results[name]['oof_pred'] for name in models], engine.classes)
+
+    assert np.array_equal(results['Ensemble']['oof_pred'], vote)
+    for name in ('Naive_Bayes', 'Logistic_Regression'):
+        assert np.array_equal(results[name]['oof_pred'],
+                              engine.classes[np.argmax(results[name]['oof_proba'], axis=1)])
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.linear_model import LogisticRegression
+from sklearn.neural_network import MLPClassifier
+
+from quantized_inference import INT8_BLOCK_ROWS, QuantizedDenseModel, drift_report, quantize_int8
+
+
+@pytest.fixture(scope='module')
+def data():
+    # More features than one int8 block, so the blocked matmul is exercised
+    return make_classification(n_samples=400, n_features=INT8_BLOCK_ROWS + 44, n_informative=20,
+                               n_classes=4, random_state=0)
+
+
+@pytest.fixture(scope='module', params=['mlp', 'logistic', 'binary'])
+def model(request, data):
+    X, y = data
+    if request.param == 'mlp':
+        return MLPClassifier(hidden_layer_sizes=(32, 16), max_iter=300, random_state=0).fit(X, y)
+    if request.param == 'binary':
+        return LogisticRegression(max_iter=1000).fit(X, y % 2)
+    return LogisticRegression(max_iter=1000).fit(X, y)
+
+
+def test_float32_matches_sklearn(model, data):
+    X, _ = data
+    exported = QuantizedDenseModel.from_sklearn(model, mode='float32')
+
+    assert np.allclose(exported.predict_proba(X), model.predict_proba(X), atol=1e-5)
+    assert np.array_equal(exported.predict(X), model.predict(X))
+
+
+def test_int8_keeps_int8_weights(tmp_path, model, data):
+    X, _ = data
+    exported = QuantizedDenseModel.from_sklearn(model, mode='int8')
+    exported.save(str(tmp_path / 'model.npz'))
+    loaded = QuantizedDenseModel.load(str(tmp_path / 'model.npz'))
+
+    assert all(w.dtype == np.int8 for w in loaded.weights)
+    assert np.array_equal(loaded.predict_proba(X), exported.predict_proba(X))
+    report = drift_report(model, loaded, X)
+    assert report['top1_agreement'] >= 0.97
+    assert report['exported_param_bytes'] < report['reference_param_bytes'] / 6
+
+
+def test_int8_blocked_matmul_matches_dequantized_weights(data):
+    X, _ = data
+    weights = np.random.default_rng(0).normal(size=(X.shape[1], 5))
+    q, scale = quantize_int8(weights)
+    exported = QuantizedDenseModel([q], [np.zeros(5)], 'identity', 'identity', np.arange(5),
+                                   mode='int8', scales=[scale])
+
+    assert np.allclose(exported.predict_proba(X), X @ (q * scale), rtol=1e-4, atol=1e-4)
+    assert np.abs(q).max(axis=0).tolist() == [127] * 5
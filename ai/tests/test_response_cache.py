@@ -0,0 +1,63 @@
+import pytest
+from flask import Flask, jsonify
+
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    cache = ResponseCache(max_age=60, maxsize=2)
+    state = {'version': 'v1', 'calls': 0}
+
+    @app.route('/diseases/<name>')
+    @cache.cached(lambda: state['version'])
+    def disease(name):
+        state['calls'] += 1
+        if name == 'missing':
+            return jsonify({'error': 'not found'}), 404
+        return jsonify({'name': name, 'version': state['version'], 'call': state['calls']})
+
+    app.cache, app.state = cache, state
+    return app
+
+
+def test_matching_etag_gets_304(app):
+    client = app.test_client()
+    first = client.get('/diseases/flu')
+    etag = first.headers['ETag']
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"v1-')
+    assert first.headers['Cache-Control'] == 'public, max-age=60'
+
+    revalidated = client.get('/diseases/flu', headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.get_data() == b''
+    assert client.get('/diseases/flu', headers={'If-None-Match': 'W/"stale"'}).status_code == 200
+    assert app.state['calls'] == 1
+    assert app.cache.stats() == {'entries': 1, 'hits': 2, 'misses': 1}
+
+
+def test_cached_body_is_replayed_until_the_version_changes(app):
+    client = app.test_client()
+    first = client.get('/diseases/flu')
+    assert client.get('/diseases/flu').get_data() == first.get_data()
+
+    app.state['version'] = 'v2'
+    changed = client.get('/diseases/flu')
+    assert changed.get_json()['version'] == 'v2'
+    assert changed.headers['ETag'] != first.headers['ETag']
+    assert client.get('/diseases/flu', headers={'If-None-Match': first.headers['ETag']}).status_code == 200
+
+
+def test_errors_are_not_cached_and_entries_are_bounded(app):
+    client = app.test_client()
+    assert client.get('/diseases/missing').status_code == 404
+    assert client.get('/diseases/missing').status_code == 404
+    assert app.state['calls'] == 2
+
+    for name in ('flu', 'cold', 'asthma'):
+        client.get(f'/diseases/{name}')
+    assert app.cache.stats()['entries'] == 2
+    assert ('/diseases/flu', 'v1') not in app.cache.entries
@@ -0,0 +1,51 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import pytest
+
+from supabase_auth import authenticated_user_id, verify_supabase_token
+
+SECRET = 'test-jwt-secret'
+
+
+def _segment(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+
+
+def make_token(claims, secret=SECRET, alg='HS256'):
+    signing_input = f"{_segment({'alg': alg, 'typ': 'JWT'})}.{_segment(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode()}"
+
+
+def claims(**overrides):
+    return {'sub': 'user-1', 'aud': 'authenticated', 'exp': time.time() + 60, **overrides}
+
+
+def test_valid_token():
+    assert verify_supabase_token(make_token(claims()), SECRET)['sub'] == 'user-1'
+    assert authenticated_user_id(f'Bearer {make_token(claims())}', SECRET) == 'user-1'
+
+
+@pytest.mark.parametrize('token, message', [
+    (make_token(claims(), secret='other-secret'), 'signature'),
+    (make_token(claims(exp=time.time() - 120)), 'expired'),
+    (make_token(claims(aud='anon')), 'audience'),
+    (make_token(claims(sub='')), 'subject'),
+    (make_token(claims(), alg='none'), 'algorithm'),
+    ('not-a-token', 'Malformed'),
+])
+def test_invalid_tokens_are_rejected(token, message):
+    with pytest.raises(ValueError, match=message):
+        verify_supabase_token(token, SECRET)
+
+
+def test_authorization_header_without_a_verified_user():
+    token = make_token(claims())
+    assert authenticated_user_id(None, SECRET) is None
+    assert authenticated_user_id(f'Bearer {token}', None) is None
+    assert authenticated_user_id(f'Basic {token}', SECRET) is None
+    assert authenticated_user_id(f'Bearer {make_token(claims(), secret="other")}', SECRET) is None